@@ -0,0 +1,109 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+from functools import partial
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.module_utils.six import string_types
+from ansible.plugins.action import ActionBase
+from ansible.plugins.loader import connection_loader
+
+try:
+    from ansible.module_utils.configuration import DEFAULT_DEPLOYMENT_TIMEOUT
+    from ansible.module_utils.fleet_deployment import FleetDeployment, FleetSummary, DeviceResult, \
+        DEFAULT_CONCURRENCY
+except ImportError:
+    from module_utils.configuration import DEFAULT_DEPLOYMENT_TIMEOUT
+    from module_utils.fleet_deployment import FleetDeployment, FleetSummary, DeviceResult, DEFAULT_CONCURRENCY
+
+try:
+    from __main__ import display
+except ImportError:
+    from ansible.utils.display import Display
+
+    display = Display()
+
+HTTPAPI_CONNECTION = 'httpapi'
+
+
+class ActionModule(ActionBase):
+    """
+    Runs on the controller and deploys pending changes to the given devices with `FleetDeployment`. Every device
+    is connected to in the controller process with the httpapi connection and the FTD HttpApi plugin, configured
+    from inventory variables of the device the same way as for other tasks.
+    """
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(('devices', 'concurrency', 'timeout', 'skip_if_no_changes'))
+
+    def run(self, tmp=None, task_vars=None):
+        if task_vars is None:
+            task_vars = dict()
+
+        result = super(ActionModule, self).run(tmp, task_vars)
+        del tmp
+
+        devices = self._task.args.get('devices')
+        if isinstance(devices, string_types):
+            devices = [devices]
+        if not devices:
+            raise AnsibleActionFail('The devices option must contain at least one inventory hostname')
+        unknown_devices = [d for d in devices if d not in task_vars['hostvars']]
+        if unknown_devices:
+            raise AnsibleActionFail('Devices not found in the inventory: %s' % ', '.join(unknown_devices))
+
+        fleet_deployment = FleetDeployment(
+            devices,
+            partial(self._connect, task_vars=task_vars),
+            concurrency=int(self._task.args.get('concurrency', DEFAULT_CONCURRENCY)),
+            timeout=int(self._task.args.get('timeout', DEFAULT_DEPLOYMENT_TIMEOUT)),
+            skip_if_no_changes=boolean(self._task.args.get('skip_if_no_changes', False), strict=False),
+            check_mode=self._play_context.check_mode
+        )
+        device_results, summary = fleet_deployment.run()
+        for device_name, device_result in sorted(device_results.items()):
+            display.vvv('Deployment on %s: %s in %s seconds after %s poll(s)' % (
+                device_name, device_result[DeviceResult.STATE], device_result[DeviceResult.DURATION],
+                device_result[DeviceResult.POLLS]), host=device_name)
+
+        result.update(changed=any(r[DeviceResult.CHANGED] for r in device_results.values()),
+                      devices=device_results, summary=summary)
+        if summary[FleetSummary.FAILED]:
+            result.update(failed=True, msg='Deployment failed on %s of %s device(s)' %
+                                           (summary[FleetSummary.FAILED], summary[FleetSummary.TOTAL]))
+        return result
+
+    def _connect(self, device_name, task_vars):
+        """
+        Opens the httpapi connection to the device in the controller process. The connection is not persistent,
+        so it is not shared with other tasks and is closed as soon as the deployment on the device is finished.
+        """
+        device_vars = dict(task_vars['hostvars'][device_name])
+        play_context = self._play_context.set_task_and_variable_override(self._task, device_vars, self._templar)
+        if play_context.connection != HTTPAPI_CONNECTION:
+            raise AnsibleActionFail('Device %s must use the %s connection, got %s' %
+                                    (device_name, HTTPAPI_CONNECTION, play_context.connection))
+
+        connection = connection_loader.get(HTTPAPI_CONNECTION, play_context, os.devnull)
+        connection.set_options(var_options=device_vars)
+        connection._connect()
+        return connection
@@ -44,25 +44,163 @@ options:
     default: '/apispec/ngfw.json'
     vars:
       - name: ansible_httpapi_ftd_spec_path
+  spec_cache:
+    type: bool
+    description:
+      - Enables the on-disk cache of the parsed API specification. Cached specifications are keyed by the
+        software build version of the device, so the specification is downloaded again only when the build changes.
+    default: True
+    vars:
+      - name: ansible_httpapi_ftd_spec_cache
+  spec_cache_dir:
+    type: path
+    description:
+      - Specifies the directory where parsed API specifications are cached
+    default: '~/.ansible/ftd/spec_cache'
+    vars:
+      - name: ansible_httpapi_ftd_spec_cache_dir
+  spec_cache_max_entries:
+    type: int
+    description:
+      - Specifies the maximum number of cached API specifications. The least recently used ones are evicted first.
+    default: 20
+    vars:
+      - name: ansible_httpapi_ftd_spec_cache_max_entries
+  token_path_cache:
+    type: bool
+    description:
+      - Enables the on-disk cache of API token paths discovered for devices when the `token_path` option is not set,
+        so subsequent connections to a device skip probing the supported API versions. A cached token path is
+        dropped when the device responds with 404 Not Found to it.
+    default: True
+    vars:
+      - name: ansible_httpapi_ftd_token_path_cache
+  token_path_cache_dir:
+    type: path
+    description:
+      - Specifies the directory where discovered API token paths are cached
+    default: '~/.ansible/ftd/token_path_cache'
+    vars:
+      - name: ansible_httpapi_ftd_token_path_cache_dir
+  token_path_cache_ttl:
+    type: int
+    description:
+      - Specifies the number of seconds after which a cached API token path is discovered again.
+    default: 86400
+    vars:
+      - name: ansible_httpapi_ftd_token_path_cache_ttl
+  object_index:
+    type: bool
+    description:
+      - Enables the in-memory index of configuration objects kept for the lifetime of the persistent connection.
+        Objects of a model are listed once, and subsequent lookups by name are served from the index. Changes made
+        outside of the playbook while the connection is open are detected only when the changed object is fetched.
+    default: False
+    vars:
+      - name: ansible_httpapi_ftd_object_index
+  request_concurrency:
+    type: int
+    description:
+      - Specifies the maximum number of requests sent to the device at the same time when a module sends a batch
+        of independent requests.
+    default: 4
+    vars:
+      - name: ansible_httpapi_ftd_request_concurrency
+  connection_pool:
+    type: bool
+    description:
+      - Enables the pool of keep-alive connections to the device, so API requests reuse open HTTPS connections
+        instead of making a new TLS handshake for every request. New connections resume the TLS session
+        of the previous ones on Python 3.6 and later. Pooled connections do not use proxy settings.
+    default: False
+    vars:
+      - name: ansible_httpapi_ftd_connection_pool
+  connection_pool_max_size:
+    type: int
+    description:
+      - Specifies the maximum number of pooled connections to the device.
+    default: 4
+    vars:
+      - name: ansible_httpapi_ftd_connection_pool_max_size
+  connection_pool_idle_timeout:
+    type: int
+    description:
+      - Specifies the number of seconds without completed requests after which idle pooled connections are closed
+        instead of being reused.
+    default: 30
+    vars:
+      - name: ansible_httpapi_ftd_connection_pool_idle_timeout
+  retry_status_codes:
+    type: list
+    description:
+      - Specifies the HTTP status codes of responses after which a request is sent again, e.g. when the device
+        throttles requests or is busy with a deployment. An empty list disables retries.
+    default: [429, 502, 503, 504]
+    vars:
+      - name: ansible_httpapi_ftd_retry_status_codes
+  retry_methods:
+    type: list
+    description:
+      - Specifies the HTTP methods of requests that are sent again after a failure. Only idempotent methods are
+        retried by default, so objects are never added twice.
+    default: ['get', 'put', 'delete']
+    vars:
+      - name: ansible_httpapi_ftd_retry_methods
+  retry_max_attempts:
+    type: int
+    description:
+      - Specifies the maximum number of attempts to send a request, including the first one. Set it to 1
+        to disable retries.
+    default: 4
+    vars:
+      - name: ansible_httpapi_ftd_retry_max_attempts
+  retry_backoff_base:
+    type: float
+    description:
+      - Specifies the upper bound in seconds of the randomized delay before the first retry. The bound doubles
+        with every subsequent attempt.
+    default: 1.0
+    vars:
+      - name: ansible_httpapi_ftd_retry_backoff_base
+  retry_backoff_max:
+    type: float
+    description:
+      - Specifies the maximum delay in seconds before a retry, including delays requested by the device
+        in the Retry-After header.
+    default: 30.0
+    vars:
+      - name: ansible_httpapi_ftd_retry_backoff_max
 """
 
 import json
 import os
 import re
+import threading
+import time
+import uuid
+from multiprocessing.pool import ThreadPool
 
 from ansible import __version__ as ansible_version
 
 from ansible.module_utils.basic import to_text
 from ansible.errors import AnsibleConnectionFailure
-from ansible.module_utils.six.moves.urllib.error import HTTPError
+from ansible.module_utils.six import BytesIO
+from ansible.module_utils.six.moves.urllib.error import HTTPError, URLError
 from ansible.module_utils.six.moves.urllib.parse import urlencode
+from ansible.module_utils.urls import open_url
 from ansible.plugins.httpapi import HttpApiBase
-from urllib3 import encode_multipart_formdata
-from urllib3.fields import RequestField
+from urllib3.exceptions import HTTPError as PoolError
 from ansible.module_utils.connection import ConnectionError
 
 from module_utils.fdm_swagger_client import FdmSwaggerParser, SpecProp, FdmSwaggerValidator
-from module_utils.common import HTTPMethod, ResponseParams
+from module_utils.common import HTTPMethod, ResponseParams, ValidatedResponseParams
+from module_utils.configuration import get_validation_report
+from module_utils.connection_pool import KeepAliveConnectionPool, PoolStats
+from module_utils.multipart import MultipartFileStream
+from module_utils.object_index import ObjectIndex
+from module_utils.retry_policy import RetryPolicy, RetryStats
+from module_utils.spec_cache import SpecCache, RevisionEntry
+from module_utils.token_path_cache import TokenPathCache
 
 BASE_HEADERS = {
     'Content-Type': 'application/json',
@@ -70,10 +208,19 @@ BASE_HEADERS = {
     'User-Agent': 'FTD Ansible/%s' % ansible_version
 }
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+# progress of file transfers is displayed every time this number of bytes is transferred
+TRANSFER_PROGRESS_STEP = 64 * 1024 * 1024
+NOT_MODIFIED_STATUS_CODE = 304
+NOT_FOUND_STATUS_CODE = 404
 TOKEN_EXPIRATION_STATUS_CODE = 408
+# tokens are refreshed this number of seconds before they expire, or halfway through their lifetime if it is shorter
+TOKEN_REFRESH_MARGIN = 60
 UNAUTHORIZED_STATUS_CODE = 401
 API_TOKEN_PATH_OPTION_NAME = 'token_path'
 TOKEN_PATH_TEMPLATE = '/api/fdm/{0}/fdm/token'
+TOKEN_PATH_REGEX = r'^(?P<base_path>.+)/fdm/token$'
+SYSTEM_INFO_PATH_TEMPLATE = '{0}/operational/systeminfo/default'
 GET_API_VERSIONS_PATH = '/api/versions'
 DEFAULT_API_VERSIONS = ['v2', 'v1']
 
@@ -82,6 +229,13 @@ INVALID_API_TOKEN_PATH_MSG = ('The API token path is incorrect. Please, check co
 MISSING_API_TOKEN_PATH_MSG = ('Ansible could not determine the API token path automatically. Please, '
                               'specify the `ansible_httpapi_ftd_token_path` variable in the inventory file.')
 
+
+class SpecCacheStats:
+    HITS = 'hits'
+    REVALIDATIONS = 'revalidations'
+    MISSES = 'misses'
+
+
 try:
     from __main__ import display
 except ImportError:
@@ -96,9 +250,21 @@ class HttpApi(HttpApiBase):
         self.connection = connection
         self.access_token = None
         self.refresh_token = None
+        self._token_refresh_at = None
+        self._refresh_token_expires_at = None
+        self._token_refresh_timer = None
         self._api_spec = None
         self._api_validator = None
-        self._ignore_http_errors = False
+        self._local = threading.local()
+        self._auth_lock = threading.Lock()
+        self._spec_cache_stats = dict.fromkeys([SpecCacheStats.HITS, SpecCacheStats.REVALIDATIONS,
+                                                SpecCacheStats.MISSES], 0)
+        self._object_index = ObjectIndex()
+        self._connection_pool = None
+        self._connection_pool_lock = threading.Lock()
+        self._retry_stats = dict.fromkeys([RetryStats.RETRIES, RetryStats.RETRIED_REQUESTS, RetryStats.EXHAUSTED,
+                                           RetryStats.DELAY], 0)
+        self._retry_stats_lock = threading.Lock()
 
     def login(self, username, password):
         def request_token_payload(username, password):
@@ -114,7 +280,7 @@ class HttpApi(HttpApiBase):
                 'refresh_token': refresh_token
             }
 
-        if self.refresh_token:
+        if self.refresh_token and not self._is_refresh_token_expired():
             payload = refresh_token_payload(self.refresh_token)
         elif username and password:
             payload = request_token_payload(username, password)
@@ -130,6 +296,50 @@ class HttpApi(HttpApiBase):
         except KeyError:
             raise ConnectionError(
                 'Server returned response without token info during connection authentication: %s' % response)
+        self._schedule_token_refresh(response.get('expires_in'), response.get('refresh_expires_in'))
+
+    def _schedule_token_refresh(self, expires_in, refresh_expires_in):
+        """
+        Schedules the refresh of the access token ahead of its expiration, so requests are not rejected
+        with an expired token and sent again after the login. The token is refreshed by a background timer
+        of the persistent connection, and requests check the expiration as well in case the timer has not fired.
+        """
+        self._cancel_token_refresh()
+        now = time.time()
+        self._refresh_token_expires_at = now + refresh_expires_in if refresh_expires_in else None
+        if not expires_in:
+            self._token_refresh_at = None
+            return
+
+        refresh_in = max(expires_in - TOKEN_REFRESH_MARGIN, expires_in / 2.0)
+        self._token_refresh_at = now + refresh_in
+        self._token_refresh_timer = threading.Timer(refresh_in, self._refresh_token_in_background)
+        self._token_refresh_timer.daemon = True
+        self._token_refresh_timer.start()
+
+    def _cancel_token_refresh(self):
+        if self._token_refresh_timer is not None:
+            self._token_refresh_timer.cancel()
+            self._token_refresh_timer = None
+
+    def _refresh_token_in_background(self):
+        try:
+            self._refresh_token_if_expiring()
+        except Exception as e:
+            # the token is refreshed again before the next request or after it is rejected
+            display.vvvv('REST:token refresh failed: {0}'.format(e))
+
+    def _refresh_token_if_expiring(self):
+        if self._token_refresh_at is None or time.time() < self._token_refresh_at:
+            return
+        with self._auth_lock:
+            # the token could have been refreshed by another thread while waiting for the lock
+            if self._token_refresh_at is not None and time.time() >= self._token_refresh_at:
+                self._display(HTTPMethod.POST, 'login', 'Refreshing the access token before it expires')
+                self.login(self.connection.get_option('remote_user'), self.connection.get_option('password'))
+
+    def _is_refresh_token_expired(self):
+        return self._refresh_token_expires_at is not None and time.time() >= self._refresh_token_expires_at
 
     def _lookup_login_url(self, payload):
         """ Try to find correct login URL and get api token using this URL.
@@ -142,6 +352,9 @@ class HttpApi(HttpApiBase):
         if preconfigured_token_path:
             token_paths = [preconfigured_token_path]
         else:
+            response = self._login_with_cached_token_path(payload)
+            if response is not None:
+                return response
             token_paths = self._get_known_token_paths()
 
         for url in token_paths:
@@ -158,10 +371,51 @@ class HttpApi(HttpApiBase):
             else:
                 if not preconfigured_token_path:
                     self._set_api_token_path(url)
+                    self._store_token_path(url)
                 return response
 
         raise ConnectionError(INVALID_API_TOKEN_PATH_MSG if preconfigured_token_path else MISSING_API_TOKEN_PATH_MSG)
 
+    def _login_with_cached_token_path(self, payload):
+        """
+        Try to get api token using the token path cached for the device by previous connections.
+
+        :param payload: Token request payload
+        :type payload: dict
+        :return: token generation response or None when there is no cached token path or it does not work
+        """
+        token_path_cache = self._get_token_path_cache()
+        if token_path_cache is None:
+            return None
+
+        url = self._run_cache_operation(token_path_cache.load, self.connection._url)
+        if not url:
+            return None
+
+        try:
+            response = self._send_login_request(payload, url)
+        except ConnectionError as e:
+            display.vvvv('REST:request to cached token path {0} failed: {1}'.format(url, e))
+            http_code = getattr(e, 'http_code', None)
+            if http_code == 400:
+                raise
+            if http_code == NOT_FOUND_STATUS_CODE:
+                self._run_cache_operation(token_path_cache.invalidate, self.connection._url)
+            return None
+
+        self._set_api_token_path(url)
+        return response
+
+    def _store_token_path(self, url):
+        token_path_cache = self._get_token_path_cache()
+        if token_path_cache is not None:
+            self._run_cache_operation(token_path_cache.store, self.connection._url, url)
+
+    def _get_token_path_cache(self):
+        if not self.get_option('token_path_cache'):
+            return None
+        return TokenPathCache(self.get_option('token_path_cache_dir'), self.get_option('token_path_cache_ttl'))
+
     def _send_login_request(self, payload, url):
         self._display(HTTPMethod.POST, 'login', url)
         dummy, response_data = self._send_auth_request(
@@ -181,9 +435,14 @@ class HttpApi(HttpApiBase):
 
         self._display(HTTPMethod.POST, 'logout', url)
 
+        self._cancel_token_refresh()
         self._send_auth_request(url, json.dumps(auth_payload), method=HTTPMethod.POST, headers=BASE_HEADERS)
         self.refresh_token = None
         self.access_token = None
+        self._token_refresh_at = None
+        self._refresh_token_expires_at = None
+        self._close_connection_pool()
+        self._display_retry_stats()
 
     def _send_auth_request(self, path, data, **kwargs):
         error_msg_prefix = 'Server returned an error during authentication request'
@@ -201,6 +460,15 @@ class HttpApi(HttpApiBase):
         finally:
             self._ignore_http_errors = False
 
+    @property
+    def _ignore_http_errors(self):
+        # requests of a batch are sent from different threads, so the flag is kept per thread
+        return getattr(self._local, 'ignore_http_errors', False)
+
+    @_ignore_http_errors.setter
+    def _ignore_http_errors(self, value):
+        self._local.ignore_http_errors = value
+
     def update_auth(self, response, response_data):
         # With tokens, authentication should not be checked and updated on each request
         return None
@@ -213,7 +481,9 @@ class HttpApi(HttpApiBase):
             if data:
                 self._display(http_method, 'data', data)
 
-            response, response_data = self.connection.send(url, data, method=http_method, headers=BASE_HEADERS)
+            self._refresh_token_if_expiring()
+            self._local.request_auth = self.connection._auth
+            response, response_data = self._send_with_retries(url, data, http_method, BASE_HEADERS)
 
             value = self._get_response_value(response_data)
             self._display(http_method, 'response', value)
@@ -233,42 +503,312 @@ class HttpApi(HttpApiBase):
                 ResponseParams.STATUS_CODE: e.code,
                 ResponseParams.RESPONSE: self._response_to_json(error_msg)
             }
+        finally:
+            self._local.request_auth = None
+
+    def _send_with_retries(self, url, data, http_method, headers):
+        retry_policy = self._get_retry_policy()
+        attempt = 1
+        while True:
+            try:
+                return self._send(url, data, http_method, headers)
+            except HTTPError as e:
+                if not retry_policy.should_retry(http_method, e.code, attempt):
+                    if attempt > 1:
+                        self._update_retry_stats(exhausted=True)
+                    raise
+                delay = retry_policy.get_delay(attempt, e.hdrs.get('Retry-After') if e.hdrs else None)
+                self._display(http_method, 'retry', 'attempt={0}, status={1}, delay={2:.2f}s'.format(
+                    attempt, e.code, delay))
+                self._update_retry_stats(first_retry=attempt == 1, delay=delay)
+                time.sleep(delay)
+                attempt += 1
+
+    def _get_retry_policy(self):
+        return RetryPolicy(
+            status_codes=self.get_option('retry_status_codes'),
+            methods=self.get_option('retry_methods'),
+            max_attempts=self.get_option('retry_max_attempts'),
+            backoff_base=self.get_option('retry_backoff_base'),
+            backoff_max=self.get_option('retry_backoff_max')
+        )
+
+    def _update_retry_stats(self, first_retry=False, delay=None, exhausted=False):
+        # requests of a batch are retried from different threads
+        with self._retry_stats_lock:
+            if exhausted:
+                self._retry_stats[RetryStats.EXHAUSTED] += 1
+                return
+            self._retry_stats[RetryStats.RETRIES] += 1
+            self._retry_stats[RetryStats.DELAY] += delay
+            if first_retry:
+                self._retry_stats[RetryStats.RETRIED_REQUESTS] += 1
+
+    def get_retry_stats(self):
+        """
+        Returns the number of retries, requests that have been retried at least once, retried requests
+        that still failed, and the total delay in seconds spent waiting before retries.
+
+        :return: the counters keyed by `RetryStats` values
+        :rtype: dict
+        """
+        with self._retry_stats_lock:
+            return dict(self._retry_stats)
+
+    def _display_retry_stats(self):
+        stats = self.get_retry_stats()
+        if stats[RetryStats.RETRIES]:
+            self._display(HTTPMethod.GET, 'retry:stats',
+                          'retries={0}, retried_requests={1}, exhausted={2}, delay={3:.2f}s'.format(
+                              stats[RetryStats.RETRIES], stats[RetryStats.RETRIED_REQUESTS],
+                              stats[RetryStats.EXHAUSTED], stats[RetryStats.DELAY]))
+
+    def _send(self, url, data, http_method, headers):
+        connection_pool = self._get_connection_pool()
+        if connection_pool is None:
+            return self.connection.send(url, data, method=http_method, headers=headers)
+
+        # pooled requests bypass the connection, so it is not connected (i.e., logged in) automatically
+        if not self.connection.connected:
+            self.connection._connect()
+        request_headers = dict(headers)
+        request_headers.update(self.connection._auth or {})
+
+        try:
+            status, reason, response_headers, body = connection_pool.request(http_method, url, data,
+                                                                             request_headers)
+        except PoolError as e:
+            raise AnsibleConnectionFailure('Could not connect to {0}: {1}'.format(self.connection._url + url, e))
+        if status >= 400:
+            exc = HTTPError(self.connection._url + url, status, reason, response_headers, BytesIO(body))
+            if self.handle_httperror(exc):
+                return self._send(url, data, http_method, headers)
+            raise exc
+        return PooledResponse(status, response_headers), BytesIO(body)
+
+    def _get_connection_pool(self):
+        if not self.get_option('connection_pool'):
+            return None
+        with self._connection_pool_lock:
+            if self._connection_pool is None:
+                self._connection_pool = KeepAliveConnectionPool(
+                    self.connection._url,
+                    max_size=self.get_option('connection_pool_max_size'),
+                    idle_timeout=self.get_option('connection_pool_idle_timeout'),
+                    timeout=self.connection.get_option('timeout'),
+                    validate_certs=self.connection.get_option('validate_certs')
+                )
+            return self._connection_pool
+
+    def _close_connection_pool(self):
+        with self._connection_pool_lock:
+            connection_pool, self._connection_pool = self._connection_pool, None
+        if connection_pool is not None:
+            stats = connection_pool.get_stats()
+            connection_pool.close()
+            self._display(HTTPMethod.GET, 'connection:pool',
+                          'requests={0}, connections={1}, reused={2}, expired={3}, resumed={4}'.format(
+                              stats[PoolStats.REQUESTS], stats[PoolStats.CONNECTIONS], stats[PoolStats.REUSED],
+                              stats[PoolStats.EXPIRED], stats[PoolStats.RESUMED]))
+
+    def get_connection_pool_stats(self):
+        """
+        Returns counters of the keep-alive connection pool (see `KeepAliveConnectionPool.get_stats`).
+
+        :return: the pool counters, or None when the pool is disabled or has not been used yet
+        :rtype: dict
+        """
+        connection_pool = self._connection_pool
+        return connection_pool.get_stats() if connection_pool is not None else None
+
+    def send_requests(self, requests):
+        """
+        Sends a batch of independent requests concurrently, using up to `request_concurrency` connections
+        to the device. The whole batch is passed in a single call, so the module does not wait for a round trip
+        to the connection process for every request.
+
+        :param requests: keyword arguments of `send_request` for every request
+        :type requests: list
+        :return: responses in the same order as the requests (see `send_request`)
+        :rtype: list
+        """
+        concurrency = min(len(requests), self.get_option('request_concurrency') or 1)
+        if concurrency <= 1:
+            return [self.send_request(**request) for request in requests]
+
+        pool = ThreadPool(concurrency)
+        try:
+            return pool.map(lambda request: self.send_request(**request), requests)
+        finally:
+            pool.close()
+
+    def validate_and_send_request(self, operation_name, url_path, http_method, body_params=None, path_params=None,
+                                  query_params=None, check_mode=False):
+        """
+        Validates params of the operation and sends the request if they are valid, so a module makes a single call
+        to the connection instead of separate calls for every validated kind of params and for the request.
+
+        :param operation_name: name of the operation the params are validated against
+        :type operation_name: str
+        :param check_mode: validate the params only, without sending the request
+        :type check_mode: bool
+        :return: a dict with the validation report (see `get_validation_report`) and the response
+            (see `send_request`), which is None when the params are invalid or in check mode
+        :rtype: dict
+        """
+        report = get_validation_report(self, operation_name, http_method, body_params, path_params, query_params)
+        response = None
+        if not report and not check_mode:
+            response = self.send_request(url_path, http_method, body_params, path_params, query_params)
+        return {
+            ValidatedResponseParams.VALIDATION_REPORT: report,
+            ValidatedResponseParams.RESPONSE: response
+        }
+
+    def validate_and_send_requests(self, requests, check_mode=False):
+        """
+        Validates params of a batch of independent requests and sends the valid ones concurrently
+        (see `send_requests`).
+
+        :param requests: keyword arguments of `validate_and_send_request` for every request
+        :type requests: list
+        :param check_mode: validate the params only, without sending the requests
+        :type check_mode: bool
+        :return: validation reports and responses in the same order as the requests
+            (see `validate_and_send_request`)
+        :rtype: list
+        """
+        results = []
+        valid_requests = []
+        for request in requests:
+            request = dict(request)
+            report = get_validation_report(self, request.pop('operation_name'), request['http_method'],
+                                           request.get('body_params'), request.get('path_params'),
+                                           request.get('query_params'))
+            results.append({ValidatedResponseParams.VALIDATION_REPORT: report, ValidatedResponseParams.RESPONSE: None})
+            if not report:
+                valid_requests.append((results[-1], request))
+
+        if not check_mode and valid_requests:
+            responses = self.send_requests([request for _, request in valid_requests])
+            for (result, _), response in zip(valid_requests, responses):
+                result[ValidatedResponseParams.RESPONSE] = response
+        return results
 
     def upload_file(self, from_path, to_url):
         url = construct_url_path(to_url)
         self._display(HTTPMethod.POST, 'upload', url)
-        with open(from_path, 'rb') as src_file:
-            rf = RequestField('fileToUpload', src_file.read(), os.path.basename(src_file.name))
-            rf.make_multipart()
-            body, content_type = encode_multipart_formdata([rf])
-
+        # a rejected upload would be sent again with the whole file, so the token is refreshed in advance
+        self._refresh_token_if_expiring()
+        with MultipartFileStream('fileToUpload', from_path) as body:
             headers = dict(BASE_HEADERS)
-            headers['Content-Type'] = content_type
+            headers['Content-Type'] = body.content_type
             headers['Content-Length'] = len(body)
 
-            dummy, response_data = self.connection.send(url, data=body, method=HTTPMethod.POST, headers=headers)
-            value = self._get_response_value(response_data)
+            response = self._open_stream(url, body, HTTPMethod.POST, headers)
+            try:
+                value = to_text(response.read())
+            finally:
+                response.close()
             self._display(HTTPMethod.POST, 'upload:response', value)
             return self._response_to_json(value)
 
     def download_file(self, from_url, to_path, path_params=None):
         url = construct_url_path(from_url, path_params=path_params)
         self._display(HTTPMethod.GET, 'download', url)
-        response, response_data = self.connection.send(url, data=None, method=HTTPMethod.GET, headers=BASE_HEADERS)
+        self._refresh_token_if_expiring()
+        response = self._open_stream(url, None, HTTPMethod.GET, BASE_HEADERS)
+        try:
+            if os.path.isdir(to_path):
+                filename = extract_filename_from_headers(response.info())
+                to_path = os.path.join(to_path, filename)
+            size = self._write_stream_to_file(response, to_path, response.info().get('Content-Length'))
+        finally:
+            response.close()
+        self._display(HTTPMethod.GET, 'downloaded', '{0} ({1} bytes)'.format(to_path, size))
 
-        if os.path.isdir(to_path):
-            filename = extract_filename_from_headers(response.info())
-            to_path = os.path.join(to_path, filename)
+    def _write_stream_to_file(self, response, to_path, content_length=None):
+        """
+        Writes the response body to the file in chunks, so the memory used does not depend on the file size.
+        The body is written to a temporary file next to the destination that is renamed once the download
+        completes, so a failed download never leaves a truncated file behind.
+
+        :param response: the response with the unread body
+        :param to_path: path of the destination file
+        :type to_path: str
+        :param content_length: value of the Content-Length header of the response
+        :type content_length: str
+        :return: number of bytes written
+        :rtype: int
+        """
+        tmp_path = '{0}.{1}.part'.format(to_path, uuid.uuid4().hex[:8])
+        size = 0
+        next_progress = TRANSFER_PROGRESS_STEP
+        try:
+            with open(tmp_path, 'wb') as output_file:
+                chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+                while chunk:
+                    output_file.write(chunk)
+                    size += len(chunk)
+                    if size >= next_progress:
+                        self._display_transfer_progress(HTTPMethod.GET, 'download:progress', size, content_length)
+                        next_progress += TRANSFER_PROGRESS_STEP
+                    chunk = response.read(DOWNLOAD_CHUNK_SIZE)
+            os.rename(tmp_path, to_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return size
+
+    def _display_transfer_progress(self, http_method, title, transferred, total=None):
+        self._display(http_method, title, '{0} of {1} bytes'.format(transferred, total or 'unknown'))
+
+    def _open_stream(self, url, data, http_method, headers):
+        """
+        Sends the request the same way as the connection does, but returns the response without reading its body,
+        so files are transferred in chunks instead of being held in memory of the connection process.
+
+        :param url: path of the request relative to the device URL
+        :type url: str
+        :param data: body of the request
+        :param http_method: HTTP method of the request
+        :type http_method: str
+        :param headers: headers of the request
+        :type headers: dict
+        :return: the response with the unread body
+        """
+        if not self.connection.connected:
+            self.connection._connect()
+        request_headers = dict(headers)
+        request_headers.update(self.connection._auth or {})
 
-        with open(to_path, "wb") as output_file:
-            output_file.write(response_data.getvalue())
-        self._display(HTTPMethod.GET, 'downloaded', to_path)
+        self._local.request_auth = self.connection._auth
+        try:
+            return open_url(self.connection._url + url, data=data, method=http_method,
+                            headers=request_headers, timeout=self.connection.get_option('timeout'),
+                            validate_certs=self.connection.get_option('validate_certs'))
+        except HTTPError as e:
+            if self.handle_httperror(e):
+                if hasattr(data, 'seek'):
+                    data.seek(0)
+                return self._open_stream(url, data, http_method, headers)
+            raise
+        except URLError as e:
+            raise AnsibleConnectionFailure('Could not connect to {0}: {1}'.format(self.connection._url + url, e.reason))
+        finally:
+            self._local.request_auth = None
 
     def handle_httperror(self, exc):
         is_auth_related_code = exc.code == TOKEN_EXPIRATION_STATUS_CODE or exc.code == UNAUTHORIZED_STATUS_CODE
         if not self._ignore_http_errors and is_auth_related_code:
-            self.connection._auth = None
-            self.login(self.connection.get_option('remote_user'), self.connection.get_option('password'))
+            with self._auth_lock:
+                # concurrent requests fail with the same expired token, but only the first of them logs in again
+                failed_auth = getattr(self._local, 'request_auth', None)
+                if failed_auth is None or failed_auth == self.connection._auth:
+                    self.connection._auth = None
+                    self.login(self.connection.get_option('remote_user'), self.connection.get_option('password'))
+                self._local.request_auth = self.connection._auth
             return True
         # False means that the exception will be passed further to the caller
         return False
@@ -354,18 +894,145 @@ class HttpApi(HttpApiBase):
     def validate_path_params(self, operation_name, params):
         return self.api_validator.validate_path_params(operation_name, params)
 
+    def is_object_index_enabled(self):
+        return self.get_option('object_index')
+
+    def get_indexed_object(self, index_key, name):
+        return self._object_index.get(index_key, name)
+
+    def get_indexed_object_by_id(self, index_key, obj_id):
+        return self._object_index.get_by_id(index_key, obj_id)
+
+    def index_objects(self, index_key, objects):
+        self._object_index.populate(index_key, objects)
+
+    def update_indexed_object(self, index_key, obj):
+        self._object_index.update(index_key, obj)
+
+    def verify_indexed_object(self, index_key, obj):
+        return self._object_index.verify(index_key, obj)
+
+    def remove_indexed_object(self, index_key, obj_id):
+        self._object_index.remove(index_key, obj_id)
+
+    def invalidate_object_index(self, index_key=None):
+        self._object_index.invalidate(index_key)
+
     @property
     def api_spec(self):
         if self._api_spec is None:
-            spec_path_url = self._get_api_spec_path()
-            response = self.send_request(url_path=spec_path_url, http_method=HTTPMethod.GET)
-            if response[ResponseParams.SUCCESS]:
-                self._api_spec = FdmSwaggerParser().parse_spec(response[ResponseParams.RESPONSE])
-            else:
-                raise ConnectionError('Failed to download API specification. Status code: %s. Response: %s' % (
-                    response[ResponseParams.STATUS_CODE], response[ResponseParams.RESPONSE]))
+            self._api_spec = self._load_api_spec()
         return self._api_spec
 
+    def _load_api_spec(self):
+        spec_path_url = self._get_api_spec_path()
+        spec_cache = self._get_spec_cache()
+        if spec_cache is None:
+            api_spec, dummy = self._download_api_spec(spec_path_url)
+            return api_spec
+
+        build_version = self._get_build_version()
+        if build_version:
+            api_spec = self._run_cache_operation(spec_cache.load, build_version, spec_path_url)
+            if api_spec is not None:
+                self._spec_cache_stats[SpecCacheStats.HITS] += 1
+                self._display(HTTPMethod.GET, 'spec:cache', 'Loaded API specification for build %s' % build_version)
+                self._display_spec_cache_stats()
+                return api_spec
+
+        # Without a build-version hit, the locally stored copy is revalidated with a conditional request
+        spec_url = '%s%s' % (self.connection._url, spec_path_url)
+        stored_spec, revision = self._run_cache_operation(spec_cache.load_revision, spec_url) or (None, {})
+        api_spec, new_revision = self._download_api_spec(spec_path_url, revision if stored_spec is not None else {})
+
+        if api_spec is None:
+            self._spec_cache_stats[SpecCacheStats.REVALIDATIONS] += 1
+            api_spec = stored_spec
+        else:
+            self._spec_cache_stats[SpecCacheStats.MISSES] += 1
+            if new_revision:
+                self._run_cache_operation(spec_cache.store_revision, spec_url, api_spec, new_revision)
+
+        if build_version:
+            self._run_cache_operation(spec_cache.store, build_version, spec_path_url, api_spec)
+        self._display_spec_cache_stats()
+        return api_spec
+
+    def _download_api_spec(self, spec_path_url, revision=None):
+        """
+        Download and parse the API specification. When revision validators of a previously downloaded copy
+        are given, the request is sent with conditional headers.
+
+        :param spec_path_url: URL of the API specification
+        :type spec_path_url: str
+        :param revision: 'etag' and 'last_modified' values of the previously downloaded copy
+        :type revision: dict
+        :return: a tuple of the parsed specification and its revision validators, or (None, revision)
+            when the device reports that the previously downloaded copy is not modified
+        :rtype: tuple
+        """
+        revision = revision or {}
+        headers = dict(BASE_HEADERS)
+        if revision.get(RevisionEntry.ETAG):
+            headers['If-None-Match'] = revision[RevisionEntry.ETAG]
+        if revision.get(RevisionEntry.LAST_MODIFIED):
+            headers['If-Modified-Since'] = revision[RevisionEntry.LAST_MODIFIED]
+
+        self._display(HTTPMethod.GET, 'url', spec_path_url)
+        try:
+            response, response_data = self.connection.send(spec_path_url, None, method=HTTPMethod.GET,
+                                                           headers=headers)
+        except HTTPError as e:
+            if e.code == NOT_MODIFIED_STATUS_CODE:
+                self._display(HTTPMethod.GET, 'response', 'API specification is not modified')
+                return None, revision
+            raise ConnectionError('Failed to download API specification. Status code: %s. Response: %s' % (
+                e.code, self._response_to_json(to_text(e.read()))))
+
+        response_headers = response.info()
+        new_revision = dict((k, v) for k, v in [
+            (RevisionEntry.ETAG, response_headers.get('ETag')),
+            (RevisionEntry.LAST_MODIFIED, response_headers.get('Last-Modified'))
+        ] if v)
+        spec = self._response_to_json(self._get_response_value(response_data))
+        return FdmSwaggerParser().parse_spec(spec, lazy=True), new_revision
+
+    def _display_spec_cache_stats(self):
+        stats = self._spec_cache_stats
+        self._display(HTTPMethod.GET, 'spec:cache', 'hits={0}, revalidations={1}, misses={2}'.format(
+            stats[SpecCacheStats.HITS], stats[SpecCacheStats.REVALIDATIONS], stats[SpecCacheStats.MISSES]))
+
+    def _get_spec_cache(self):
+        if not self.get_option('spec_cache'):
+            return None
+        return SpecCache(self.get_option('spec_cache_dir'), self.get_option('spec_cache_max_entries'))
+
+    def _run_cache_operation(self, cache_method, *args):
+        # Caches only speed up the connection, so their failures must not break it
+        try:
+            return cache_method(*args)
+        except (IOError, OSError) as e:
+            display.vvvv('REST:cache operation failed: {0}'.format(e))
+            return None
+
+    def _get_build_version(self):
+        """
+        Fetch the software build version of the device. The system information endpoint is located next to
+        the token endpoint, so its URL can be resolved before the API specification is downloaded.
+
+        :return: build version or None when it cannot be determined
+        :rtype: str
+        """
+        match = re.match(TOKEN_PATH_REGEX, self._get_api_token_path() or '')
+        if not match:
+            return None
+
+        system_info_path = SYSTEM_INFO_PATH_TEMPLATE.format(match.group('base_path'))
+        response = self.send_request(url_path=system_info_path, http_method=HTTPMethod.GET)
+        if not response[ResponseParams.SUCCESS]:
+            return None
+        return response[ResponseParams.RESPONSE].get('databaseInfo', {}).get('buildVersion')
+
     @property
     def api_validator(self):
         if self._api_validator is None:
@@ -373,6 +1040,23 @@ class HttpApi(HttpApiBase):
         return self._api_validator
 
 
+class PooledResponse(object):
+    """
+    Exposes the status code and the headers of a response received over a pooled connection the same way
+    as responses returned by the connection.
+    """
+
+    def __init__(self, status, headers):
+        self._status = status
+        self._headers = headers
+
+    def getcode(self):
+        return self._status
+
+    def info(self):
+        return self._headers
+
+
 def construct_url_path(path, path_params=None, query_params=None):
     url = path
     if path_params:
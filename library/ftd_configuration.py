@@ -46,9 +46,23 @@ options:
     description:
       - Key-value pairs that should be sent as body parameters in a REST API call
     type: dict
+  bulk_data:
+    description:
+      - A list of objects to execute the operation with, one by one, in a single module run. Every item
+        is sent as C(data), while C(query_params) and C(path_params) are shared by all items.
+      - Items are processed even if some of them fail, and the task fails at the end if any item has failed.
+        Results are returned for every item together with a summary.
+      - Bulk upserts are faster when the object index is enabled with C(ansible_httpapi_ftd_object_index).
+      - Facts are registered for every returned object as they are for a single C(data) item, unless
+        C(register_as) is given, in which case the list of responses is registered under that name.
+      - Mutually exclusive with C(data) and C(filters).
+    type: list
   query_params:
     description:
       - Key-value pairs that should be sent as query parameters in a REST API call.
+      - When objects are looked up page by page (e.g., with C(filters) or in upsert operations), the C(limit) query
+        parameter sets a fixed page size. Otherwise, pages of 1000 objects are requested and the page size
+        is reduced automatically if the device does not support it.
     type: dict
   path_params:
     description:
@@ -62,7 +76,26 @@ options:
     description:
       - Key-value dict that represents equality filters. Every key is a property name and value is its desired value.
         If multiple filters are present, they are combined with logical operator AND.
+      - Filters by keys that the operation supports according to the API specification are sent to the device,
+        so fewer objects are downloaded. Remaining filters are applied to the returned objects.
     type: dict
+  wait_for_deployment:
+    description:
+      - Waits until the deployment started by the C(addDeployment) operation is finished, and fails if the deployment
+        has failed. The deployment job is polled within a single module run, often at first and less often later.
+    type: bool
+    default: false
+  deployment_timeout:
+    description:
+      - Maximum number of seconds to wait for the deployment when C(wait_for_deployment) is set.
+    type: int
+    default: 600
+  skip_if_no_changes:
+    description:
+      - Does not start the deployment with the C(addDeployment) operation when there are no pending changes
+        to deploy.
+    type: bool
+    default: false
 """
 
 EXAMPLES = """
@@ -79,6 +112,26 @@ EXAMPLES = """
       isSystemDefined: false
     register_as: "hostNetwork"
 
+- name: Create or update several network objects in one task
+  ftd_configuration:
+    operation: "upsertNetworkObject"
+    bulk_data:
+      - name: "Ansible-network-host-1"
+        subType: "HOST"
+        value: "192.168.2.1"
+        type: "networkobject"
+      - name: "Ansible-network-host-2"
+        subType: "HOST"
+        value: "192.168.2.2"
+        type: "networkobject"
+    register_as: "hostNetworks"
+
+- name: Deploy pending changes and wait until the deployment is finished
+  ftd_configuration:
+    operation: "addDeployment"
+    wait_for_deployment: true
+    skip_if_no_changes: true
+
 - name: Delete the network object
   ftd_configuration:
     operation: "deleteNetworkObject"
@@ -88,59 +141,214 @@ EXAMPLES = """
 
 RETURN = """
 response:
-  description: HTTP response returned from the API call.
+  description: HTTP response returned from the API call. A list of responses for every item when C(bulk_data)
+    is used.
   returned: success
   type: dict
+results:
+  description: Results for every item of C(bulk_data) in the same order. Every result contains C(changed)
+    and either C(response), or C(failed) and C(msg).
+  returned: when bulk_data is used
+  type: list
+changes:
+  description: Properties of the existing object changed by an edit or upsert operation, keyed by their paths
+    (e.g., C(rules[2].name)), with C(before) and C(after) values. Returned for every changed item in C(results)
+    when C(bulk_data) is used. In check mode, the properties that would be changed are returned.
+  returned: when an existing object is changed
+  type: dict
+summary:
+  description: Numbers of C(total), C(changed), C(unchanged) and C(failed) items of C(bulk_data).
+  returned: when bulk_data is used
+  type: dict
+deployment:
+  description: Final C(state) of the deployment job, its C(duration) in seconds, the number of C(polls),
+    and whether the deployment was C(skipped) because there were no pending changes.
+  returned: when wait_for_deployment or skip_if_no_changes is used
+  type: dict
+plan:
+  description: Objects that would be added, edited or deleted, with C(action), C(operation), C(model), C(name),
+    C(id) and C(changes) of edited objects. Objects are looked up in the list of all objects of the model fetched
+    once per task, so a dry run does not fetch objects one by one.
+  returned: in check mode, when the configuration would be changed
+  type: list
+msg:
+  description: The error message describing why the module failed.
+  returned: error
+  type: string
 """
+import copy
+
 from ansible.module_utils.basic import AnsibleModule
 from ansible.module_utils.connection import Connection
 
 try:
     from ansible.module_utils.configuration import BaseConfigurationResource, CheckModeException, \
-        FtdInvalidOperationNameError
-    from ansible.module_utils.fdm_swagger_client import ValidationError
-    from ansible.module_utils.common import construct_ansible_facts, FtdConfigurationError, \
-        FtdServerError, FtdUnexpectedResponse
+        FtdInvalidOperationNameError, BulkItemResult, BULK_ITEM_ERRORS, DEPLOY_OPERATION, DEFAULT_DEPLOYMENT_TIMEOUT
+    from ansible.module_utils.common import construct_ansible_facts, FtdConfigurationError, FtdServerError, DiffKey
 except ImportError:
-    from module_utils.configuration import BaseConfigurationResource, CheckModeException, FtdInvalidOperationNameError
-    from module_utils.fdm_swagger_client import ValidationError
-    from module_utils.common import construct_ansible_facts, FtdConfigurationError, \
-        FtdServerError, FtdUnexpectedResponse
+    from module_utils.configuration import BaseConfigurationResource, CheckModeException, \
+        FtdInvalidOperationNameError, BulkItemResult, BULK_ITEM_ERRORS, DEPLOY_OPERATION, DEFAULT_DEPLOYMENT_TIMEOUT
+    from module_utils.common import construct_ansible_facts, FtdConfigurationError, FtdServerError, DiffKey
+
+
+class BulkSummary:
+    TOTAL = 'total'
+    CHANGED = 'changed'
+    UNCHANGED = 'unchanged'
+    FAILED = 'failed'
+
+
+def get_error_message(op_name, e):
+    if isinstance(e, FtdInvalidOperationNameError):
+        return 'Invalid operation name provided: %s' % e.operation_name
+    elif isinstance(e, FtdConfigurationError):
+        return 'Failed to execute %s operation because of the configuration error: %s' % (op_name, e.msg)
+    elif isinstance(e, FtdServerError):
+        return 'Server returned an error trying to execute %s operation. Status code: %s. ' \
+               'Server response: %s' % (op_name, e.code, e.response)
+    return e.args[0]
+
+
+def construct_diff(changes):
+    """
+    Builds the output of the diff mode with the changed properties only, so large objects (e.g., access policies)
+    are not printed whole when a single property changes.
+
+    :param changes: changed properties keyed by their paths, with 'before' and 'after' values
+    :type changes: dict
+    :return: the diff with 'before' and 'after' keys
+    :rtype: dict
+    """
+    return dict((key, dict((path, change[key]) for path, change in changes.items()))
+                for key in (DiffKey.BEFORE, DiffKey.AFTER))
+
+
+def add_changes(result, changes, diff_mode):
+    if changes:
+        result['changes'] = changes
+        if diff_mode:
+            result['diff'] = construct_diff(changes)
+    return result
+
+
+def add_plan(result, resource):
+    if resource.planned_changes:
+        result['plan'] = resource.planned_changes
+    return result
+
+
+def construct_bulk_ansible_facts(responses, params):
+    """
+    Builds facts for all items of a bulk operation. Without `register_as`, every returned object gets its own fact,
+    the same as when the operation is executed with a single `data` item.
+
+    :param responses: responses for every item, None for failed items
+    :type responses: list
+    :rtype: dict
+    """
+    if params.get('register_as'):
+        return construct_ansible_facts(responses, params)
+
+    facts = dict()
+    for response in responses:
+        facts.update(construct_ansible_facts(response, params))
+    return facts
+
+
+def execute_bulk_operation(resource, op_name, params):
+    """
+    Executes the operation for every item of `bulk_data` with the same resource, so specifications of operations
+    and models are fetched from the connection only once.
+
+    :return: a tuple of lists with responses and results for every item, the summary, and properties changed
+        by all items keyed by paths prefixed with item indexes
+    :rtype: tuple
+    """
+    # bulk_data is left out of the copied params, otherwise every item would copy the whole list
+    base_params = dict((k, v) for k, v in params.items() if k != 'bulk_data')
+    params_list = []
+    for item in params['bulk_data']:
+        item_params = copy.deepcopy(base_params)
+        item_params['data'] = copy.deepcopy(item)
+        params_list.append(item_params)
+
+    responses = []
+    results = []
+    summary = dict.fromkeys([BulkSummary.TOTAL, BulkSummary.CHANGED, BulkSummary.UNCHANGED, BulkSummary.FAILED], 0)
+    all_changes = {}
+    for index, item_result in enumerate(resource.execute_bulk_operation(op_name, params_list)):
+        changed = item_result[BulkItemResult.CHANGED]
+        if BulkItemResult.ERROR in item_result:
+            responses.append(None)
+            results.append({'changed': changed, 'failed': True,
+                            'msg': get_error_message(op_name, item_result[BulkItemResult.ERROR])})
+            summary[BulkSummary.FAILED] += 1
+        else:
+            responses.append(item_result[BulkItemResult.RESPONSE])
+            changes = item_result.get(BulkItemResult.DIFF)
+            results.append(add_changes({'changed': changed, 'response': item_result[BulkItemResult.RESPONSE]},
+                                       changes, False))
+            all_changes.update(('[{0}].{1}'.format(index, path), change) for path, change in (changes or {}).items())
+            summary[BulkSummary.CHANGED if changed else BulkSummary.UNCHANGED] += 1
+        summary[BulkSummary.TOTAL] += 1
+
+    return responses, results, summary, all_changes
 
 
 def main():
     fields = dict(
         operation=dict(type='str', required=True),
         data=dict(type='dict'),
+        bulk_data=dict(type='list'),
         query_params=dict(type='dict'),
         path_params=dict(type='dict'),
         register_as=dict(type='str'),
-        filters=dict(type='dict')
+        filters=dict(type='dict'),
+        wait_for_deployment=dict(type='bool', default=False),
+        deployment_timeout=dict(type='int', default=DEFAULT_DEPLOYMENT_TIMEOUT),
+        skip_if_no_changes=dict(type='bool', default=False)
     )
     module = AnsibleModule(argument_spec=fields,
+                           mutually_exclusive=[['data', 'bulk_data'], ['filters', 'bulk_data']],
                            supports_check_mode=True)
     params = module.params
+    is_deployment = params['wait_for_deployment'] or params['skip_if_no_changes']
+    if is_deployment and (params['operation'] != DEPLOY_OPERATION or params['bulk_data'] is not None):
+        module.fail_json(msg='wait_for_deployment and skip_if_no_changes are supported by a single %s operation '
+                             'only' % DEPLOY_OPERATION)
 
     connection = Connection(module._socket_path)
     resource = BaseConfigurationResource(connection, module.check_mode)
     op_name = params['operation']
     try:
+        if params['bulk_data'] is not None:
+            resp, results, summary, changes = execute_bulk_operation(resource, op_name, params)
+            result = dict(changed=resource.config_changed, response=resp, results=results, summary=summary,
+                          ansible_facts=construct_bulk_ansible_facts(resp, module.params))
+            if changes and module._diff:
+                result['diff'] = construct_diff(changes)
+            add_plan(result, resource)
+            if summary[BulkSummary.FAILED]:
+                module.fail_json(msg='Failed to execute %s operation for %s of %s item(s)' %
+                                     (op_name, summary[BulkSummary.FAILED], summary[BulkSummary.TOTAL]), **result)
+            module.exit_json(**result)
+
+        if is_deployment:
+            resp, deployment = resource.deploy(params, params['wait_for_deployment'], params['deployment_timeout'],
+                                               params['skip_if_no_changes'])
+            module.exit_json(**add_plan(dict(changed=resource.config_changed, response=resp, deployment=deployment,
+                                             ansible_facts=construct_ansible_facts(resp, module.params)), resource))
+
         resp = resource.execute_operation(op_name, params)
-        module.exit_json(changed=resource.config_changed, response=resp,
-                         ansible_facts=construct_ansible_facts(resp, module.params))
-    except FtdInvalidOperationNameError as e:
-        module.fail_json(msg='Invalid operation name provided: %s' % e.operation_name)
-    except FtdConfigurationError as e:
-        module.fail_json(msg='Failed to execute %s operation because of the configuration error: %s' % (op_name, e.msg))
-    except FtdServerError as e:
-        module.fail_json(msg='Server returned an error trying to execute %s operation. Status code: %s. '
-                             'Server response: %s' % (op_name, e.code, e.response))
-    except FtdUnexpectedResponse as e:
-        module.fail_json(msg=e.args[0])
-    except ValidationError as e:
-        module.fail_json(msg=e.args[0])
+        result = add_changes(dict(changed=resource.config_changed, response=resp,
+                                  ansible_facts=construct_ansible_facts(resp, module.params)),
+                             resource.config_diff, module._diff)
+        module.exit_json(**add_plan(result, resource))
+    except BULK_ITEM_ERRORS as e:
+        module.fail_json(msg=get_error_message(op_name, e))
     except CheckModeException:
-        module.exit_json(changed=False)
+        module.exit_json(**add_plan(add_changes(dict(changed=resource.config_changed), resource.config_diff,
+                                                module._diff), resource))
 
 
 if __name__ == '__main__':
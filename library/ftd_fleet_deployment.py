@@ -0,0 +1,96 @@
+#!/usr/bin/python
+
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+
+from __future__ import absolute_import, division, print_function
+__metaclass__ = type
+
+
+ANSIBLE_METADATA = {'metadata_version': '1.1',
+                    'status': ['preview'],
+                    'supported_by': 'network'}
+
+DOCUMENTATION = """
+---
+module: ftd_fleet_deployment
+short_description: Deploys pending changes to many Cisco FTD devices at once
+description:
+  - Deploys pending changes to the given FTD devices from a single task on the controller and waits until all
+    deployments are finished. Deployments run on a limited number of devices at the same time. Polls of all
+    started deployment jobs are scheduled from a single loop and sent from a pool of C(concurrency) threads,
+    so the controller does not run a module per device and per poll.
+  - Devices are connected to with the C(httpapi) connection configured by their inventory variables, the same way
+    as in other tasks. Connections are opened only when the deployment on the device starts and are closed
+    as soon as it is finished.
+  - The module is implemented as an action plugin, so it should be executed once, e.g. on C(localhost).
+version_added: "2.7"
+author: "Cisco Systems, Inc."
+options:
+  devices:
+    description:
+      - Inventory hostnames of the devices to deploy pending changes to.
+    required: true
+    type: list
+  concurrency:
+    description:
+      - Maximum number of devices that are deployed to at the same time, which is also the number of requests
+        sent to devices at the same time.
+    type: int
+    default: 20
+  timeout:
+    description:
+      - Maximum number of seconds to wait for the deployment on a single device.
+    type: int
+    default: 600
+  skip_if_no_changes:
+    description:
+      - Does not start the deployment on devices that have no pending changes.
+    type: bool
+    default: false
+"""
+
+EXAMPLES = """
+- name: Deploy pending changes to all FTD devices, 50 devices at a time
+  hosts: localhost
+  gather_facts: false
+  tasks:
+    - ftd_fleet_deployment:
+        devices: "{{ groups['all'] }}"
+        concurrency: 50
+        skip_if_no_changes: true
+"""
+
+RETURN = """
+devices:
+  description: Results for every device keyed by the inventory hostname. Every result contains C(changed),
+    C(failed), C(skipped), the final C(state) of the deployment job, its C(duration) in seconds, the number
+    of C(polls), and C(msg) when the deployment has failed.
+  returned: always
+  type: dict
+summary:
+  description: Numbers of C(total), C(deployed), C(skipped) and C(failed) devices, and the C(duration) of the whole
+    deployment in seconds. In check mode, devices that would be deployed are counted as C(planned) instead of
+    C(deployed).
+  returned: always
+  type: dict
+msg:
+  description: The error message describing why the module failed.
+  returned: error
+  type: string
+"""
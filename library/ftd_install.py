@@ -191,10 +191,12 @@ from enum import Enum
 from six import iteritems
 
 try:
-    from ansible.module_utils.configuration import BaseConfigurationResource, ParamName, PATH_PARAMS_FOR_DEFAULT_OBJ
+    from ansible.module_utils.configuration import BaseConfigurationResource, ParamName, PATH_PARAMS_FOR_DEFAULT_OBJ, \
+        BulkItemResult
     from ansible.module_utils.device import HAS_KICK, FtdPlatformFactory, FtdModel
 except ImportError:
-    from module_utils.configuration import BaseConfigurationResource, ParamName, PATH_PARAMS_FOR_DEFAULT_OBJ
+    from module_utils.configuration import BaseConfigurationResource, ParamName, PATH_PARAMS_FOR_DEFAULT_OBJ, \
+        BulkItemResult
     from module_utils.device import HAS_KICK, FtdPlatformFactory, FtdModel
 
 REQUIRED_PARAMS_FOR_LOCAL_CONNECTION = ['device_ip', 'device_netmask', 'device_gateway', 'device_model', 'dns_server']
@@ -285,18 +287,38 @@ def check_that_update_is_needed(module, system_info):
 
 
 def check_management_and_dns_params(resource, params):
-    if not all([params['device_ip'], params['device_netmask'], params['device_gateway']]):
-        management_ip = resource.execute_operation(FtdOperations.GET_MANAGEMENT_IP_LIST.value, {})['items'][0]
+    is_management_ip_missing = not all([params['device_ip'], params['device_netmask'], params['device_gateway']])
+    is_dns_server_missing = not params['dns_server']
+
+    operations = []
+    if is_management_ip_missing:
+        operations.append((FtdOperations.GET_MANAGEMENT_IP_LIST.value, {}))
+    if is_dns_server_missing:
+        operations.append((FtdOperations.GET_DNS_SETTING_LIST.value, {}))
+    # the lists do not depend on each other, so they are fetched concurrently
+    responses = execute_operations(resource, operations)
+
+    if is_management_ip_missing:
+        management_ip = responses.pop(0)['items'][0]
         params['device_ip'] = params['device_ip'] or management_ip['ipv4Address']
         params['device_netmask'] = params['device_netmask'] or management_ip['ipv4NetMask']
         params['device_gateway'] = params['device_gateway'] or management_ip['ipv4Gateway']
-    if not params['dns_server']:
-        dns_setting = resource.execute_operation(FtdOperations.GET_DNS_SETTING_LIST.value, {})['items'][0]
+    if is_dns_server_missing:
+        dns_setting = responses.pop(0)['items'][0]
         dns_server_group_id = dns_setting['dnsServerGroup']['id']
         dns_server_group = resource.execute_operation(FtdOperations.GET_DNS_SERVER_GROUP.value,
                                                       {ParamName.PATH_PARAMS: {'objId': dns_server_group_id}})
         params['dns_server'] = dns_server_group['dnsServers'][0]['ipAddress']
 
 
+def execute_operations(resource, operations):
+    responses = []
+    for result in resource.send_general_requests(operations):
+        if BulkItemResult.ERROR in result:
+            raise result[BulkItemResult.ERROR]
+        responses.append(result[BulkItemResult.RESPONSE])
+    return responses
+
+
 if __name__ == '__main__':
     main()
@@ -20,8 +20,10 @@ try:
 except ImportError:
     from ordereddict import OrderedDict
 
+import hashlib
+import json
 import re
-from ansible.module_utils._text import to_text
+from ansible.module_utils._text import to_bytes, to_text
 from ansible.module_utils.common.collections import is_string
 
 INVALID_IDENTIFIER_SYMBOLS = r'[^a-zA-Z0-9_]'
@@ -43,6 +45,11 @@ class ResponseParams:
     RESPONSE = 'response'
 
 
+class ValidatedResponseParams:
+    VALIDATION_REPORT = 'validation_report'
+    RESPONSE = 'response'
+
+
 class FtdConfigurationError(Exception):
     def __init__(self, msg, obj=None):
         super(FtdConfigurationError, self).__init__(msg)
@@ -194,21 +201,150 @@ def equal_objects(d1, d2, compare_common_fields_only=True):
     :type compare_common_fields_only: bool
     :return: True if passed objects and their properties are equal. Otherwise, returns False.
     """
+    common_keys = set(d1) & set(d2) if compare_common_fields_only else None
+    # objects without common fields are compared by all their fields
+    keys = common_keys or None
 
-    def prepare_data_for_comparison(d, keys):
-        d = dict((k, v) for k, v in d.items() if k not in NON_COMPARABLE_PROPERTIES and v)
-        d = delete_ref_duplicates(d)
+    fields1 = _get_comparable_fields(d1, keys)
+    fields2 = _get_comparable_fields(d2, keys)
+    if len(fields1) != len(fields2):
+        return False
+    return equal_dicts(delete_ref_duplicates(fields1), delete_ref_duplicates(fields2), compare_by_reference=False)
 
-        if keys:
-            d = dict((k, v) for k, v in d.items() if k in keys)
 
-        return d
+class ComparableObject(object):
+    """
+    Canonical form of an object that is equal to other objects in the same way as in `equal_objects`. Non-comparable
+    and empty properties are dropped, references are collapsed to their identities (ids and types), duplicate
+    references are removed from arrays and strings are converted to text once, when the object is created.
+
+    Equal objects have equal fingerprints, so an object compared with many others (e.g., the desired state
+    compared with the objects existing on the device) is normalized only once, and every comparison is
+    a comparison of two digests. Normalizing and hashing both objects costs more than comparing them directly,
+    so a single pair of objects should be compared with `equal_objects` instead.
+    """
+
+    def __init__(self, obj):
+        self._keys = frozenset(obj)
+        self._fields = dict((k, _canonical_value(v, True)) for k, v in _get_comparable_fields(obj).items())
+        self._fingerprints = {}
+
+    @property
+    def keys(self):
+        return self._keys
+
+    def fingerprint(self, keys=None):
+        """
+        Returns the digest of comparable properties of the object.
+
+        :param keys: names of properties to include, all comparable properties are included when not specified
+        :type keys: frozenset
+        :return: the fingerprint
+        :rtype: str
+        """
+        if keys not in self._fingerprints:
+            fields = sorted((k, v) for k, v in self._fields.items() if keys is None or k in keys)
+            self._fingerprints[keys] = hashlib.sha1(to_bytes(json.dumps(fields, separators=(',', ':')))).hexdigest()
+        return self._fingerprints[keys]
+
+    def equals(self, other, compare_common_fields_only=True):
+        """
+        Checks whether the object is equal to the other one (see `equal_objects`).
+
+        :type other: ComparableObject
+        :type compare_common_fields_only: bool
+        :rtype: bool
+        """
+        keys = self._keys & other.keys if compare_common_fields_only else None
+        # objects without common fields are compared by all their fields
+        keys = keys or None
+        return self.fingerprint(keys) == other.fingerprint(keys)
+
+
+def _canonical_value(value, dedupe_refs=False):
+    # values of different types are never equal, so the type is a part of the canonical value
+    if is_string(value):
+        return 'text', to_text(value)
+
+    value_type = type(value)
+    if value_type is list:
+        if dedupe_refs:
+            value = _delete_ref_duplicates_from_list(value)
+        return 'list', [_canonical_value(i) for i in value]
+    elif value_type is dict:
+        if is_object_ref(value):
+            return 'ref', _canonical_value(value['id']), _canonical_value(value['type'])
+        return 'dict', sorted((k, _canonical_value(v, dedupe_refs)) for k, v in value.items())
+    else:
+        return value_type.__name__, value
+
+
+def _get_comparable_fields(obj, keys=None):
+    return dict((k, v) for k, v in obj.items()
+                if k not in NON_COMPARABLE_PROPERTIES and v and (keys is None or k in keys))
+
+
+class DiffKey:
+    BEFORE = 'before'
+    AFTER = 'after'
+
+
+def get_object_diff(d1, d2, compare_common_fields_only=True):
+    """
+    Finds properties that differ between two objects. Properties are compared the same way as in `equal_objects`,
+    so the diff is empty if and only if the objects are equal.
+
+    Paths of nested properties are joined with dots and list items are addressed by their indexes
+    (e.g., 'rules[2].name'). Lists of different lengths and references to different objects are reported
+    as a whole.
 
+    :param d1: the existing object
+    :type d1: dict
+    :param d2: the desired object
+    :type d2: dict
+    :type compare_common_fields_only: bool
+    :return: changed properties keyed by their paths, with 'before' and 'after' values
+    :rtype: dict
+    """
+    fields1 = _get_comparable_fields(d1)
+    fields2 = _get_comparable_fields(d2)
     common_keys = set(d1.keys()) & set(d2.keys()) if compare_common_fields_only else None
+    if common_keys:
+        fields1 = dict((k, v) for k, v in fields1.items() if k in common_keys)
+        fields2 = dict((k, v) for k, v in fields2.items() if k in common_keys)
+
+    diff = {}
+    _add_dict_diff('', fields1, fields2, diff, True)
+    return diff
+
+
+def _add_dict_diff(path, d1, d2, diff, dedupe_refs):
+    for key in sorted(set(d1) | set(d2)):
+        key_path = '{0}.{1}'.format(path, key) if path else key
+        if key in d1 and key in d2:
+            _add_value_diff(key_path, d1[key], d2[key], diff, dedupe_refs)
+        else:
+            diff[key_path] = {DiffKey.BEFORE: d1.get(key), DiffKey.AFTER: d2.get(key)}
+
 
-    d1 = prepare_data_for_comparison(d1, common_keys)
-    d2 = prepare_data_for_comparison(d2, common_keys)
-    return equal_dicts(d1, d2, compare_by_reference=False)
+def _add_value_diff(path, v1, v2, diff, dedupe_refs):
+    if _canonical_value(v1, dedupe_refs) == _canonical_value(v2, dedupe_refs):
+        return
+
+    if isinstance(v1, dict) and isinstance(v2, dict) and not (is_object_ref(v1) and is_object_ref(v2)):
+        _add_dict_diff(path, v1, v2, diff, dedupe_refs)
+        return
+
+    if isinstance(v1, list) and isinstance(v2, list):
+        if dedupe_refs:
+            v1 = _delete_ref_duplicates_from_list(v1)
+            v2 = _delete_ref_duplicates_from_list(v2)
+        if len(v1) == len(v2):
+            for index, (i1, i2) in enumerate(zip(v1, v2)):
+                _add_value_diff('{0}[{1}]'.format(path, index), i1, i2, diff, False)
+            return
+
+    diff[path] = {DiffKey.BEFORE: v1, DiffKey.AFTER: v2}
 
 
 def delete_ref_duplicates(d):
@@ -221,24 +357,25 @@ def delete_ref_duplicates(d):
     :return: dict without reference duplicates
     """
 
-    def delete_ref_duplicates_from_list(refs):
-        if all(type(i) == dict and is_object_ref(i) for i in refs):
-            unique_reference_map = OrderedDict()
-            for i in refs:
-                unique_reference_map[(i['id'], i['type'])] = i
-            return list(unique_reference_map.values())
-        else:
-            return refs
-
     if not d:
         return d
 
     modified_d = {}
     for k, v in d.items():
         if type(v) == list:
-            modified_d[k] = delete_ref_duplicates_from_list(v)
+            modified_d[k] = _delete_ref_duplicates_from_list(v)
         elif type(v) == dict:
             modified_d[k] = delete_ref_duplicates(v)
         else:
             modified_d[k] = v
     return modified_d
+
+
+def _delete_ref_duplicates_from_list(refs):
+    if all(type(i) == dict and is_object_ref(i) for i in refs):
+        unique_reference_map = OrderedDict()
+        for i in refs:
+            unique_reference_map[(i['id'], i['type'])] = i
+        return list(unique_reference_map.values())
+    else:
+        return refs
@@ -16,23 +16,37 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 import copy
+import json
+import time
+from collections import deque
 from functools import partial
 
-from ansible.module_utils.six import iteritems
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six import integer_types, iteritems, string_types
 
 try:
-    from ansible.module_utils.common import HTTPMethod, equal_objects, FtdConfigurationError, \
-        FtdServerError, ResponseParams, copy_identity_properties, FtdUnexpectedResponse
-    from ansible.module_utils.fdm_swagger_client import OperationField, ValidationError
+    from ansible.module_utils.common import HTTPMethod, equal_objects, get_object_diff, FtdConfigurationError, \
+        FtdServerError, ResponseParams, copy_identity_properties, FtdUnexpectedResponse, ValidatedResponseParams
+    from ansible.module_utils.fdm_swagger_client import OperationField, OperationParams, ValidationError
+    from ansible.module_utils.object_index import ObjectIndex, ObjectProp, get_index_key
 except ImportError:
-    from module_utils.common import HTTPMethod, equal_objects, FtdConfigurationError, \
-        FtdServerError, ResponseParams, copy_identity_properties, FtdUnexpectedResponse
-    from module_utils.fdm_swagger_client import OperationField, ValidationError
-
-DEFAULT_PAGE_SIZE = 10
+    from module_utils.common import HTTPMethod, equal_objects, get_object_diff, FtdConfigurationError, \
+        FtdServerError, ResponseParams, copy_identity_properties, FtdUnexpectedResponse, ValidatedResponseParams
+    from module_utils.fdm_swagger_client import OperationField, OperationParams, ValidationError
+    from module_utils.object_index import ObjectIndex, ObjectProp, get_index_key
+
+# FDM returns 10 items per page by default, which makes lookups on large tables very slow,
+# so iteration starts with a large page that is shrunk if the device fails to return it
+DEFAULT_PAGE_SIZE = 1000
+MIN_PAGE_SIZE = 10
 DEFAULT_OFFSET = 0
+# number of subsequent pages requested in a single batch by lookups that fetch all objects
+PAGE_PREFETCH_COUNT = 4
+SERVER_FILTER_SPECIAL_CHARS = (';', ':', '~')
+TIMEOUT_ERROR_MESSAGE = 'timed out'
 
 NO_CONTENT_STATUS = 204
+NOT_FOUND_STATUS = 404
 UNPROCESSABLE_ENTITY_STATUS = 422
 
 INVALID_UUID_ERROR_MESSAGE = "Validation failed due to an invalid UUID"
@@ -53,6 +67,20 @@ ADD_OPERATION_NOT_SUPPORTED_ERROR = (
 
 PATH_PARAMS_FOR_DEFAULT_OBJ = {'objId': 'default'}
 
+DEPLOY_OPERATION = 'addDeployment'
+GET_DEPLOYMENT_OPERATION = 'getDeployment'
+PENDING_CHANGES_OPERATION = 'getBaseEntityDiffList'
+DEPLOYED_STATE = 'DEPLOYED'
+DEFAULT_DEPLOYMENT_TIMEOUT = 600
+# deployments take from several seconds to several minutes, so the job is polled often at first and less often later
+DEPLOYMENT_POLL_INITIAL_DELAY = 1.0
+DEPLOYMENT_POLL_MAX_DELAY = 10.0
+DEPLOYMENT_POLL_BACKOFF_FACTOR = 1.5
+
+# operations that accept a list of objects in the body when this query param is set
+BULK_QUERY_PARAM = 'bulk'
+BULK_REQUEST_SIZE = 100
+
 
 class OperationNamePrefix:
     ADD = 'add'
@@ -64,6 +92,12 @@ class OperationNamePrefix:
 
 class QueryParams:
     FILTER = 'filter'
+    BULK = BULK_QUERY_PARAM
+
+
+class FilterKey:
+    NAME = 'name'
+    FTS = 'fts'
 
 
 class ParamName:
@@ -73,6 +107,74 @@ class ParamName:
     FILTERS = 'filters'
 
 
+class PageSize(object):
+    """
+    Keeps the number of items requested per page while iterating over a pageable resource. The page size is capped
+    by the maximum the device advertises in the `paging` part of its responses, and halved down to `MIN_PAGE_SIZE`
+    when the device fails to return a page. A single instance can be shared by several iterations over the same
+    resource, so subsequent iterations start with the already adjusted page size.
+    """
+
+    def __init__(self, limit=DEFAULT_PAGE_SIZE):
+        self.limit = limit
+
+    def cap(self, max_limit):
+        """
+        Reduces the page size to the maximum number of items the device returns per page.
+
+        :param max_limit: the page size advertised by the device
+        :type max_limit: int
+        :return: True if the page size was reduced, otherwise False
+        :rtype: bool
+        """
+        if max_limit and 0 < max_limit < self.limit:
+            self.limit = max_limit
+            return True
+        return False
+
+    def shrink(self):
+        """
+        Halves the page size unless it has already reached the minimum.
+
+        :return: True if the page size was reduced, otherwise False
+        :rtype: bool
+        """
+        min_limit = min(self.limit, MIN_PAGE_SIZE)
+        if self.limit <= min_limit:
+            return False
+        self.limit = max(self.limit // 2, min_limit)
+        return True
+
+
+class BulkItemResult:
+    CHANGED = 'changed'
+    RESPONSE = 'response'
+    ERROR = 'error'
+    DIFF = 'diff'
+
+
+class DeploymentResult:
+    SKIPPED = 'skipped'
+    STATE = 'state'
+    DURATION = 'duration'
+    POLLS = 'polls'
+
+
+class PlanAction:
+    ADD = 'add'
+    EDIT = 'edit'
+    DELETE = 'delete'
+
+
+class PlannedChange:
+    ACTION = 'action'
+    OPERATION = 'operation'
+    MODEL = 'model'
+    NAME = 'name'
+    ID = 'id'
+    CHANGES = 'changes'
+
+
 class CheckModeException(Exception):
     pass
 
@@ -83,6 +185,11 @@ class FtdInvalidOperationNameError(Exception):
         self.operation_name = operation_name
 
 
+# errors that fail a single item of a bulk operation without stopping the remaining items
+BULK_ITEM_ERRORS = (FtdInvalidOperationNameError, FtdConfigurationError, FtdServerError, FtdUnexpectedResponse,
+                    ValidationError)
+
+
 class OperationChecker(object):
 
     @classmethod
@@ -161,6 +268,22 @@ class OperationChecker(object):
         return operation_spec[OperationField.METHOD] == HTTPMethod.GET \
             and not operation_spec[OperationField.RETURN_MULTIPLE_ITEMS]
 
+    @classmethod
+    def is_bulk_operation(cls, operation_name, operation_spec):
+        """
+        Check if operation defined with 'operation_name' accepts a list of objects according to 'operation_spec'.
+
+        :param operation_name: name of the operation being called by the user
+        :type operation_name: str
+        :param operation_spec: specification of the operation being called by the user
+        :type operation_spec: dict
+        :return: True if the called operation supports the bulk mode, otherwise False
+        :rtype: bool
+        """
+        query_params = operation_spec.get(OperationField.PARAMETERS, {}).get(OperationParams.QUERY, {})
+        # bulk operations work with the list URL, while operations on a single object have its ID in the URL
+        return QueryParams.BULK in query_params and '{objId}' not in operation_spec[OperationField.URL]
+
     @classmethod
     def is_upsert_operation(cls, operation_name):
         """
@@ -209,14 +332,31 @@ class OperationChecker(object):
 
 class BaseConfigurationResource(object):
 
-    def __init__(self, conn, check_mode=False):
+    def __init__(self, conn, check_mode=False, use_object_index=None):
         self._conn = conn
         self.config_changed = False
+        # changed properties of the object edited by the last operation (see `get_object_diff`)
+        self.config_diff = None
         self._operation_spec_cache = {}
         self._models_operations_specs_cache = {}
         self._check_mode = check_mode
         self._operation_checker = OperationChecker
         self._system_info = None
+        self._page_sizes = {}
+        # the object index is kept by the connection plugin, so it lives as long as the persistent connection;
+        # unless given, whether it is enabled is asked from the connection once an operation needs the index
+        self._object_index_enabled = use_object_index
+        # changes that add, edit and delete operations would make, recorded instead of being sent in check mode
+        self.planned_changes = []
+        # objects fetched in check mode are indexed for the current module run only when the object index
+        # of the connection is disabled, as the connection index is not kept up to date by other tasks then
+        self._snapshot_index = ObjectIndex()
+
+    @property
+    def _use_object_index(self):
+        if self._object_index_enabled is None:
+            self._object_index_enabled = bool(self._conn.is_object_index_enabled())
+        return self._object_index_enabled
 
     def execute_operation(self, op_name, params):
         """
@@ -257,7 +397,7 @@ class BaseConfigurationResource(object):
         elif self._operation_checker.is_delete_operation(op_name, op_spec):
             resp = self.delete_object(op_name, params)
         elif self._operation_checker.is_find_by_filter_operation(op_name, params, op_spec):
-            resp = list(self.get_objects_by_filter(op_name, params))
+            resp = list(self.get_objects_by_filter(op_name, params, PAGE_PREFETCH_COUNT))
         else:
             resp = self.send_general_request(op_name, params)
         return resp
@@ -275,7 +415,31 @@ class BaseConfigurationResource(object):
                 self._operation_spec_cache.setdefault(op_name, op_spec)
         return self._models_operations_specs_cache[model_name]
 
-    def get_objects_by_filter(self, operation_name, params):
+    def get_objects_by_filter(self, operation_name, params, prefetch_count=0):
+        """
+        Returns a generator of objects that match the given filters. See `get_object_pages_by_filter` for details.
+        """
+        return (obj for page in self.get_object_pages_by_filter(operation_name, params, prefetch_count)
+                for obj in page)
+
+    def get_object_pages_by_filter(self, operation_name, params, prefetch_count=0):
+        """
+        Fetches objects page by page and returns a generator of lists with objects that match `filters`
+        from `params`. Filters supported by the operation are sent to the device to reduce the number of returned
+        objects, and all filters are applied on returned objects. Every list contains matching objects from
+        a single page and can be empty.
+
+        :param operation_name: name of the get list operation
+        :type operation_name: str
+        :param params: params of the operation that can contain `filters`
+        :type params: dict
+        :param prefetch_count: number of subsequent pages requested in a single batch, which the connection sends
+            concurrently; pages are requested one by one by default, so lookups that stop early do not request
+            pages they never use
+        :type prefetch_count: int
+        :return: an iterator containing lists of matching objects
+        :rtype: iterator of list
+        """
 
         def match_filters(filter_params, obj):
             for k, v in iteritems(filter_params):
@@ -288,14 +452,40 @@ class BaseConfigurationResource(object):
         url_params = {ParamName.QUERY_PARAMS: dict(query_params), ParamName.PATH_PARAMS: dict(path_params)}
 
         filters = params.get(ParamName.FILTERS) or {}
-        if QueryParams.FILTER not in url_params[ParamName.QUERY_PARAMS] and 'name' in filters:
-            # most endpoints only support filtering by name, so remaining `filters` are applied on returned objects
-            url_params[ParamName.QUERY_PARAMS][QueryParams.FILTER] = self._stringify_name_filter(filters)
-
-        item_generator = iterate_over_pageable_resource(
-            partial(self.send_general_request, operation_name=operation_name), url_params
+        if QueryParams.FILTER not in url_params[ParamName.QUERY_PARAMS]:
+            server_filter = self._stringify_server_filter(operation_name, filters)
+            if server_filter:
+                url_params[ParamName.QUERY_PARAMS][QueryParams.FILTER] = server_filter
+
+        # page size adjustments are reused by subsequent lookups unless the limit is set explicitly in the task
+        page_size = None if 'limit' in query_params else self._page_sizes.setdefault(operation_name, PageSize())
+        page_generator = iterate_over_pageable_resource_pages(
+            partial(self.send_general_request, operation_name=operation_name), url_params, page_size,
+            partial(self._get_pages, operation_name), prefetch_count
         )
-        return (i for i in item_generator if match_filters(filters, i))
+        return ([i for i in page_items if match_filters(filters, i)] for page_items in page_generator)
+
+    def _get_pages(self, operation_name, params_list):
+        results = self.send_general_requests([(operation_name, params) for params in params_list])
+        return [result.get(BulkItemResult.ERROR) or result[BulkItemResult.RESPONSE] for result in results]
+
+    def _stringify_server_filter(self, operation_name, filters):
+        """
+        Builds the value of the 'filter' query param. The name filter is sent on its own in the form supported
+        by the device version, as the full-text search used since 6.4.0 cannot be combined with other filters.
+        Without the name, equality filters supported by the operation are sent, e.g. 'subType:HOST;value:1.1.1.1'.
+        Supported filter keys are listed in the API specification. Values that would break the filter syntax
+        are matched on returned objects only.
+        """
+        if FilterKey.NAME in filters and _is_server_filter_value(filters[FilterKey.NAME]):
+            # the name is the most selective filter, so it is preferred when filters cannot be combined
+            return self._stringify_name_filter(filters)
+
+        op_spec = self.get_operation_spec(operation_name) or {}
+        supported_keys = set(op_spec.get(OperationField.FILTER_KEYS) or []) - {FilterKey.NAME, FilterKey.FTS}
+        server_filters = [(k, v) for k, v in sorted(iteritems(filters))
+                          if k in supported_keys and _is_server_filter_value(v)]
+        return ';'.join('%s:%s' % (k, v) for k, v in server_filters)
 
     def _stringify_name_filter(self, filters):
         build_version = self.get_build_version()
@@ -318,14 +508,21 @@ class BaseConfigurationResource(object):
         def is_duplicate_name_error(err):
             return err.code == UNPROCESSABLE_ENTITY_STATUS and DUPLICATE_NAME_ERROR_MESSAGE in str(err)
 
+        if self._check_mode:
+            return self._plan_add(operation_name, params)
+
         try:
-            return self.send_general_request(operation_name, params)
+            new_object = self.send_general_request(operation_name, params)
         except FtdServerError as e:
+            self._update_object_index(self._conn.invalidate_object_index, operation_name, params)
             if is_duplicate_name_error(e):
                 return self._check_equality_with_existing_object(operation_name, params, e)
             else:
                 raise e
 
+        self._update_object_index(self._conn.update_indexed_object, operation_name, params, new_object)
+        return new_object
+
     def _check_equality_with_existing_object(self, operation_name, params, e):
         """
         Looks for an existing object that caused "object duplicate" error and
@@ -357,15 +554,80 @@ class BaseConfigurationResource(object):
         if not params.get(ParamName.FILTERS):
             params[ParamName.FILTERS] = {'name': data['name']}
 
-        obj = None
-        filtered_objs = self.get_objects_by_filter(get_list_operation, params)
-
-        for i, obj in enumerate(filtered_objs):
-            if i > 0:
+        # check mode evaluates all objects against the snapshot of the model fetched at once
+        if (self._use_object_index or self._check_mode) and list(params[ParamName.FILTERS]) == [FilterKey.NAME]:
+            return self._find_indexed_object(model_name, get_list_operation, params)
+
+        # FDM rejects objects with duplicate names, so once an object with the given name is found, no other
+        # object can match; duplicates within the already received page are still reported
+        is_name_lookup = 'name' in params[ParamName.FILTERS]
+        found_objs = []
+        for page_objs in self.get_object_pages_by_filter(get_list_operation, params):
+            found_objs.extend(page_objs)
+            if len(found_objs) > 1:
                 raise FtdConfigurationError(MULTIPLE_DUPLICATES_FOUND_ERROR)
-            obj = obj
+            if found_objs and is_name_lookup:
+                break
+
+        return found_objs[0] if found_objs else None
+
+    def _find_indexed_object(self, model_name, get_list_operation, params):
+        """
+        Looks up the object by name in the object index kept by the connection (or in the snapshot index in check
+        mode). If objects of the model are not indexed yet, all of them are fetched from the device and indexed first.
+        """
+        path_params = params.get(ParamName.PATH_PARAMS) or {}
+        index_key = get_index_key(model_name, path_params)
+        name = params[ParamName.FILTERS][FilterKey.NAME]
 
-        return obj
+        if self._use_object_index:
+            is_indexed, obj = self._conn.get_indexed_object(index_key, name)
+        else:
+            is_indexed, obj = self._snapshot_index.get(index_key, name)
+        if is_indexed:
+            return obj
+
+        objects = self._index_model_objects(get_list_operation, index_key, path_params)
+        found_objs = [o for o in objects if o.get(FilterKey.NAME) == name]
+        if len(found_objs) > 1:
+            raise FtdConfigurationError(MULTIPLE_DUPLICATES_FOUND_ERROR)
+        return found_objs[0] if found_objs else None
+
+    def _find_indexed_object_by_id(self, model_name, path_params):
+        """
+        Looks up the object referenced by `objId` path param among all objects of the model, which are fetched
+        and indexed at once, so objects edited or deleted in check mode are not fetched one by one.
+        """
+        get_list_operation = self._find_get_list_operation(model_name)
+        obj_id = path_params.get('objId')
+        if not get_list_operation or obj_id is None:
+            return None
+
+        index_key = get_index_key(model_name, path_params)
+        if self._use_object_index:
+            is_indexed, obj = self._conn.get_indexed_object_by_id(index_key, obj_id)
+        else:
+            is_indexed, obj = self._snapshot_index.get_by_id(index_key, obj_id)
+        if is_indexed:
+            return obj
+
+        objects = self._index_model_objects(get_list_operation, index_key, _get_bulk_path_params(path_params))
+        return next((o for o in objects if o.get(ObjectProp.ID) == obj_id), None)
+
+    def _index_model_objects(self, get_list_operation, index_key, path_params):
+        objects = list(self.get_objects_by_filter(get_list_operation, {ParamName.PATH_PARAMS: path_params},
+                                                  PAGE_PREFETCH_COUNT))
+        if self._use_object_index:
+            self._conn.index_objects(index_key, objects)
+        else:
+            self._snapshot_index.populate(index_key, objects)
+        return objects
+
+    def _update_object_index(self, index_method, operation_name, params, *args):
+        # the index keeps objects as they are on the device, so it is not updated with planned changes
+        if not self._check_mode and self._use_object_index:
+            model_name = self.get_operation_spec(operation_name)[OperationField.MODEL_NAME]
+            index_method(get_index_key(model_name, params.get(ParamName.PATH_PARAMS)), *args)
 
     def _find_get_list_operation(self, model_name):
         operations = self.get_operation_specs_by_model_name(model_name) or {}
@@ -383,51 +645,215 @@ class BaseConfigurationResource(object):
         def is_invalid_uuid_error(err):
             return err.code == UNPROCESSABLE_ENTITY_STATUS and INVALID_UUID_ERROR_MESSAGE in str(err)
 
+        if self._check_mode:
+            return self._plan_delete(operation_name, params)
+
+        obj_id = (params.get(ParamName.PATH_PARAMS) or {}).get('objId')
         try:
-            return self.send_general_request(operation_name, params)
+            resp = self.send_general_request(operation_name, params)
         except FtdServerError as e:
             if is_invalid_uuid_error(e):
+                self._update_object_index(self._conn.remove_indexed_object, operation_name, params, obj_id)
                 return {'status': 'Referenced object does not exist'}
             else:
+                self._update_object_index(self._conn.invalidate_object_index, operation_name, params)
                 raise e
 
+        self._update_object_index(self._conn.remove_indexed_object, operation_name, params, obj_id)
+        return resp
+
     def edit_object(self, operation_name, params):
         existing_object, _, _ = data, _, path_params = _get_user_params(params)
 
         model_name = self.get_operation_spec(operation_name)[OperationField.MODEL_NAME]
         get_operation = self._find_get_operation(model_name)
 
+        if self._check_mode:
+            self._validate_request(operation_name, params)
+
         if get_operation:
-            existing_object = self.send_general_request(get_operation, {ParamName.PATH_PARAMS: path_params})
+            existing_object = self._get_existing_object(model_name, get_operation, path_params)
             if not existing_object:
                 raise FtdConfigurationError('Referenced object does not exist')
-            elif equal_objects(existing_object, data):
+            # the index is dropped if the object has been changed since it was indexed
+            self._update_object_index(self._conn.verify_indexed_object, operation_name, params, existing_object)
+            diff = get_object_diff(existing_object, data)
+            if not diff:
                 return existing_object
+            self.config_diff = diff
 
-        new_object = self.send_general_request(operation_name, params)
+        if self._check_mode:
+            planned_object = dict(existing_object)
+            planned_object.update(data)
+            return self._plan_change(PlanAction.EDIT, operation_name, params, planned_object, existing_object)
+
+        try:
+            new_object = self.send_general_request(operation_name, params)
+        except FtdServerError:
+            self._update_object_index(self._conn.invalidate_object_index, operation_name, params)
+            raise
+
+        self._update_object_index(self._conn.update_indexed_object, operation_name, params, new_object)
         return new_object if self.config_changed else existing_object
 
-    def send_general_request(self, operation_name, params):
-        def stop_if_check_mode():
-            if self._check_mode:
-                raise CheckModeException()
+    def _get_existing_object(self, model_name, get_operation, path_params):
+        existing_object = self._find_indexed_object_by_id(model_name, path_params) if self._check_mode else None
+        if existing_object is None:
+            existing_object = self.send_general_request(get_operation, {ParamName.PATH_PARAMS: path_params})
+        return existing_object
 
-        self.validate_params(operation_name, params)
-        stop_if_check_mode()
+    def _plan_add(self, operation_name, params):
+        """
+        Plans the add operation in check mode. An object with the same name is looked up in the snapshot
+        of the model, and the operation results in no change when the object is equal to the added one, or fails
+        like the device would when the object differs.
+        """
+        self._validate_request(operation_name, params)
+
+        data = params.get(ParamName.DATA) or {}
+        model_name = self.get_operation_spec(operation_name)[OperationField.MODEL_NAME]
+        if FilterKey.NAME in data:
+            existing_obj = self._find_object_matching_params(model_name, params)
+            if existing_obj is not None:
+                if equal_objects(existing_obj, data):
+                    return existing_obj
+                raise FtdConfigurationError(DUPLICATE_ERROR, existing_obj)
+        return self._plan_change(PlanAction.ADD, operation_name, params, dict(data))
+
+    def _plan_delete(self, operation_name, params):
+        """
+        Plans the delete operation in check mode. The operation results in no change when the referenced object
+        does not exist, the same way as `delete_object` does.
+        """
+        self._validate_request(operation_name, params)
+
+        path_params = params.get(ParamName.PATH_PARAMS) or {}
+        model_name = self.get_operation_spec(operation_name)[OperationField.MODEL_NAME]
+        get_operation = self._find_get_operation(model_name)
+        existing_object = None
+        if get_operation:
+            try:
+                existing_object = self._get_existing_object(model_name, get_operation, path_params)
+            except FtdServerError as e:
+                if e.code not in (NOT_FOUND_STATUS, UNPROCESSABLE_ENTITY_STATUS):
+                    raise
+            if not existing_object:
+                return {'status': 'Referenced object does not exist'}
+        return self._plan_change(PlanAction.DELETE, operation_name, params, {}, existing_object)
 
+    def _plan_change(self, action, operation_name, params, response, existing_object=None):
+        """
+        Records the change that the operation would make instead of sending it in check mode.
+
+        :param action: one of `PlanAction` values
+        :type action: str
+        :param operation_name: name of the add, edit or delete operation
+        :type operation_name: str
+        :param params: params of the operation
+        :type params: dict
+        :param response: the response the device is expected to return
+        :type response: dict
+        :param existing_object: the object on the device that would be edited or deleted
+        :type existing_object: dict
+        :return: the expected response
+        :rtype: dict
+        """
+        obj = existing_object or params.get(ParamName.DATA) or {}
+        planned_change = {
+            PlannedChange.ACTION: action,
+            PlannedChange.OPERATION: operation_name,
+            PlannedChange.MODEL: self.get_operation_spec(operation_name)[OperationField.MODEL_NAME],
+            PlannedChange.NAME: obj.get(ObjectProp.NAME),
+            PlannedChange.ID: obj.get(ObjectProp.ID) or (params.get(ParamName.PATH_PARAMS) or {}).get('objId')
+        }
+        if action == PlanAction.EDIT and self.config_diff:
+            planned_change[PlannedChange.CHANGES] = self.config_diff
+        self.planned_changes.append(planned_change)
+        self.config_changed = True
+        return response
+
+    def _validate_request(self, operation_name, params):
+        data, query_params, path_params = _get_user_params(params)
+        op_spec = self.get_operation_spec(operation_name)
+        validated_response = self._conn.validate_and_send_request(operation_name, op_spec[OperationField.URL],
+                                                                  op_spec[OperationField.METHOD], data, path_params,
+                                                                  query_params, True)
+        _raise_for_validation_report(validated_response[ValidatedResponseParams.VALIDATION_REPORT])
+
+    def send_general_request(self, operation_name, params):
         data, query_params, path_params = _get_user_params(params)
         op_spec = self.get_operation_spec(operation_name)
         url, method = op_spec[OperationField.URL], op_spec[OperationField.METHOD]
 
-        return self._send_request(url, method, data, path_params, query_params)
+        return self._send_request(url, method, data, path_params, query_params, operation_name=operation_name)
 
-    def _send_request(self, url_path, http_method, body_params=None, path_params=None, query_params=None):
+    def send_general_requests(self, operations):
+        """
+        Validates and sends requests of independent operations in a single call to the connection. Requests with
+        valid params are sent concurrently.
+
+        :param operations: tuples of an operation name and its params
+        :type operations: list
+        :return: a result for every operation, containing 'changed' and either 'response' or 'error' keys
+        :rtype: list
+        """
+        requests = self._build_requests(operations, with_operation_name=True)
+        # in check mode, the batch is sent only when none of its requests changes the configuration
+        check_mode = self._check_mode and any(r['http_method'] != HTTPMethod.GET for r in requests)
+        validated_responses = self._conn.validate_and_send_requests(requests, check_mode) if requests else []
+        if check_mode:
+            for validated_response in validated_responses:
+                _raise_for_validation_report(validated_response[ValidatedResponseParams.VALIDATION_REPORT])
+            raise CheckModeException()
+
+        return [self._execute_bulk_item(self._handle_validated_response, request['http_method'], validated_response)
+                for request, validated_response in zip(requests, validated_responses)]
+
+    def _send_requests(self, operations):
+        requests = self._build_requests(operations)
+        responses = self._conn.send_requests(requests) if requests else []
+        return [self._execute_bulk_item(self._handle_response, request['http_method'], response)
+                for request, response in zip(requests, responses)]
+
+    def _build_requests(self, operations, with_operation_name=False):
+        requests = []
+        for operation_name, params in operations:
+            data, query_params, path_params = _get_user_params(params)
+            op_spec = self.get_operation_spec(operation_name)
+            request = dict(url_path=op_spec[OperationField.URL], http_method=op_spec[OperationField.METHOD],
+                           body_params=data, path_params=path_params, query_params=query_params)
+            if with_operation_name:
+                request['operation_name'] = operation_name
+            requests.append(request)
+        return requests
+
+    def _send_request(self, url_path, http_method, body_params=None, path_params=None, query_params=None,
+                      operation_name=None):
+        if operation_name is None:
+            response = self._conn.send_request(url_path=url_path, http_method=http_method, body_params=body_params,
+                                               path_params=path_params, query_params=query_params)
+            return self._handle_response(http_method, response)
+
+        # params of the operation are validated by the plugin in the same call as the request is sent;
+        # in check mode, only requests that do not change the configuration are sent
+        check_mode = self._check_mode and http_method != HTTPMethod.GET
+        validated_response = self._conn.validate_and_send_request(operation_name, url_path, http_method,
+                                                                  body_params, path_params, query_params,
+                                                                  check_mode)
+        if check_mode:
+            _raise_for_validation_report(validated_response[ValidatedResponseParams.VALIDATION_REPORT])
+            raise CheckModeException()
+        return self._handle_validated_response(http_method, validated_response)
+
+    def _handle_validated_response(self, http_method, validated_response):
+        _raise_for_validation_report(validated_response[ValidatedResponseParams.VALIDATION_REPORT])
+        return self._handle_response(http_method, validated_response[ValidatedResponseParams.RESPONSE])
+
+    def _handle_response(self, http_method, response):
         def raise_for_failure(resp):
             if not resp[ResponseParams.SUCCESS]:
                 raise FtdServerError(resp[ResponseParams.RESPONSE], resp[ResponseParams.STATUS_CODE])
 
-        response = self._conn.send_request(url_path=url_path, http_method=http_method, body_params=body_params,
-                                           path_params=path_params, query_params=query_params)
         raise_for_failure(response)
 
         is_unsafe_method = http_method != HTTPMethod.GET
@@ -437,27 +863,12 @@ class BaseConfigurationResource(object):
         return response[ResponseParams.RESPONSE]
 
     def validate_params(self, operation_name, params):
-        report = {}
         op_spec = self.get_operation_spec(operation_name)
         data, query_params, path_params = _get_user_params(params)
 
-        def validate(validation_method, field_name, user_params):
-            key = 'Invalid %s provided' % field_name
-            try:
-                is_valid, validation_report = validation_method(operation_name, user_params)
-                if not is_valid:
-                    report[key] = validation_report
-            except Exception as e:
-                report[key] = str(e)
-            return report
-
-        validate(self._conn.validate_query_params, ParamName.QUERY_PARAMS, query_params)
-        validate(self._conn.validate_path_params, ParamName.PATH_PARAMS, path_params)
-        if is_post_request(op_spec) or is_put_request(op_spec):
-            validate(self._conn.validate_data, ParamName.DATA, data)
-
-        if report:
-            raise ValidationError(report)
+        report = get_validation_report(self._conn, operation_name, op_spec[OperationField.METHOD], data,
+                                       path_params, query_params)
+        _raise_for_validation_report(report)
 
     @staticmethod
     def _get_operation_name(checker, operations):
@@ -471,12 +882,16 @@ class BaseConfigurationResource(object):
 
     def _edit_upserted_object(self, model_operations, existing_object, params):
         edit_op_name = self._get_operation_name(self._operation_checker.is_edit_operation, model_operations)
+        self._set_upserted_object_identity(existing_object, params)
+        return self.edit_object(edit_op_name, params)
+
+    @staticmethod
+    def _set_upserted_object_identity(existing_object, params):
         _set_default(params, 'path_params', {})
         _set_default(params, 'data', {})
 
         params['path_params']['objId'] = existing_object['id']
         copy_identity_properties(existing_object, params['data'])
-        return self.edit_object(edit_op_name, params)
 
     def upsert_object(self, op_name, params):
         """
@@ -505,12 +920,357 @@ class BaseConfigurationResource(object):
 
         existing_obj = self._find_object_matching_params(model_name, params)
         if existing_obj:
-            equal_to_existing_obj = equal_objects(existing_obj, params[ParamName.DATA])
-            return existing_obj if equal_to_existing_obj \
-                else self._edit_upserted_object(model_operations, existing_obj, params)
+            diff = get_object_diff(existing_obj, params[ParamName.DATA])
+            if not diff:
+                return existing_obj
+            self.config_diff = diff
+            return self._edit_upserted_object(model_operations, existing_obj, params)
         else:
             return self._add_upserted_object(model_operations, params)
 
+    def deploy(self, params, wait=True, timeout=DEFAULT_DEPLOYMENT_TIMEOUT, skip_if_no_changes=False):
+        """
+        Starts deployment of pending changes and, when `wait` is set, polls the deployment job until it is finished.
+        The job is polled within the same call, with delays growing from `DEPLOYMENT_POLL_INITIAL_DELAY` to
+        `DEPLOYMENT_POLL_MAX_DELAY` seconds. The job is started but not polled in check mode.
+
+        :param params: params of the deployment operation
+        :type params: dict
+        :param wait: wait until the deployment is finished
+        :type wait: bool
+        :param timeout: maximum number of seconds to wait for
+        :type timeout: int
+        :param skip_if_no_changes: do not start the deployment when there are no pending changes
+        :type skip_if_no_changes: bool
+        :return: a tuple of the deployment job (None when the deployment is skipped) and a dict with the final
+            state, the duration in seconds and the number of polls, keyed by `DeploymentResult` values
+        :rtype: tuple
+        """
+        started_at = time.time()
+        result = {DeploymentResult.SKIPPED: False, DeploymentResult.STATE: None, DeploymentResult.DURATION: 0,
+                  DeploymentResult.POLLS: 0}
+        deployment = self.start_deployment(params, skip_if_no_changes)
+        if deployment is None:
+            result[DeploymentResult.SKIPPED] = True
+            return None, result
+
+        delay = DEPLOYMENT_POLL_INITIAL_DELAY
+        while wait and not self._check_mode and not is_job_finished(deployment):
+            remaining = started_at + timeout - time.time()
+            if remaining <= 0:
+                raise FtdConfigurationError(
+                    'Deployment {0} has not finished in {1} seconds. Last known state: {2}'.format(
+                        deployment.get('id'), timeout, deployment.get('state')), deployment)
+            time.sleep(min(delay, remaining))
+            delay = get_next_poll_delay(delay)
+            deployment = self.get_deployment(deployment)
+            result[DeploymentResult.POLLS] += 1
+
+        result[DeploymentResult.STATE] = deployment.get('state')
+        result[DeploymentResult.DURATION] = round(time.time() - started_at, 1)
+        if wait and is_job_finished(deployment) and deployment.get('state') != DEPLOYED_STATE:
+            raise FtdConfigurationError(
+                'Deployment {0} finished in the {1} state in {2} seconds: {3}'.format(
+                    deployment.get('id'), deployment.get('state'), result[DeploymentResult.DURATION],
+                    deployment.get('statusMessages')), deployment)
+        return deployment, result
+
+    def start_deployment(self, params, skip_if_no_changes=False):
+        """
+        Starts deployment of pending changes without waiting for it.
+
+        :param params: params of the deployment operation
+        :type params: dict
+        :param skip_if_no_changes: do not start the deployment when there are no pending changes
+        :type skip_if_no_changes: bool
+        :return: the deployment job, or None when the deployment is skipped
+        :rtype: dict
+        """
+        if skip_if_no_changes and not self._has_pending_changes():
+            return None
+        return self.crud_operation(DEPLOY_OPERATION, params)
+
+    def get_deployment(self, deployment):
+        return self.send_general_request(GET_DEPLOYMENT_OPERATION, {ParamName.PATH_PARAMS: {'objId': deployment['id']}})
+
+    def _has_pending_changes(self):
+        if self.get_operation_spec(PENDING_CHANGES_OPERATION) is None:
+            raise FtdInvalidOperationNameError(PENDING_CHANGES_OPERATION)
+        # a single changed entity is enough to tell that there is something to deploy
+        pending_changes = self.send_general_request(PENDING_CHANGES_OPERATION,
+                                                    {ParamName.QUERY_PARAMS: {'limit': 1}})
+        return bool(pending_changes.get('items'))
+
+    def execute_bulk_operation(self, op_name, params_list):
+        """
+        Executes the operation for every item of `params_list`. Objects created by add and upsert operations, and
+        objects updated by upsert operations are sent in batches when the model has bulk operations (see
+        `OperationChecker.is_bulk_operation`). If a batch fails, its objects are sent one by one, so errors are
+        reported for the failed items only, and objects created or updated by the failed batch are recognized
+        as existing ones.
+
+        :param op_name: name of the operation being called by the user
+        :type op_name: str
+        :param params_list: params for every item
+        :type params_list: list
+        :return: a result for every item, containing 'changed' and either 'response' or 'error' keys
+        :rtype: list
+        """
+        results = [None] * len(params_list)
+        add_batches = BulkBatches()
+        edit_batches = BulkBatches()
+        edit_items = []
+
+        def execute_item(index, params):
+            if self._operation_checker.is_upsert_operation(op_name):
+                return self._upsert_or_add_to_batches(op_name, index, params, add_batches, edit_batches)
+
+            op_spec = self.get_operation_spec(op_name)
+            if op_spec and self._operation_checker.is_add_operation(op_name, op_spec) and \
+                    self._operation_checker.is_bulk_operation(op_name, op_spec):
+                add_batches.add(op_name, op_name, self.add_object, index, params)
+                return None
+            if op_spec and self._operation_checker.is_edit_operation(op_name, op_spec) and \
+                    not self._operation_checker.is_bulk_operation(op_name, op_spec):
+                edit_items.append((index, params))
+                return None
+            return self.crud_operation(op_name, params)
+
+        for index, params in enumerate(params_list):
+            results[index] = self._execute_bulk_item(execute_item, index, params)
+
+        for batches in (add_batches, edit_batches):
+            for batch in batches:
+                self._send_batch(batch, results)
+        self._edit_objects(op_name, edit_items, results)
+        return results
+
+    def _edit_objects(self, operation_name, items, results):
+        """
+        Edits independent objects like `edit_object` does, but fetches the objects and sends the changed ones
+        concurrently. Items that edit an object already edited by a previous item are executed one by one
+        afterwards, as their result depends on the previous edit.
+        """
+        concurrent_items = []
+        dependent_items = []
+        edited_objects = set()
+        for index, params in self._validate_bulk_items(operation_name, items, results):
+            path_params_key = json.dumps(_get_user_params(params)[2], sort_keys=True)
+            (dependent_items if path_params_key in edited_objects else concurrent_items).append((index, params))
+            edited_objects.add(path_params_key)
+        if not concurrent_items:
+            return
+        if self._check_mode:
+            # edited objects are looked up in the snapshot of the model, so nothing is sent concurrently
+            for index, params in concurrent_items + dependent_items:
+                results[index] = self._execute_bulk_item(self.edit_object, operation_name, params)
+            return
+
+        model_name = self.get_operation_spec(operation_name)[OperationField.MODEL_NAME]
+        get_operation = self._find_get_operation(model_name)
+        changed_items = []
+        if get_operation:
+            get_results = self._send_requests([(get_operation, {ParamName.PATH_PARAMS: _get_user_params(params)[2]})
+                                               for _, params in concurrent_items])
+            for (index, params), get_result in zip(concurrent_items, get_results):
+                existing_object = get_result.get(BulkItemResult.RESPONSE)
+                if BulkItemResult.ERROR in get_result:
+                    results[index] = get_result
+                elif not existing_object:
+                    results[index] = {BulkItemResult.CHANGED: False,
+                                      BulkItemResult.ERROR: FtdConfigurationError('Referenced object does not exist')}
+                else:
+                    self._update_object_index(self._conn.verify_indexed_object, operation_name, params,
+                                              existing_object)
+                    diff = get_object_diff(existing_object, _get_user_params(params)[0])
+                    if not diff:
+                        results[index] = {BulkItemResult.CHANGED: False, BulkItemResult.RESPONSE: existing_object}
+                    else:
+                        results[index] = {BulkItemResult.CHANGED: False, BulkItemResult.DIFF: diff}
+                        changed_items.append((index, params, existing_object))
+        else:
+            changed_items = [(index, params, _get_user_params(params)[0]) for index, params in concurrent_items]
+
+        edit_results = self._send_requests([(operation_name, params) for _, params, _ in changed_items])
+        for (index, params, existing_object), edit_result in zip(changed_items, edit_results):
+            if BulkItemResult.ERROR in edit_result:
+                self._update_object_index(self._conn.invalidate_object_index, operation_name, params)
+            else:
+                self._update_object_index(self._conn.update_indexed_object, operation_name, params,
+                                          edit_result[BulkItemResult.RESPONSE])
+                if not edit_result[BulkItemResult.CHANGED]:
+                    edit_result[BulkItemResult.RESPONSE] = existing_object
+            results[index] = _with_diff(edit_result, results[index])
+
+        for index, params in dependent_items:
+            results[index] = self._execute_bulk_item(self.edit_object, operation_name, params)
+
+    def _upsert_or_add_to_batches(self, op_name, index, params, add_batches, edit_batches):
+        model_name = op_name[len(OperationNamePrefix.UPSERT):]
+        if not self._conn.get_model_spec(model_name):
+            raise FtdInvalidOperationNameError(op_name)
+        model_operations = self.get_operation_specs_by_model_name(model_name)
+        if not self._operation_checker.is_upsert_operation_supported(model_operations):
+            raise FtdInvalidOperationNameError(op_name)
+
+        existing_obj = self._find_object_matching_params(model_name, params)
+        if existing_obj:
+            diff = get_object_diff(existing_obj, params[ParamName.DATA])
+            if not diff:
+                return existing_obj
+            self.config_diff = diff
+
+        bulk_op_name = self._get_operation_name(
+            lambda name, spec: self._operation_checker.is_bulk_operation(name, spec) and (
+                is_put_request(spec) if existing_obj else is_post_request(spec)),
+            model_operations)
+        if existing_obj:
+            if not bulk_op_name:
+                return self._edit_upserted_object(model_operations, existing_obj, params)
+            self._set_upserted_object_identity(existing_obj, params)
+            edit_op_name = self._get_operation_name(self._is_single_edit_operation, model_operations)
+            edit_batches.add(bulk_op_name, edit_op_name, self.edit_object, index, params)
+        else:
+            add_op_name = self._get_operation_name(self._operation_checker.is_add_operation, model_operations)
+            if not bulk_op_name or not add_op_name:
+                return self._add_upserted_object(model_operations, params)
+            add_batches.add(bulk_op_name, add_op_name, self.add_object, index, params)
+        return None
+
+    def _is_single_edit_operation(self, operation_name, operation_spec):
+        # bulk edit operations share the method and the name prefix with edit operations on a single object
+        return self._operation_checker.is_edit_operation(operation_name, operation_spec) and \
+            not self._operation_checker.is_bulk_operation(operation_name, operation_spec)
+
+    def _validate_bulk_items(self, operation_name, items, results):
+        # all items are validated by the plugin in a single call, without sending any requests
+        requests = self._build_requests([(operation_name, params) for _, params in items], with_operation_name=True)
+        validated_responses = self._conn.validate_and_send_requests(requests, True) if requests else []
+
+        valid_items = []
+        for (index, params), validated_response in zip(items, validated_responses):
+            try:
+                _raise_for_validation_report(validated_response[ValidatedResponseParams.VALIDATION_REPORT])
+                valid_items.append((index, params))
+            except ValidationError as e:
+                results[index] = {BulkItemResult.CHANGED: False, BulkItemResult.ERROR: e}
+        return valid_items
+
+    def _send_batch(self, batch, results):
+        valid_items = self._validate_bulk_items(batch.item_op_name, batch.items, results)
+        if not valid_items:
+            return
+        if self._check_mode:
+            for index, params in valid_items:
+                results[index] = self._execute_bulk_item(batch.fallback_func, batch.item_op_name, params)
+            return
+
+        _, query_params, path_params = _get_user_params(valid_items[0][1])
+        bulk_query_params = dict(query_params)
+        bulk_query_params[QueryParams.BULK] = 'true'
+        bulk_op_spec = self.get_operation_spec(batch.bulk_op_name)
+        try:
+            response = self._send_request(bulk_op_spec[OperationField.URL], bulk_op_spec[OperationField.METHOD],
+                                          [params[ParamName.DATA] for _, params in valid_items],
+                                          _get_bulk_path_params(path_params), bulk_query_params)
+            new_objects = _get_bulk_response_items(response, len(valid_items))
+        except (FtdServerError, FtdUnexpectedResponse):
+            # single requests report errors for the failed items and recognize objects created by the batch
+            for index, params in valid_items:
+                results[index] = self._execute_bulk_item(batch.fallback_func, batch.item_op_name, params)
+            return
+
+        for (index, params), new_object in zip(valid_items, new_objects):
+            self._update_object_index(self._conn.update_indexed_object, batch.item_op_name, params, new_object)
+            results[index] = _with_diff({BulkItemResult.CHANGED: True, BulkItemResult.RESPONSE: new_object},
+                                        results[index])
+
+    def _execute_bulk_item(self, func, *args):
+        config_changed = self.config_changed
+        self.config_changed = False
+        self.config_diff = None
+        try:
+            response = func(*args)
+            result = {BulkItemResult.CHANGED: self.config_changed, BulkItemResult.RESPONSE: response}
+        except BULK_ITEM_ERRORS as e:
+            result = {BulkItemResult.CHANGED: self.config_changed, BulkItemResult.ERROR: e}
+        finally:
+            self.config_changed = config_changed or self.config_changed
+        if self.config_diff and BulkItemResult.ERROR not in result:
+            result[BulkItemResult.DIFF] = self.config_diff
+        self.config_diff = None
+        return result
+
+
+class BulkBatches(object):
+    """
+    Groups items of a bulk operation into batches that can be sent in a single request: items of the same
+    bulk operation with the same path params, up to `BULK_REQUEST_SIZE` items per batch.
+    """
+
+    def __init__(self):
+        self._batches = []
+        self._open_batches = {}
+
+    def add(self, bulk_op_name, item_op_name, fallback_func, index, params):
+        key = (bulk_op_name, json.dumps(_get_bulk_path_params(params.get(ParamName.PATH_PARAMS) or {}),
+                                        sort_keys=True))
+        batch = self._open_batches.get(key)
+        if batch is None or len(batch.items) >= BULK_REQUEST_SIZE:
+            batch = self._open_batches[key] = BulkBatch(bulk_op_name, item_op_name, fallback_func)
+            self._batches.append(batch)
+        batch.items.append((index, params))
+
+    def __iter__(self):
+        return iter(self._batches)
+
+
+class BulkBatch(object):
+    def __init__(self, bulk_op_name, item_op_name, fallback_func):
+        self.bulk_op_name = bulk_op_name
+        self.item_op_name = item_op_name
+        self.fallback_func = fallback_func
+        self.items = []
+
+
+def _with_diff(result, previous_result):
+    # the diff is found when the item is prepared, before its object is sent in a batch or a concurrent request
+    if previous_result and BulkItemResult.DIFF in previous_result and BulkItemResult.ERROR not in result:
+        result[BulkItemResult.DIFF] = previous_result[BulkItemResult.DIFF]
+    return result
+
+
+def is_job_finished(job):
+    # jobs that are still running have no end time
+    return job.get('endTime', -1) != -1
+
+
+def get_next_poll_delay(delay):
+    return min(delay * DEPLOYMENT_POLL_BACKOFF_FACTOR, DEPLOYMENT_POLL_MAX_DELAY)
+
+
+def _get_bulk_path_params(path_params):
+    # bulk operations work with the list URL, so IDs of the edited objects are sent in the body only
+    return dict((k, v) for k, v in iteritems(path_params) if k != 'objId')
+
+
+def _get_bulk_response_items(response, items_expected):
+    items = response.get('items') if isinstance(response, dict) else response
+    if not isinstance(items, list) or len(items) != items_expected:
+        raise FtdUnexpectedResponse(
+            "Bulk operation response from the server does not match the request. "
+            "Expected {0} object(s) in the response: {1}".format(items_expected, response)
+        )
+    return items
+
+
+def _is_server_filter_value(value):
+    # booleans and nested values are serialized differently by the device, ';' separates filters,
+    # and ':' and '~' are operators that cannot be escaped in values
+    if isinstance(value, string_types):
+        return not any(c in value for c in SERVER_FILTER_SPECIAL_CHARS)
+    return isinstance(value, integer_types) and not isinstance(value, bool)
+
 
 def _set_default(params, field_name, value):
     if field_name not in params or params[field_name] is None:
@@ -525,29 +1285,119 @@ def is_put_request(operation_spec):
     return operation_spec[OperationField.METHOD] == HTTPMethod.PUT
 
 
+def get_validation_report(validator, operation_name, http_method, data, path_params, query_params):
+    """
+    Validates params of the operation and builds a report on the invalid ones. The validator is either
+    the connection to the httpapi plugin or the plugin itself, so modules and the plugin report errors the same way.
+
+    :param validator: an object with validate_data, validate_query_params and validate_path_params methods
+    :param operation_name: name of the operation
+    :type operation_name: str
+    :param http_method: HTTP method of the operation
+    :type http_method: str
+    :param data: body params of the request
+    :type data: dict
+    :param path_params: path params of the request
+    :type path_params: dict
+    :param query_params: query params of the request
+    :type query_params: dict
+    :return: validation errors keyed by the invalid params, or an empty dict when all params are valid
+    :rtype: dict
+    """
+    report = {}
+
+    def validate(validation_method, field_name, user_params):
+        key = 'Invalid %s provided' % field_name
+        try:
+            is_valid, validation_report = validation_method(operation_name, user_params)
+            if not is_valid:
+                report[key] = validation_report
+        except Exception as e:
+            report[key] = str(e)
+
+    validate(validator.validate_query_params, ParamName.QUERY_PARAMS, query_params or {})
+    validate(validator.validate_path_params, ParamName.PATH_PARAMS, path_params or {})
+    if http_method in (HTTPMethod.POST, HTTPMethod.PUT):
+        validate(validator.validate_data, ParamName.DATA, data or {})
+    return report
+
+
+def _raise_for_validation_report(report):
+    if report:
+        raise ValidationError(report)
+
+
 def _get_user_params(params):
     return params.get(ParamName.DATA) or {}, params.get(ParamName.QUERY_PARAMS) or {}, params.get(
         ParamName.PATH_PARAMS) or {}
 
 
-def iterate_over_pageable_resource(resource_func, params):
+def iterate_over_pageable_resource(resource_func, params, page_size=None, pages_func=None, prefetch_count=0):
     """
     A generator function that iterates over a resource that supports pagination and lazily returns present items
     one by one.
 
+    See `iterate_over_pageable_resource_pages` for the description of paging and parameters.
+
     :param resource_func: function that receives `params` argument and returns a page of objects
     :type resource_func: callable
     :param params: initial dictionary of parameters that will be passed to the resource_func.
                    Should contain `query_params` inside.
     :type params: dict
+    :param page_size: page size shared with other iterations over the same resource
+    :type page_size: PageSize
+    :param pages_func: function that receives a list of params and returns a list with a page of objects,
+                       or the raised exception, for every params
+    :type pages_func: callable
+    :param prefetch_count: maximum number of subsequent pages requested with a single call of `pages_func`
+    :type prefetch_count: int
     :return: an iterator containing returned items
     :rtype: iterator of dict
     """
+    for page_items in iterate_over_pageable_resource_pages(resource_func, params, page_size, pages_func,
+                                                           prefetch_count):
+        for item in page_items:
+            yield item
+
+
+def iterate_over_pageable_resource_pages(resource_func, params, page_size=None, pages_func=None, prefetch_count=0):
+    """
+    A generator function that iterates over a resource that supports pagination and lazily returns lists of items
+    page by page.
+
+    Pages are requested with the `limit` from `query_params`, or with the adaptive `page_size` when the limit is
+    not set. The page size is reduced when the device returns fewer items per page than requested, and when
+    a page request fails with a client error or times out.
+
+    Pages are requested one by one by default. When `pages_func` and `prefetch_count` are given and the device
+    reports the total number of items, up to `prefetch_count` subsequent pages are requested with a single call
+    of `pages_func`, so the connection can send them concurrently. Pages are still returned in order. Prefetched
+    pages are requested even if the consumer stops the iteration before reaching them, so prefetching suits
+    iterations over all items only.
+
+    :param resource_func: function that receives `params` argument and returns a page of objects
+    :type resource_func: callable
+    :param params: initial dictionary of parameters that will be passed to the resource_func.
+                   Should contain `query_params` inside.
+    :type params: dict
+    :param page_size: page size shared with other iterations over the same resource
+    :type page_size: PageSize
+    :param pages_func: function that receives a list of params and returns a list with a page of objects,
+                       or the raised exception, for every params
+    :type pages_func: callable
+    :param prefetch_count: maximum number of subsequent pages requested with a single call of `pages_func`
+    :type prefetch_count: int
+    :return: an iterator containing lists of items returned in every page
+    :rtype: iterator of list
+    """
     # creating a copy not to mutate passed dict
     params = copy.deepcopy(params)
-    params[ParamName.QUERY_PARAMS].setdefault('limit', DEFAULT_PAGE_SIZE)
-    params[ParamName.QUERY_PARAMS].setdefault('offset', DEFAULT_OFFSET)
-    limit = int(params[ParamName.QUERY_PARAMS]['limit'])
+    query_params = params[ParamName.QUERY_PARAMS]
+    if page_size is None:
+        page_size = PageSize(int(query_params.get('limit', DEFAULT_PAGE_SIZE)))
+    query_params.setdefault('limit', page_size.limit)
+    query_params.setdefault('offset', DEFAULT_OFFSET)
+    prefetched_pages = deque()
 
     def received_less_items_than_requested(items_in_response, items_expected):
         if items_in_response == items_expected:
@@ -561,16 +1411,102 @@ def iterate_over_pageable_resource(resource_func, params):
                 items_in_response, items_expected)
         )
 
+    def has_next_page(page, offset, items_expected):
+        items_in_response = len(page['items'])
+        if 0 < items_in_response < items_expected and page_size.cap(_get_device_page_limit(page)) \
+                and items_in_response == page_size.limit:
+            # the device returned a full page of the maximum size it supports, so more items can follow
+            return True
+        less_items_received = received_less_items_than_requested(items_in_response, items_expected)
+        if items_in_response and _has_total_count(page):
+            # the device may return fewer items than requested without reporting its page limit,
+            # so the total number of items, when reported, tells whether more items follow
+            return int(offset) + items_in_response < _get_total_count(page)
+        return not less_items_received
+
+    def next_page_params(offset):
+        # creating a copy not to mutate existing dict
+        new_params = copy.deepcopy(params)
+        new_query_params = new_params[ParamName.QUERY_PARAMS]
+        new_query_params['offset'] = offset
+        if int(new_query_params['limit']) != page_size.limit:
+            new_query_params['limit'] = page_size.limit
+        return new_params
+
+    def request_page():
+        if prefetched_pages and prefetched_pages[0][0] == params:
+            _, page = prefetched_pages.popleft()
+            if isinstance(page, Exception):
+                raise page
+            return page
+
+        # prefetched pages are dropped when the page size changes, as their offsets do not match anymore
+        prefetched_pages.clear()
+        return resource_func(params=params)
+
+    def prefetch_pages(offset, total_count):
+        # the next batch is requested once all pages of the previous one are consumed
+        if prefetched_pages:
+            return
+        params_list = [next_page_params(page_offset) for page_offset
+                       in range(int(offset), total_count, page_size.limit)][:prefetch_count]
+        if not params_list:
+            return
+        try:
+            pages = pages_func(params_list)
+        except ConnectionError:
+            # pages are requested one by one when the batch fails as a whole, e.g., times out
+            return
+        prefetched_pages.extend(zip(params_list, pages))
+
     while True:
-        result = resource_func(params=params)
+        limit = int(params[ParamName.QUERY_PARAMS]['limit'])
+        offset = params[ParamName.QUERY_PARAMS]['offset']
+        try:
+            result = request_page()
+        except (FtdServerError, ConnectionError) as e:
+            if is_page_size_error(e) and page_size.shrink():
+                params = next_page_params(offset)
+                continue
+            raise
+
+        items = result['items']
+        next_offset = int(offset) + len(items)
+        more_items_expected = has_next_page(result, offset, limit)
+        if more_items_expected and pages_func is not None and prefetch_count > 0:
+            prefetch_pages(next_offset, _get_total_count(result))
+
+        yield items
+
+        if not more_items_expected:
+            break
 
-        for item in result['items']:
-            yield item
+        params = next_page_params(next_offset)
 
-        if received_less_items_than_requested(len(result['items']), limit):
-            break
 
-        # creating a copy not to mutate existing dict
-        params = copy.deepcopy(params)
-        query_params = params[ParamName.QUERY_PARAMS]
-        query_params['offset'] = int(query_params['offset']) + limit
+def _get_total_count(page):
+    count = (page.get('paging') or {}).get('count')
+    return count if isinstance(count, int) else 0
+
+
+def _has_total_count(page):
+    return isinstance((page.get('paging') or {}).get('count'), int)
+
+
+def _get_device_page_limit(page):
+    return (page.get('paging') or {}).get('limit')
+
+
+def is_page_size_error(err):
+    """
+    Checks whether the failed page request can succeed with a smaller page size.
+
+    :param err: the error raised while requesting the page
+    :type err: Exception
+    :return: True if the request was rejected by the device or timed out, otherwise False
+    :rtype: bool
+    """
+    if isinstance(err, FtdServerError):
+        # authentication errors and missing resources do not depend on the page size
+        return 400 <= err.code < 500 and err.code not in (401, 403, 404)
+    return TIMEOUT_ERROR_MESSAGE in str(err)
@@ -0,0 +1,201 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import ssl
+import threading
+import time
+
+import urllib3
+
+DEFAULT_MAX_SIZE = 4
+DEFAULT_IDLE_TIMEOUT = 30
+
+# sessions can be passed to new TLS connections since Python 3.6
+TLS_SESSION_RESUMPTION_SUPPORTED = hasattr(ssl, 'SSLSession')
+
+
+class PoolStats:
+    REQUESTS = 'requests'
+    CONNECTIONS = 'connections'
+    REUSED = 'reused'
+    EXPIRED = 'expired'
+    RESUMED = 'resumed'
+
+
+class KeepAliveConnectionPool(object):
+    """
+    Keeps HTTP(S) connections to a single device open between requests, so subsequent requests skip
+    the TCP and TLS handshakes. At most `max_size` connections are open at the same time, and concurrent requests
+    wait for a free connection when all of them are busy. New HTTPS connections resume the TLS session of
+    the previous connection when the Python version supports it, so the handshake is shorter even when
+    a connection has to be opened again.
+
+    Connections are dropped instead of being reused when no request has completed for longer than `idle_timeout`
+    seconds, as the device has most likely closed them already. Connections are never dropped while requests
+    are in progress.
+    """
+
+    def __init__(self, base_url, max_size=DEFAULT_MAX_SIZE, idle_timeout=DEFAULT_IDLE_TIMEOUT, timeout=None,
+                 validate_certs=True):
+        self._base_url = base_url
+        self._max_size = max_size
+        self._idle_timeout = idle_timeout
+        self._timeout = timeout
+        self._validate_certs = validate_certs
+
+        self._lock = threading.Lock()
+        self._pool = None
+        self._last_used = None
+        self._active_requests = 0
+        # the TLS session outlives the pool, so connections opened after the idle timeout can resume it
+        self._ssl_context = None
+        # counters of the closed pools, the current pool keeps its own counters
+        self._closed_stats = dict.fromkeys([PoolStats.REQUESTS, PoolStats.CONNECTIONS, PoolStats.EXPIRED], 0)
+
+    def request(self, method, path, body=None, headers=None):
+        """
+        Sends the request over a pooled connection.
+
+        :param method: HTTP method of the request
+        :type method: str
+        :param path: path of the request relative to the base URL, including the query string
+        :type path: str
+        :param body: body of the request
+        :type body: str
+        :param headers: headers of the request
+        :type headers: dict
+        :return: a tuple of the status code, the reason phrase, the response headers and the response body
+        :rtype: tuple
+        """
+        pool = self._acquire_pool()
+        try:
+            # HTTP methods are case-sensitive, while `HTTPMethod` values are lowercase
+            response = pool.urlopen(method.upper(), path, body=body, headers=headers, retries=False,
+                                    redirect=True, preload_content=True)
+            return response.status, response.reason, response.headers, response.data
+        finally:
+            self._release_pool()
+
+    def get_stats(self):
+        """
+        Returns the number of requests sent, connections opened, requests sent over reused connections,
+        pools dropped after the idle timeout and connections that resumed a TLS session.
+
+        :return: the counters keyed by `PoolStats` values
+        :rtype: dict
+        """
+        with self._lock:
+            stats = dict(self._closed_stats)
+            if self._pool is not None:
+                stats[PoolStats.REQUESTS] += self._pool.num_requests
+                stats[PoolStats.CONNECTIONS] += self._pool.num_connections
+        stats[PoolStats.REUSED] = max(stats[PoolStats.REQUESTS] - stats[PoolStats.CONNECTIONS], 0)
+        stats[PoolStats.RESUMED] = self._ssl_context.resumed_sessions if self._ssl_context is not None else 0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._close_pool()
+
+    def _acquire_pool(self):
+        with self._lock:
+            if self._pool is not None and not self._active_requests and self._last_used is not None and \
+                    time.time() - self._last_used > self._idle_timeout:
+                self._close_pool()
+                self._closed_stats[PoolStats.EXPIRED] += 1
+            if self._pool is None:
+                self._pool = self._create_pool()
+            self._active_requests += 1
+            return self._pool
+
+    def _release_pool(self):
+        with self._lock:
+            self._active_requests -= 1
+            # the idle time is counted from the end of the last request, so long requests do not expire the pool
+            self._last_used = time.time()
+            if self._ssl_context is not None:
+                self._ssl_context.save_session()
+
+    def _create_pool(self):
+        pool_kwargs = dict(maxsize=self._max_size, block=True)
+        if self._timeout is not None:
+            pool_kwargs['timeout'] = self._timeout
+        if self._base_url.lower().startswith('https'):
+            pool_kwargs['cert_reqs'] = 'CERT_REQUIRED' if self._validate_certs else 'CERT_NONE'
+            if not self._validate_certs:
+                urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+            if TLS_SESSION_RESUMPTION_SUPPORTED:
+                if self._ssl_context is None:
+                    self._ssl_context = SessionResumingSSLContext.create(self._validate_certs)
+                pool_kwargs['ssl_context'] = self._ssl_context
+        return urllib3.connection_from_url(self._base_url, **pool_kwargs)
+
+    def _close_pool(self):
+        if self._pool is None:
+            return
+        self._closed_stats[PoolStats.REQUESTS] += self._pool.num_requests
+        self._closed_stats[PoolStats.CONNECTIONS] += self._pool.num_connections
+        self._pool.close()
+        self._pool = None
+
+
+class SessionResumingSSLContext(getattr(ssl, 'SSLContext', object)):
+    """
+    SSL context that passes the TLS session of the last connection to every new connection, so the device can
+    resume the session with an abbreviated handshake. urllib3 has no option for TLS sessions, but it accepts
+    a custom SSL context and opens every connection with its `wrap_socket` method.
+
+    """
+
+    def __init__(self, protocol):
+        super(SessionResumingSSLContext, self).__init__()
+        self._session_lock = threading.Lock()
+        self._session = None
+        self._last_socket = None
+        self.resumed_sessions = 0
+
+    @classmethod
+    def create(cls, validate_certs=True):
+        context = cls(ssl.PROTOCOL_TLS_CLIENT)
+        if validate_certs:
+            context.load_default_certs()
+        else:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def wrap_socket(self, sock, *args, **kwargs):
+        with self._session_lock:
+            if self._session is not None:
+                kwargs.setdefault('session', self._session)
+
+        ssl_sock = super(SessionResumingSSLContext, self).wrap_socket(sock, *args, **kwargs)
+        with self._session_lock:
+            self._last_socket = ssl_sock
+            if ssl_sock.session_reused:
+                self.resumed_sessions += 1
+        return ssl_sock
+
+    def save_session(self):
+        """
+        Keeps the TLS session of the last opened connection for the next connections. It is called after
+        a response is received, as TLS 1.3 sessions are sent by the server only after the handshake.
+        """
+        with self._session_lock:
+            session = self._last_socket.session if self._last_socket is not None else None
+            if session is not None:
+                self._session = session
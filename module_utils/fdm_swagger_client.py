@@ -16,12 +16,17 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
+import re
+
 from ansible.module_utils.network.ftd.common import HTTPMethod
+from ansible.module_utils.common._collections_compat import Mapping
 from ansible.module_utils.six import integer_types, string_types, iteritems
 
 FILE_MODEL_NAME = '_File'
 SUCCESS_RESPONSE_CODE = '200'
 DELETE_PREFIX = 'delete'
+# e.g., 'Supported keys are: "name", "value", "fts".'
+FILTER_KEYS_REGEX = r'[Ss]upported keys are:?\s*(?P<keys>[^.]*)'
 
 
 class OperationField:
@@ -32,6 +37,7 @@ class OperationField:
     DESCRIPTION = 'description'
     RETURN_MULTIPLE_ITEMS = 'returnMultipleItems'
     TAGS = "tags"
+    FILTER_KEYS = 'filterKeys'
 
 
 class SpecProp:
@@ -105,7 +111,7 @@ class FdmSwaggerParser:
     _definitions = None
     _base_path = None
 
-    def parse_spec(self, spec, docs=None):
+    def parse_spec(self, spec, docs=None, lazy=False):
         """
         This method simplifies a swagger format, resolves a model name for each operation, and adds documentation for
         each operation and model if it is provided.
@@ -115,6 +121,10 @@ class FdmSwaggerParser:
         :type spec: dict
         :param spec: A documentation map containing descriptions for models, operations and operation parameters.
         :type docs: dict
+        :param lazy: If True, only an index of operation locations is built up front, and every operation is
+            simplified on first access. Model operations are resolved on first access too. Ignored when `docs`
+            are provided.
+        :type lazy: bool
         :rtype: dict
         :return:
         Ex.
@@ -133,6 +143,8 @@ class FdmSwaggerParser:
                                                       # None - for a delete operation or we don't have information
                                                       # '_File' - if an endpoint works with files
                         'returnMultipleItems': False, # shows if the operation returns a single item or an item list
+                        'filterKeys': ['name', 'value'], # keys supported by the 'filter' query param,
+                                                         # present only if listed in the param description
                         'parameters': {
                             'path':{
                                 'param_name':{
@@ -165,6 +177,15 @@ class FdmSwaggerParser:
         """
         self._definitions = spec[SpecProp.DEFINITIONS]
         self._base_path = spec[PropName.BASE_PATH]
+
+        if lazy and not docs:
+            operations = LazyOperations(self, spec[PropName.PATHS])
+            return {
+                SpecProp.MODELS: self._definitions,
+                SpecProp.OPERATIONS: operations,
+                SpecProp.MODEL_OPERATIONS: LazyModelOperations(self, operations)
+            }
+
         operations = self._get_operations(spec)
 
         if docs:
@@ -193,20 +214,25 @@ class FdmSwaggerParser:
         operations_dict = {}
         for url, operation_params in iteritems(paths_dict):
             for method, params in iteritems(operation_params):
-                operation = {
-                    OperationField.METHOD: method,
-                    OperationField.URL: self._base_path + url,
-                    OperationField.MODEL_NAME: self._get_model_name(method, params),
-                    OperationField.RETURN_MULTIPLE_ITEMS: self._return_multiple_items(params),
-                    OperationField.TAGS: params.get(OperationField.TAGS, [])
-                }
-                if OperationField.PARAMETERS in params:
-                    operation[OperationField.PARAMETERS] = self._get_rest_params(params[OperationField.PARAMETERS])
-
                 operation_id = params[PropName.OPERATION_ID]
-                operations_dict[operation_id] = operation
+                operations_dict[operation_id] = self._get_operation(url, method, params)
         return operations_dict
 
+    def _get_operation(self, url, method, params):
+        operation = {
+            OperationField.METHOD: method,
+            OperationField.URL: self._base_path + url,
+            OperationField.MODEL_NAME: self._get_model_name(method, params),
+            OperationField.RETURN_MULTIPLE_ITEMS: self._return_multiple_items(params),
+            OperationField.TAGS: params.get(OperationField.TAGS, [])
+        }
+        if OperationField.PARAMETERS in params:
+            operation[OperationField.PARAMETERS] = self._get_rest_params(params[OperationField.PARAMETERS])
+            filter_keys = self._get_filter_keys(params[OperationField.PARAMETERS])
+            if filter_keys:
+                operation[OperationField.FILTER_KEYS] = filter_keys
+        return operation
+
     def _enrich_operations_with_docs(self, operations, docs):
         def get_operation_docs(op):
             op_url = op[OperationField.URL][len(self._base_path):]
@@ -315,6 +341,20 @@ class FdmSwaggerParser:
                 path[param[PropName.NAME]] = self._simplify_param_def(param)
         return operation_param
 
+    @staticmethod
+    def _get_filter_keys(params):
+        filter_param = next((param for param in params
+                             if param['in'] == OperationParams.QUERY and param[PropName.NAME] == QueryParams.FILTER),
+                            None)
+        description = filter_param and filter_param.get(PropName.DESCRIPTION)
+        match = description and re.search(FILTER_KEYS_REGEX, description)
+        if not match:
+            return []
+
+        keys = match.group('keys')
+        quoted_keys = re.findall(r'["\'`]([^"\'`]+)["\'`]', keys)
+        return quoted_keys or [k.strip() for k in re.split(r',|\band\b', keys) if k.strip()]
+
     @staticmethod
     def _simplify_param_def(param):
         return {
@@ -331,6 +371,131 @@ class FdmSwaggerParser:
             return model_name
 
 
+class LazyOperations(Mapping):
+    """
+    A read-only mapping of operation names to simplified operation specifications. Only the location
+    (URL and HTTP method) of every operation is indexed up front, the specification is built on first access.
+    """
+
+    def __init__(self, parser, paths):
+        self._parser = parser
+        self._paths = paths
+        self._index = dict(
+            (params[PropName.OPERATION_ID], (url, method))
+            for url, operation_params in iteritems(paths)
+            for method, params in iteritems(operation_params)
+        )
+        self._operations = {}
+
+    def __getitem__(self, operation_name):
+        if operation_name not in self._operations:
+            url, method = self._index[operation_name]
+            self._operations[operation_name] = self._parser._get_operation(url, method, self._paths[url][method])
+        return self._operations[operation_name]
+
+    def __contains__(self, operation_name):
+        return operation_name in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class LazyModelOperations(Mapping):
+    """
+    A read-only mapping of model names to their operations. As a model name is known only after
+    the operation is simplified, all operations are resolved on first access.
+    """
+
+    def __init__(self, parser, operations):
+        self._parser = parser
+        self._operations = operations
+        self._model_operations = None
+
+    @property
+    def model_operations(self):
+        if self._model_operations is None:
+            self._model_operations = self._parser._get_model_operations(self._operations)
+        return self._model_operations
+
+    def __getitem__(self, model_name):
+        return self.model_operations[model_name]
+
+    def __iter__(self):
+        return iter(self.model_operations)
+
+    def __len__(self):
+        return len(self.model_operations)
+
+
+def _is_string(value):
+    return isinstance(value, string_types)
+
+
+def _is_boolean(value):
+    return isinstance(value, bool)
+
+
+def _is_integer(value):
+    is_integer = isinstance(value, integer_types) and not isinstance(value, bool)
+    is_digit_string = isinstance(value, string_types) and value.isdigit()
+    return is_integer or is_digit_string
+
+
+def _is_number(value):
+    def is_numeric_string(s):
+        try:
+            float(s)
+            return True
+        except ValueError:
+            return False
+
+    is_number = isinstance(value, (integer_types, float)) and not isinstance(value, bool)
+    is_numeric_string = isinstance(value, string_types) and is_numeric_string(value)
+    return is_number or is_numeric_string
+
+
+def _is_unknown_type(value):
+    return False
+
+
+SIMPLE_TYPE_CHECKS = {
+    PropType.STRING: _is_string,
+    PropType.BOOLEAN: _is_boolean,
+    PropType.INTEGER: _is_integer,
+    PropType.NUMBER: _is_number
+}
+
+
+def _skip_validation(status, data, path):
+    pass
+
+
+def _render_path(path):
+    """
+    Renders a path built by compiled validation plans into the report format. To avoid building strings for
+    valid data, the path is a chain of (parent_path, segment) tuples, where the segment is either a field name
+    or an index in the array, and None stands for the root.
+
+    :return: path to the field. Ex. objects[3].id, parent.name
+    :rtype: str
+    """
+    segments = []
+    while path is not None:
+        path, segment = path
+        segments.append(segment)
+
+    rendered_path = ''
+    for segment in reversed(segments):
+        if isinstance(segment, integer_types):
+            rendered_path = '{0}[{1}]'.format(rendered_path, segment)
+        else:
+            rendered_path = FdmSwaggerValidator._create_path_to_field(rendered_path, segment)
+    return rendered_path
+
+
 class FdmSwaggerValidator:
     def __init__(self, spec):
         """
@@ -339,6 +504,7 @@ class FdmSwaggerValidator:
         """
         self._operations = spec[SpecProp.OPERATIONS]
         self._models = spec[SpecProp.MODELS]
+        self._model_plans = {}
 
     def validate_data(self, operation_name, data=None):
         """
@@ -378,10 +544,10 @@ class FdmSwaggerValidator:
         self._check_validate_data_params(data, operation_name)
 
         operation = self._operations[operation_name]
-        model = self._models[operation[OperationField.MODEL_NAME]]
+        model_plan = self._get_model_plan(operation[OperationField.MODEL_NAME])
         status = self._init_report()
 
-        self._validate_object(status, model, data, '')
+        model_plan(status, data, None)
 
         if len(status[PropName.REQUIRED]) > 0 or len(status[PropName.INVALID_TYPE]) > 0:
             return False, self._delete_empty_field_from_report(status)
@@ -510,19 +676,120 @@ class FdmSwaggerValidator:
                 if prop_name in params and not self._is_correct_simple_types(expected_type, value, allow_null=False):
                     self._add_invalid_type_report(status, '', prop_name, expected_type, value)
 
-    def _validate_object(self, status, model, data, path):
+    def _get_model_plan(self, model_name):
+        """
+        Returns a compiled validation plan of the model. The plan is a function that validates data against
+        the model and adds found problems to the report. Plans are compiled once and reused by all
+        subsequent validations.
+
+        :param model_name: name of the model from the specification
+        :type model_name: str
+        :return: function accepting the report, data and path to the data
+        :rtype: callable
+        """
+        plan = self._model_plans.get(model_name)
+        if plan is None:
+            plan = self._model_plans[model_name] = self._compile_model(self._models[model_name])
+        return plan
+
+    def _compile_model(self, model):
         if self._is_enum(model):
-            self._check_enum(status, model, data, path)
+            return self._compile_enum(model)
         elif self._is_object(model):
-            self._check_object(status, model, data, path)
+            return self._compile_object(model)
+        return _skip_validation
+
+    def _compile_enum(self, model):
+        allowed_values = model[PropName.ENUM]
+
+        def validate_enum(status, value, path):
+            if value is not None and value not in allowed_values:
+                self._add_invalid_type_report(status, _render_path(path), '', PropName.ENUM, value)
+
+        return validate_enum
+
+    def _compile_object(self, model):
+        required_fields = model.get(PropName.REQUIRED, [])
+        model_properties = model.get(PropName.PROPERTIES)
+        property_plans = None if model_properties is None else [
+            (prop_name, self._compile_property(prop_model)) for prop_name, prop_model in model_properties.items()
+        ]
+
+        def validate_object(status, data, path):
+            if data is None:
+                return
+            if not isinstance(data, dict):
+                self._add_invalid_type_report(status, _render_path(path), '', PropType.OBJECT, data)
+                return
+
+            missed_required_fields = [field for field in required_fields if data.get(field) is None]
+            if missed_required_fields:
+                rendered_path = _render_path(path)
+                status[PropName.REQUIRED] += [self._create_path_to_field(rendered_path, field)
+                                              for field in missed_required_fields]
+
+            if property_plans is None:
+                raise KeyError(PropName.PROPERTIES)
+            for prop_name, property_plan in property_plans:
+                if prop_name in data:
+                    property_plan(status, data[prop_name], path, prop_name)
+
+        return validate_object
+
+    def _compile_property(self, model):
+        expected_type = model.get(PropName.TYPE, PropType.OBJECT)
+        if expected_type == PropType.OBJECT:
+            return self._compile_object_property(model)
+        elif expected_type == PropType.ARRAY:
+            return self._compile_array_property(model)
+
+        is_correct_type = SIMPLE_TYPE_CHECKS.get(expected_type, _is_unknown_type)
+
+        def validate_simple_property(status, value, path, prop_name):
+            if value is not None and not is_correct_type(value):
+                self._add_invalid_type_report(status, _render_path(path), prop_name, expected_type, value)
+
+        return validate_simple_property
+
+    def _compile_object_property(self, model):
+        if PropName.REF not in model:
+            def fail_without_ref(status, value, path, prop_name):
+                raise KeyError(PropName.REF)
+
+            return fail_without_ref
+
+        ref_model_name = _get_model_name_from_url(model[PropName.REF])
+        # models may reference themselves, so the referenced plan is resolved on first use
+        ref_plans = []
+
+        def validate_object_property(status, value, path, prop_name):
+            if not ref_plans:
+                ref_plans.append(self._get_model_plan(ref_model_name))
+            ref_plans[0](status, value, (path, prop_name))
+
+        return validate_object_property
+
+    def _compile_array_property(self, model):
+        item_plans = []
+
+        def validate_array_property(status, value, path, prop_name):
+            if value is None:
+                return
+            elif not isinstance(value, list):
+                self._add_invalid_type_report(status, _render_path((path, prop_name)), '', PropType.ARRAY, value)
+            else:
+                if not item_plans:
+                    item_plans.append(self._compile_property(model[PropName.ITEMS]))
+                item_plan = item_plans[0]
+                array_path = (path, prop_name)
+                for i, item_data in enumerate(value):
+                    item_plan(status, item_data, (array_path, i), '')
+
+        return validate_array_property
 
     def _is_enum(self, model):
         return self._is_string_type(model) and PropName.ENUM in model
 
-    def _check_enum(self, status, model, value, path):
-        if value is not None and value not in model[PropName.ENUM]:
-            self._add_invalid_type_report(status, path, '', PropName.ENUM, value)
-
     def _add_invalid_type_report(self, status, path, prop_name, expected_type, actually_value):
         status[PropName.INVALID_TYPE].append({
             'path': self._create_path_to_field(path, prop_name),
@@ -530,82 +797,11 @@ class FdmSwaggerValidator:
             'actually_value': actually_value
         })
 
-    def _check_object(self, status, model, data, path):
-        if data is None:
-            return
-
-        if not isinstance(data, dict):
-            self._add_invalid_type_report(status, path, '', PropType.OBJECT, data)
-            return None
-
-        if PropName.REQUIRED in model:
-            self._check_required_fields(status, model[PropName.REQUIRED], data, path)
-
-        model_properties = model[PropName.PROPERTIES]
-        for prop in model_properties.keys():
-            if prop in data:
-                model_prop_val = model_properties[prop]
-                expected_type = model_prop_val.get(PropName.TYPE, PropType.OBJECT)
-                actually_value = data[prop]
-                self._check_types(status, actually_value, expected_type, model_prop_val, path, prop)
-
-    def _check_types(self, status, actually_value, expected_type, model, path, prop_name):
-        if expected_type == PropType.OBJECT:
-            ref_model = self._get_model_by_ref(model)
-
-            self._validate_object(status, ref_model, actually_value,
-                                  path=self._create_path_to_field(path, prop_name))
-        elif expected_type == PropType.ARRAY:
-            self._check_array(status, model, actually_value,
-                              path=self._create_path_to_field(path, prop_name))
-        elif not self._is_correct_simple_types(expected_type, actually_value):
-            self._add_invalid_type_report(status, path, prop_name, expected_type, actually_value)
-
-    def _get_model_by_ref(self, model_prop_val):
-        model = _get_model_name_from_url(model_prop_val[PropName.REF])
-        return self._models[model]
-
-    def _check_required_fields(self, status, required_fields, data, path):
-        missed_required_fields = [self._create_path_to_field(path, field) for field in
-                                  required_fields if field not in data.keys() or data[field] is None]
-        if len(missed_required_fields) > 0:
-            status[PropName.REQUIRED] += missed_required_fields
-
-    def _check_array(self, status, model, data, path):
-        if data is None:
-            return
-        elif not isinstance(data, list):
-            self._add_invalid_type_report(status, path, '', PropType.ARRAY, data)
-        else:
-            item_model = model[PropName.ITEMS]
-            for i, item_data in enumerate(data):
-                model_type = item_model.get(PropName.TYPE, PropType.OBJECT)
-                self._check_types(status, item_data, model_type, item_model, "{0}[{1}]".format(path, i), '')
-
     @staticmethod
     def _is_correct_simple_types(expected_type, value, allow_null=True):
-        def is_numeric_string(s):
-            try:
-                float(s)
-                return True
-            except ValueError:
-                return False
-
         if value is None and allow_null:
             return True
-        elif expected_type == PropType.STRING:
-            return isinstance(value, string_types)
-        elif expected_type == PropType.BOOLEAN:
-            return isinstance(value, bool)
-        elif expected_type == PropType.INTEGER:
-            is_integer = isinstance(value, integer_types) and not isinstance(value, bool)
-            is_digit_string = isinstance(value, string_types) and value.isdigit()
-            return is_integer or is_digit_string
-        elif expected_type == PropType.NUMBER:
-            is_number = isinstance(value, (integer_types, float)) and not isinstance(value, bool)
-            is_numeric_string = isinstance(value, string_types) and is_numeric_string(value)
-            return is_number or is_numeric_string
-        return False
+        return SIMPLE_TYPE_CHECKS.get(expected_type, _is_unknown_type)(value)
 
     @staticmethod
     def _is_string_type(model):
@@ -0,0 +1,67 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import errno
+import os
+import tempfile
+
+
+def ensure_dir(dir_path):
+    """
+    Creates the directory with all missing parents unless it already exists.
+
+    :param dir_path: path to the directory
+    :type dir_path: str
+    """
+    try:
+        os.makedirs(dir_path)
+    except OSError as e:
+        if e.errno != errno.EEXIST:
+            raise
+
+
+def remove_file(file_path):
+    """
+    Removes the file, ignoring errors, e.g. when the file has already been removed by another process.
+
+    :param file_path: path to the file
+    :type file_path: str
+    """
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def write_file_atomically(file_path, content):
+    """
+    Writes the content to a temporary file in the same directory first and renames it afterwards,
+    so concurrent readers never see a partially written file.
+
+    :param file_path: path to the file
+    :type file_path: str
+    :param content: the content to write
+    :type content: bytes
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(content)
+        os.rename(tmp_path, file_path)
+    except Exception:
+        remove_file(tmp_path)
+        raise
@@ -0,0 +1,236 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import heapq
+import itertools
+import time
+from collections import deque
+from multiprocessing.pool import ThreadPool
+
+from ansible.module_utils.six.moves import queue
+
+try:
+    from ansible.module_utils.common import FtdConfigurationError, FtdServerError
+    from ansible.module_utils.configuration import BaseConfigurationResource, DEFAULT_DEPLOYMENT_TIMEOUT, \
+        DEPLOYED_STATE, DEPLOYMENT_POLL_INITIAL_DELAY, get_next_poll_delay, is_job_finished
+except ImportError:
+    from module_utils.common import FtdConfigurationError, FtdServerError
+    from module_utils.configuration import BaseConfigurationResource, DEFAULT_DEPLOYMENT_TIMEOUT, \
+        DEPLOYED_STATE, DEPLOYMENT_POLL_INITIAL_DELAY, get_next_poll_delay, is_job_finished
+
+DEFAULT_CONCURRENCY = 20
+
+
+class DeviceResult:
+    CHANGED = 'changed'
+    FAILED = 'failed'
+    SKIPPED = 'skipped'
+    STATE = 'state'
+    DURATION = 'duration'
+    POLLS = 'polls'
+    MSG = 'msg'
+
+
+class FleetSummary:
+    TOTAL = 'total'
+    DEPLOYED = 'deployed'
+    PLANNED = 'planned'
+    SKIPPED = 'skipped'
+    FAILED = 'failed'
+    DURATION = 'duration'
+
+
+class FleetDeployment(object):
+    """
+    Deploys pending changes to many devices from a single process. Deployments run on at most `concurrency`
+    devices at the same time, and a device is connected to only when its deployment is about to start, so the number
+    of open connections is bounded too. A single loop schedules polls of all started jobs, and connecting,
+    starting and polling are done on a pool of `concurrency` threads, so requests to different devices are sent
+    at the same time. Every job is polled with the growing delays used by `BaseConfigurationResource.deploy`.
+
+    `connect` is called with the device name and returns a connection implementing the interface of the FTD
+    HttpApi plugin. The connection is closed once the deployment on the device is finished.
+    """
+
+    def __init__(self, device_names, connect, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_DEPLOYMENT_TIMEOUT,
+                 skip_if_no_changes=False, check_mode=False):
+        self._device_names = list(device_names)
+        self._connect = connect
+        self._concurrency = max(concurrency, 1)
+        self._timeout = timeout
+        self._skip_if_no_changes = skip_if_no_changes
+        self._check_mode = check_mode
+
+        self._results = {}
+        self._jobs = []
+        # breaks ties between jobs polled at the same time, as devices are not comparable
+        self._job_counter = itertools.count()
+
+    def run(self):
+        """
+        Deploys pending changes to all devices and waits until all deployments are finished. A failure on one
+        device does not stop deployments on the other devices.
+
+        :return: a tuple of results for every device keyed by the device name (see `DeviceResult`),
+            and the summary (see `FleetSummary`)
+        :rtype: tuple
+        """
+        started_at = time.time()
+        waiting_devices = deque(self._device_names)
+        # every running deployment has at most one request in progress, so the pool never queues requests
+        pool = ThreadPool(max(min(self._concurrency, len(self._device_names)), 1))
+        completed_jobs = queue.Queue()
+        running = 0
+        in_progress = 0
+        try:
+            while waiting_devices or running:
+                while waiting_devices and running < self._concurrency:
+                    job = DeviceDeployment(waiting_devices.popleft(), time.time())
+                    pool.apply_async(self._run_step, (self._start, job), callback=completed_jobs.put)
+                    running += 1
+                    in_progress += 1
+                while self._jobs and self._jobs[0][0] <= time.time():
+                    _, _, job = heapq.heappop(self._jobs)
+                    pool.apply_async(self._run_step, (self._poll, job), callback=completed_jobs.put)
+                    in_progress += 1
+
+                if not in_progress:
+                    time.sleep(max(self._jobs[0][0] - time.time(), 0))
+                    continue
+                try:
+                    # the wait is interrupted when the next job is due, so its poll is not delayed by slow requests
+                    job = completed_jobs.get(timeout=self._get_time_to_next_poll())
+                except queue.Empty:
+                    continue
+                in_progress -= 1
+                if job.finished:
+                    running -= 1
+                else:
+                    self._schedule(job)
+        finally:
+            pool.close()
+            pool.join()
+
+        return self._results, self._summarize(started_at)
+
+    def _get_time_to_next_poll(self):
+        return max(self._jobs[0][0] - time.time(), 0) if self._jobs else None
+
+    def _run_step(self, step, job):
+        try:
+            return step(job)
+        except Exception as e:
+            # the loop waits for every step it has submitted, so an unexpected error must still finish the job
+            return self._finish(job, error=e)
+
+    def _start(self, job):
+        try:
+            job.connection = self._connect(job.device_name)
+            job.resource = BaseConfigurationResource(job.connection, self._check_mode)
+            job.deployment = job.resource.start_deployment({}, self._skip_if_no_changes)
+        except Exception as e:
+            # any failure on a single device, including connection errors raised by the transport,
+            # is reported for that device only
+            return self._finish(job, error=e)
+
+        if job.deployment is None or self._check_mode or is_job_finished(job.deployment):
+            return self._finish(job)
+        return job
+
+    def _poll(self, job):
+        try:
+            job.deployment = job.resource.get_deployment(job.deployment)
+        except Exception as e:
+            return self._finish(job, error=e)
+        job.polls += 1
+
+        if is_job_finished(job.deployment):
+            return self._finish(job)
+        if time.time() >= job.started_at + self._timeout:
+            return self._finish(job, error=FtdConfigurationError(
+                'Deployment {0} has not finished in {1} seconds. Last known state: {2}'.format(
+                    job.deployment.get('id'), self._timeout, job.deployment.get('state'))))
+        return job
+
+    def _schedule(self, job):
+        # the last poll happens right at the timeout, so a deployment finished in time is not reported as failed
+        poll_at = min(time.time() + job.delay, job.started_at + self._timeout)
+        job.delay = get_next_poll_delay(job.delay)
+        heapq.heappush(self._jobs, (poll_at, next(self._job_counter), job))
+
+    def _finish(self, job, error=None):
+        deployment = job.deployment or {}
+        result = {
+            DeviceResult.CHANGED: job.resource is not None and job.resource.config_changed,
+            DeviceResult.FAILED: False,
+            DeviceResult.SKIPPED: job.resource is not None and error is None and job.deployment is None,
+            DeviceResult.STATE: deployment.get('state'),
+            DeviceResult.DURATION: round(time.time() - job.started_at, 1),
+            DeviceResult.POLLS: job.polls
+        }
+        if error is not None:
+            result[DeviceResult.FAILED] = True
+            result[DeviceResult.MSG] = get_error_message(error)
+        elif is_job_finished(deployment) and deployment.get('state') != DEPLOYED_STATE:
+            result[DeviceResult.FAILED] = True
+            result[DeviceResult.MSG] = 'Deployment {0} finished in the {1} state: {2}'.format(
+                deployment.get('id'), deployment.get('state'), deployment.get('statusMessages'))
+        self._results[job.device_name] = result
+
+        if job.connection is not None:
+            try:
+                job.connection.close()
+            except Exception:
+                # the deployment result does not depend on a clean logout
+                pass
+        job.finished = True
+        return job
+
+    def _summarize(self, started_at):
+        results = self._results.values()
+        failed = len([r for r in results if r[DeviceResult.FAILED]])
+        skipped = len([r for r in results if r[DeviceResult.SKIPPED]])
+        # deployments are not started in check mode, so devices that would be deployed are reported as planned
+        succeeded = len(self._results) - failed - skipped
+        return {
+            FleetSummary.TOTAL: len(self._results),
+            FleetSummary.DEPLOYED: 0 if self._check_mode else succeeded,
+            FleetSummary.PLANNED: succeeded if self._check_mode else 0,
+            FleetSummary.SKIPPED: skipped,
+            FleetSummary.FAILED: failed,
+            FleetSummary.DURATION: round(time.time() - started_at, 1)
+        }
+
+
+class DeviceDeployment(object):
+    def __init__(self, device_name, started_at):
+        self.device_name = device_name
+        self.started_at = started_at
+        self.connection = None
+        self.resource = None
+        self.deployment = None
+        self.polls = 0
+        self.delay = DEPLOYMENT_POLL_INITIAL_DELAY
+        self.finished = False
+
+
+def get_error_message(error):
+    if isinstance(error, FtdConfigurationError):
+        return error.msg
+    elif isinstance(error, FtdServerError):
+        return 'Server returned an error. Status code: {0}. Server response: {1}'.format(error.code, error.response)
+    return str(error)
@@ -0,0 +1,110 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import os
+
+from ansible.module_utils._text import to_bytes
+from urllib3.fields import RequestField
+from urllib3.filepost import choose_boundary
+
+
+class MultipartFileStream(object):
+    """
+    A read-only file-like object with the `multipart/form-data` encoded body that contains a single file field.
+
+    The body is produced the same way as by `urllib3.encode_multipart_formdata`, but the file is read from disk
+    in chunks as the body is being sent, so the memory used does not depend on the file size. The length of
+    the body is known up front, so it can be sent with the Content-Length header.
+    """
+
+    def __init__(self, field_name, file_path, boundary=None):
+        self._boundary = boundary or choose_boundary()
+        self._file_path = file_path
+        self._file_size = os.path.getsize(file_path)
+        self._file = None
+        self._position = 0
+
+        field = RequestField(field_name, None, os.path.basename(file_path))
+        field.make_multipart()
+        self._preamble = to_bytes('--{0}\r\n'.format(self._boundary)) + to_bytes(field.render_headers())
+        self._epilogue = to_bytes('\r\n--{0}--\r\n'.format(self._boundary))
+
+    @property
+    def content_type(self):
+        return 'multipart/form-data; boundary={0}'.format(self._boundary)
+
+    def __len__(self):
+        return len(self._preamble) + self._file_size + len(self._epilogue)
+
+    def read(self, size=-1):
+        """
+        Reads up to `size` bytes of the body, or the rest of the body when `size` is negative.
+
+        :param size: maximum number of bytes to read
+        :type size: int
+        :return: the read bytes, empty when the whole body has been read
+        :rtype: bytes
+        """
+        remaining = len(self) - self._position
+        size = remaining if size is None or size < 0 else min(size, remaining)
+        chunks = []
+        while size > 0:
+            chunk = self._read_part(size)
+            chunks.append(chunk)
+            size -= len(chunk)
+            self._position += len(chunk)
+        return b''.join(chunks)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        # only rewinding is needed to send the body again, e.g. after the token has been refreshed
+        if whence != os.SEEK_SET:
+            raise ValueError('Only absolute positions are supported')
+        self._position = max(min(offset, len(self)), 0)
+        return self._position
+
+    def tell(self):
+        return self._position
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _read_part(self, size):
+        position = self._position
+        if position < len(self._preamble):
+            return self._preamble[position:position + size]
+
+        position -= len(self._preamble)
+        if position < self._file_size:
+            if self._file is None:
+                self._file = open(self._file_path, 'rb')
+            if self._file.tell() != position:
+                self._file.seek(position)
+            chunk = self._file.read(min(size, self._file_size - position))
+            if not chunk:
+                raise IOError('{0} was truncated while it was being uploaded'.format(self._file_path))
+            return chunk
+
+        position -= self._file_size
+        return self._epilogue[position:position + size]
@@ -0,0 +1,169 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import json
+
+from ansible.module_utils.six import iteritems
+
+
+class ObjectProp:
+    ID = 'id'
+    NAME = 'name'
+    VERSION = 'version'
+
+
+def get_index_key(model_name, path_params=None):
+    """
+    Builds the key of the index that contains objects of the given model. Objects nested into a parent object
+    (e.g., access rules of an access policy) are indexed separately for every parent, so all path params except
+    the ID of the object itself are part of the key.
+
+    :param model_name: name of the model
+    :type model_name: str
+    :param path_params: path params of the operation executed on the objects
+    :type path_params: dict
+    :return: the index key
+    :rtype: str
+    """
+    parent_params = dict((k, v) for k, v in iteritems(path_params or {}) if k != 'objId')
+    return '%s%s' % (model_name, json.dumps(parent_params, sort_keys=True)) if parent_params else model_name
+
+
+class ObjectIndex(object):
+    """
+    Keeps objects fetched from the device by index key (see `get_index_key`) and by name. An index is populated
+    with the full list of objects, so a missing name means that there is no such object on the device. Indexed
+    objects are updated with the objects returned by the device after adding or editing them, and the whole index
+    is dropped as soon as an object with an unexpected version is seen, as the index is stale then.
+    """
+
+    def __init__(self):
+        self._indexes = {}
+        self._names_by_id = {}
+
+    def is_indexed(self, key):
+        return key in self._indexes
+
+    def get(self, key, name):
+        """
+        Returns the indexed object with the given name.
+
+        :param key: the index key
+        :type key: str
+        :param name: name of the object
+        :type name: str
+        :return: a tuple of a flag whether the objects are indexed, and the found object or None
+        :rtype: tuple
+        """
+        if key not in self._indexes:
+            return False, None
+        return True, self._indexes[key].get(name)
+
+    def get_by_id(self, key, obj_id):
+        """
+        Returns the indexed object with the given ID.
+
+        :param key: the index key
+        :type key: str
+        :param obj_id: ID of the object
+        :type obj_id: str
+        :return: a tuple of a flag whether the objects are indexed, and the found object or None
+        :rtype: tuple
+        """
+        if key not in self._indexes:
+            return False, None
+        return True, self._find_by_id(key, obj_id)
+
+    def populate(self, key, objects):
+        """
+        Replaces the index with the given full list of objects.
+
+        :param key: the index key
+        :type key: str
+        :param objects: all objects of the model
+        :type objects: list
+        """
+        named_objects = [obj for obj in objects if ObjectProp.NAME in obj]
+        self._indexes[key] = dict((obj[ObjectProp.NAME], obj) for obj in named_objects)
+        self._names_by_id[key] = dict((obj[ObjectProp.ID], obj[ObjectProp.NAME]) for obj in named_objects
+                                      if ObjectProp.ID in obj)
+
+    def update(self, key, obj):
+        """
+        Stores the object returned by the device after a change, replacing the previous state of the object.
+
+        :param key: the index key
+        :type key: str
+        :param obj: the object returned by the device
+        :type obj: dict
+        """
+        if key not in self._indexes or not isinstance(obj, dict) or ObjectProp.NAME not in obj:
+            return
+        # the object could have been renamed, so its previous state is looked up by ID
+        self.remove(key, obj.get(ObjectProp.ID))
+        self._indexes[key][obj[ObjectProp.NAME]] = obj
+        if ObjectProp.ID in obj:
+            self._names_by_id[key][obj[ObjectProp.ID]] = obj[ObjectProp.NAME]
+
+    def verify(self, key, obj):
+        """
+        Compares the version of the object fetched from the device with the indexed one, and drops the index
+        if they differ.
+
+        :param key: the index key
+        :type key: str
+        :param obj: the object fetched from the device
+        :type obj: dict
+        :return: True if the index is still valid, otherwise False
+        :rtype: bool
+        """
+        indexed_obj = self._find_by_id(key, obj.get(ObjectProp.ID))
+        if indexed_obj is not None and indexed_obj.get(ObjectProp.VERSION) != obj.get(ObjectProp.VERSION):
+            self.invalidate(key)
+            return False
+        return True
+
+    def remove(self, key, obj_id):
+        """
+        Removes the object with the given ID from the index.
+
+        :param key: the index key
+        :type key: str
+        :param obj_id: ID of the object
+        :type obj_id: str
+        """
+        name = self._names_by_id.get(key, {}).pop(obj_id, None)
+        if name is not None:
+            self._indexes[key].pop(name, None)
+
+    def invalidate(self, key=None):
+        """
+        Drops the index with the given key, or all indexes if the key is not specified.
+
+        :param key: the index key
+        :type key: str
+        """
+        if key is None:
+            self._indexes.clear()
+            self._names_by_id.clear()
+        else:
+            self._indexes.pop(key, None)
+            self._names_by_id.pop(key, None)
+
+    def _find_by_id(self, key, obj_id):
+        name = self._names_by_id.get(key, {}).get(obj_id)
+        return None if name is None else self._indexes[key].get(name)
@@ -0,0 +1,112 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import random
+import time
+from email.utils import mktime_tz, parsedate_tz
+
+try:
+    from ansible.module_utils.common import HTTPMethod
+except ImportError:
+    from module_utils.common import HTTPMethod
+
+DEFAULT_STATUS_CODES = [429, 502, 503, 504]
+DEFAULT_METHODS = [HTTPMethod.GET, HTTPMethod.PUT, HTTPMethod.DELETE]
+DEFAULT_MAX_ATTEMPTS = 4
+DEFAULT_BACKOFF_BASE = 1.0
+DEFAULT_BACKOFF_MAX = 30.0
+
+
+class RetryStats:
+    RETRIES = 'retries'
+    RETRIED_REQUESTS = 'retried_requests'
+    EXHAUSTED = 'exhausted'
+    DELAY = 'delay'
+
+
+class RetryPolicy(object):
+    """
+    Decides whether a request that failed with an HTTP error should be sent again, and how long to wait before that.
+
+    Only requests with the given HTTP methods are retried, so by default requests that are not idempotent
+    (e.g., adding an object) are never sent twice. Delays grow exponentially with every attempt and are randomized
+    with full jitter, so concurrent requests throttled by the device do not come back at the same moment.
+    The delay requested by the device in the Retry-After header is honored, up to `backoff_max` seconds.
+    """
+
+    def __init__(self, status_codes=None, methods=None, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 backoff_base=DEFAULT_BACKOFF_BASE, backoff_max=DEFAULT_BACKOFF_MAX):
+        # an empty list disables retries, so only missing values fall back to the defaults
+        self._status_codes = frozenset(int(code) for code in
+                                       (DEFAULT_STATUS_CODES if status_codes is None else status_codes))
+        self._methods = frozenset(method.lower() for method in (DEFAULT_METHODS if methods is None else methods))
+        self._max_attempts = max_attempts
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+
+    def should_retry(self, http_method, status_code, attempt):
+        """
+        Checks whether the failed request should be sent again.
+
+        :param http_method: HTTP method of the request
+        :type http_method: str
+        :param status_code: status code of the error response
+        :type status_code: int
+        :param attempt: number of the failed attempt, starting from 1
+        :type attempt: int
+        :return: True if the request should be sent again, otherwise False
+        :rtype: bool
+        """
+        return attempt < self._max_attempts and status_code in self._status_codes and \
+            http_method.lower() in self._methods
+
+    def get_delay(self, attempt, retry_after=None):
+        """
+        Calculates the number of seconds to wait before sending the request again.
+
+        :param attempt: number of the failed attempt, starting from 1
+        :type attempt: int
+        :param retry_after: value of the Retry-After header of the error response
+        :type retry_after: str
+        :return: the delay in seconds
+        :rtype: float
+        """
+        requested_delay = parse_retry_after(retry_after)
+        if requested_delay is not None:
+            return min(requested_delay, self._backoff_max)
+        return random.uniform(0, min(self._backoff_base * 2 ** (attempt - 1), self._backoff_max))
+
+
+def parse_retry_after(value):
+    """
+    Parses the value of the Retry-After header, which is either a number of seconds or an HTTP date.
+
+    :param value: value of the header
+    :type value: str
+    :return: the number of seconds to wait, or None when the value is missing or invalid
+    :rtype: float
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    parsed_date = parsedate_tz(value)
+    if parsed_date is None:
+        return None
+    return max(mktime_tz(parsed_date) - time.time(), 0.0)
@@ -0,0 +1,336 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import hashlib
+import json
+import mmap
+import os
+import re
+
+from ansible.module_utils._text import to_bytes, to_text
+from ansible.module_utils.common._collections_compat import Mapping
+from ansible.module_utils.six import iteritems
+
+try:
+    from ansible.module_utils.file_utils import ensure_dir, remove_file, write_file_atomically
+except ImportError:
+    from module_utils.file_utils import ensure_dir, remove_file, write_file_atomically
+
+# Bump the version whenever the format of the stored specification changes, so stale entries are ignored
+CACHE_FORMAT_VERSION = 3
+DEFAULT_MAX_ENTRIES = 20
+
+OBJECTS_DIR = 'objects'
+REFS_DIR = 'refs'
+OBJECT_FILE_SUFFIX = '.spec'
+REF_FILE_SUFFIX = '.json'
+INVALID_FILENAME_SYMBOLS = r'[^a-zA-Z0-9_.-]'
+URL_REF_PREFIX = 'url_'
+
+PACKED_SPEC_MAGIC = b'FTDSPEC2\n'
+HEADER_LENGTH_SIZE = 10
+
+
+class RevisionEntry:
+    DIGEST = 'digest'
+    REVISION = 'revision'
+    ETAG = 'etag'
+    LAST_MODIFIED = 'last_modified'
+
+
+class PackedHeader:
+    SECTIONS = 'sections'
+    VALUES = 'values'
+
+
+class SpecCache(object):
+    """
+    Stores parsed API specifications on disk, so they can be reused by subsequent connections to all devices
+    running the same software build.
+
+    Specifications are stored once per content digest in the packed format (see `pack_spec`) and are memory-mapped
+    when loaded, so connection processes on the controller share the same read-only pages and decode only the
+    operations and models they actually use. Small reference files point to the digests: they are keyed either
+    by the build version and the spec path, or by the full spec URL when the HTTP revision validators
+    (ETag and Last-Modified values) are stored too.
+
+    The least recently used specifications are evicted once the cache grows over `max_entries`.
+    """
+
+    def __init__(self, cache_dir, max_entries=DEFAULT_MAX_ENTRIES):
+        self._cache_dir = os.path.join(os.path.expanduser(cache_dir), 'v%s' % CACHE_FORMAT_VERSION)
+        self._objects_dir = os.path.join(self._cache_dir, OBJECTS_DIR)
+        self._refs_dir = os.path.join(self._cache_dir, REFS_DIR)
+        self._max_entries = max_entries
+
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    def load(self, build_version, spec_path):
+        """
+        Loads the parsed specification stored for the given build version and spec path.
+
+        :param build_version: software build version of the device
+        :type build_version: str
+        :param spec_path: URL of the API specification on the device
+        :type spec_path: str
+        :return: the parsed specification or None when the cache has no valid entry
+        :rtype: dict
+        """
+        ref = self._read_ref(self._build_ref_name(build_version, spec_path))
+        return self._load_object(ref[RevisionEntry.DIGEST]) if ref else None
+
+    def store(self, build_version, spec_path, spec):
+        """
+        Stores the parsed specification for the given build version and spec path, and evicts
+        the least recently used specifications if the cache is full.
+
+        :param build_version: software build version of the device
+        :type build_version: str
+        :param spec_path: URL of the API specification on the device
+        :type spec_path: str
+        :param spec: the parsed specification
+        :type spec: dict
+        :return: digest of the stored specification
+        :rtype: str
+        """
+        digest = self._store_object(spec)
+        self._write_ref(self._build_ref_name(build_version, spec_path), {RevisionEntry.DIGEST: digest})
+        return digest
+
+    def load_revision(self, spec_url):
+        """
+        Loads the parsed specification downloaded from the given URL together with its HTTP revision
+        validators, so the specification can be revalidated with a conditional request.
+
+        :param spec_url: full URL of the API specification including the device address
+        :type spec_url: str
+        :return: a tuple of the parsed specification and a dict with 'etag' and 'last_modified' keys,
+            or (None, {}) when the cache has no valid entry
+        :rtype: tuple
+        """
+        ref = self._read_ref(self._url_ref_name(spec_url))
+        spec = self._load_object(ref[RevisionEntry.DIGEST]) if ref else None
+        if spec is None:
+            return None, {}
+        return spec, ref[RevisionEntry.REVISION]
+
+    def store_revision(self, spec_url, spec, revision):
+        """
+        Stores the parsed specification downloaded from the given URL together with its HTTP revision validators.
+
+        :param spec_url: full URL of the API specification including the device address
+        :type spec_url: str
+        :param spec: the parsed specification
+        :type spec: dict
+        :param revision: dict with 'etag' and 'last_modified' values returned by the device
+        :type revision: dict
+        :return: digest of the stored specification
+        :rtype: str
+        """
+        digest = self._store_object(spec)
+        self._write_ref(self._url_ref_name(spec_url), {RevisionEntry.DIGEST: digest, RevisionEntry.REVISION: revision})
+        return digest
+
+    def _load_object(self, digest):
+        object_path = self._object_path(digest)
+        if not os.path.exists(object_path):
+            return None
+
+        try:
+            spec = load_packed_spec(object_path)
+        except (IOError, OSError, ValueError):
+            # a corrupted object is dropped, so the specification gets downloaded and stored again
+            remove_file(object_path)
+            return None
+
+        self._touch(object_path)
+        return spec
+
+    def _store_object(self, spec):
+        content = pack_spec(spec)
+        digest = hashlib.sha256(content).hexdigest()
+
+        object_path = self._object_path(digest)
+        if os.path.exists(object_path):
+            # the same specification has already been stored for another device or build
+            self._touch(object_path)
+        else:
+            ensure_dir(self._objects_dir)
+            write_file_atomically(object_path, content)
+            self._evict()
+        return digest
+
+    def _read_ref(self, ref_name):
+        try:
+            with open(os.path.join(self._refs_dir, ref_name), 'rb') as ref_file:
+                ref = json.loads(to_text(ref_file.read()))
+        except (IOError, OSError, ValueError):
+            return None
+        return ref if RevisionEntry.DIGEST in ref else None
+
+    def _write_ref(self, ref_name, ref):
+        ensure_dir(self._refs_dir)
+        write_file_atomically(os.path.join(self._refs_dir, ref_name), to_bytes(json.dumps(ref)))
+
+    def _evict(self):
+        object_paths = [os.path.join(self._objects_dir, f) for f in self._list_dir(self._objects_dir)
+                        if f.endswith(OBJECT_FILE_SUFFIX)]
+        object_paths.sort(key=self._get_mtime, reverse=True)
+        for object_path in object_paths[self._max_entries:]:
+            remove_file(object_path)
+
+        # references to evicted specifications are useless, so they are removed too
+        for ref_name in self._list_dir(self._refs_dir):
+            ref = self._read_ref(ref_name)
+            if not ref or not os.path.exists(self._object_path(ref[RevisionEntry.DIGEST])):
+                remove_file(os.path.join(self._refs_dir, ref_name))
+
+    def _object_path(self, digest):
+        return os.path.join(self._objects_dir, '%s%s' % (digest, OBJECT_FILE_SUFFIX))
+
+    @staticmethod
+    def _build_ref_name(build_version, spec_path):
+        path_digest = hashlib.sha1(to_bytes(spec_path)).hexdigest()[:8]
+        return '%s_%s%s' % (re.sub(INVALID_FILENAME_SYMBOLS, '_', build_version), path_digest, REF_FILE_SUFFIX)
+
+    @staticmethod
+    def _url_ref_name(spec_url):
+        return '%s%s%s' % (URL_REF_PREFIX, hashlib.sha1(to_bytes(spec_url)).hexdigest()[:16], REF_FILE_SUFFIX)
+
+    @staticmethod
+    def _list_dir(dir_path):
+        try:
+            return os.listdir(dir_path)
+        except OSError:
+            return []
+
+    @staticmethod
+    def _get_mtime(file_path):
+        try:
+            return os.path.getmtime(file_path)
+        except OSError:
+            return 0
+
+    @staticmethod
+    def _touch(file_path):
+        try:
+            os.utime(file_path, None)
+        except OSError:
+            pass
+
+
+def pack_spec(spec):
+    """
+    Serializes the parsed specification into the packed format: a magic line, the length of the JSON header,
+    the header itself and the body. Every item of a dict section (e.g., every operation or model) is serialized
+    separately into the body, and the header maps its name to the offset and length of the item in the body.
+    Top-level values that are not dicts are kept in the header.
+
+    :param spec: the parsed specification
+    :type spec: dict
+    :return: the packed specification
+    :rtype: bytes
+    """
+    sections = {}
+    values = {}
+    body = []
+    offset = 0
+    for section_name in sorted(spec):
+        section = spec[section_name]
+        if not isinstance(section, Mapping):
+            values[section_name] = section
+            continue
+
+        section_index = sections[section_name] = {}
+        for item_name in sorted(section, key=_to_json_key):
+            if isinstance(section, PackedSection):
+                # items of an already packed specification are copied without decoding
+                item_content = section.get_raw_item(item_name)
+            else:
+                item_content = to_bytes(json.dumps(section[item_name], separators=(',', ':'), sort_keys=True))
+            section_index[_to_json_key(item_name)] = [offset, len(item_content)]
+            body.append(item_content)
+            offset += len(item_content)
+
+    header = to_bytes(json.dumps({PackedHeader.SECTIONS: sections, PackedHeader.VALUES: values},
+                                 separators=(',', ':'), sort_keys=True))
+    header_length = to_bytes(str(len(header)).zfill(HEADER_LENGTH_SIZE))
+    return PACKED_SPEC_MAGIC + header_length + header + b''.join(body)
+
+
+def _to_json_key(name):
+    # item names become JSON keys, e.g. operations without a model are stored under 'null'
+    return 'null' if name is None else to_text(name)
+
+
+def load_packed_spec(path):
+    """
+    Memory-maps the packed specification and returns a dict with its sections. Section items are decoded
+    lazily on first access.
+
+    :param path: path to the file with the packed specification
+    :type path: str
+    :return: the parsed specification
+    :rtype: dict
+    """
+    with open(path, 'rb') as spec_file:
+        content = mmap.mmap(spec_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    header_start = len(PACKED_SPEC_MAGIC) + HEADER_LENGTH_SIZE
+    if content[:len(PACKED_SPEC_MAGIC)] != PACKED_SPEC_MAGIC:
+        raise ValueError('%s is not a packed API specification' % path)
+    body_start = header_start + int(content[len(PACKED_SPEC_MAGIC):header_start])
+    header = json.loads(to_text(content[header_start:body_start]))
+
+    spec = dict(header[PackedHeader.VALUES])
+    for section_name, section_index in iteritems(header[PackedHeader.SECTIONS]):
+        spec[section_name] = PackedSection(content, body_start, section_index)
+    return spec
+
+
+class PackedSection(Mapping):
+    """
+    A read-only mapping over a memory-mapped section of the packed specification. Items are decoded on first access
+    and memoized afterwards.
+    """
+
+    def __init__(self, content, body_start, index):
+        self._content = content
+        self._body_start = body_start
+        self._index = index
+        self._items = {}
+
+    def __getitem__(self, key):
+        if key not in self._items:
+            self._items[key] = json.loads(to_text(self.get_raw_item(key)))
+        return self._items[key]
+
+    def get_raw_item(self, key):
+        offset, length = self._index[key]
+        start = self._body_start + offset
+        return self._content[start:start + length]
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
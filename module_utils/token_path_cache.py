@@ -0,0 +1,98 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import hashlib
+import json
+import os
+import time
+
+from ansible.module_utils._text import to_bytes, to_text
+
+try:
+    from ansible.module_utils.file_utils import ensure_dir, remove_file, write_file_atomically
+except ImportError:
+    from module_utils.file_utils import ensure_dir, remove_file, write_file_atomically
+
+DEFAULT_TTL = 86400
+ENTRY_FILE_SUFFIX = '.json'
+
+
+class TokenPathEntry:
+    TOKEN_PATH = 'token_path'
+    STORED_AT = 'stored_at'
+
+
+class TokenPathCache(object):
+    """
+    Stores the API token path discovered for a device on disk, so subsequent connections to the same device
+    log in right away instead of probing the supported API versions and every known token path.
+
+    Every device has its own small file keyed by the device URL. Entries older than `ttl` seconds are ignored,
+    so upgrades of the device software that change the API version are picked up eventually even when the old
+    token path still works.
+    """
+
+    def __init__(self, cache_dir, ttl=DEFAULT_TTL):
+        self._cache_dir = os.path.expanduser(cache_dir)
+        self._ttl = ttl
+
+    def load(self, device_url):
+        """
+        Loads the token path stored for the given device.
+
+        :param device_url: base URL of the device
+        :type device_url: str
+        :return: the token path or None when the cache has no valid entry
+        :rtype: str
+        """
+        try:
+            with open(self._entry_path(device_url), 'rb') as entry_file:
+                entry = json.loads(to_text(entry_file.read()))
+        except (IOError, OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or not entry.get(TokenPathEntry.TOKEN_PATH):
+            return None
+        if time.time() - entry.get(TokenPathEntry.STORED_AT, 0) > self._ttl:
+            return None
+        return entry[TokenPathEntry.TOKEN_PATH]
+
+    def store(self, device_url, token_path):
+        """
+        Stores the token path discovered for the given device.
+
+        :param device_url: base URL of the device
+        :type device_url: str
+        :param token_path: the discovered token path
+        :type token_path: str
+        """
+        ensure_dir(self._cache_dir)
+        entry = {TokenPathEntry.TOKEN_PATH: token_path, TokenPathEntry.STORED_AT: time.time()}
+        write_file_atomically(self._entry_path(device_url), to_bytes(json.dumps(entry)))
+
+    def invalidate(self, device_url):
+        """
+        Removes the token path stored for the given device, e.g. when the device no longer accepts it.
+
+        :param device_url: base URL of the device
+        :type device_url: str
+        """
+        remove_file(self._entry_path(device_url))
+
+    def _entry_path(self, device_url):
+        return os.path.join(self._cache_dir, '%s%s' % (hashlib.sha1(to_bytes(device_url)).hexdigest(),
+                                                       ENTRY_FILE_SUFFIX))
@@ -0,0 +1,84 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import pytest
+from ansible.errors import AnsibleActionFail
+from ansible.playbook.play_context import PlayContext
+from units.compat import mock
+
+from action_plugins.ftd_fleet_deployment import ActionModule
+
+try:
+    from ansible.module_utils.fleet_deployment import DeviceResult, FleetSummary
+except ImportError:
+    from module_utils.fleet_deployment import DeviceResult, FleetSummary
+
+
+class TestFtdFleetDeployment(object):
+
+    @pytest.fixture
+    def action(self):
+        task = mock.MagicMock(args={}, async_val=False)
+        play_context = PlayContext()
+        play_context.check_mode = False
+        return ActionModule(task, mock.MagicMock(), play_context, loader=None, templar=None,
+                            shared_loader_obj=None)
+
+    @pytest.fixture
+    def fleet_deployment_mock(self, mocker):
+        return mocker.patch('action_plugins.ftd_fleet_deployment.FleetDeployment')
+
+    def test_run_should_report_results_and_fail_when_any_device_fails(self, action, fleet_deployment_mock):
+        device_results = {
+            'ftd1': {DeviceResult.CHANGED: True, DeviceResult.FAILED: False, DeviceResult.STATE: 'DEPLOYED',
+                     DeviceResult.DURATION: 40.5, DeviceResult.POLLS: 9},
+            'ftd2': {DeviceResult.CHANGED: False, DeviceResult.FAILED: True, DeviceResult.STATE: None,
+                     DeviceResult.DURATION: 0.1, DeviceResult.POLLS: 0, DeviceResult.MSG: 'Could not connect'}
+        }
+        summary = {FleetSummary.TOTAL: 2, FleetSummary.DEPLOYED: 1, FleetSummary.SKIPPED: 0, FleetSummary.FAILED: 1,
+                   FleetSummary.DURATION: 40.5}
+        fleet_deployment_mock.return_value.run.return_value = device_results, summary
+        action._task.args = {'devices': ['ftd1', 'ftd2'], 'concurrency': '50', 'skip_if_no_changes': 'yes'}
+
+        result = action.run(task_vars={'hostvars': {'ftd1': {}, 'ftd2': {}}})
+
+        args, kwargs = fleet_deployment_mock.call_args
+        assert ['ftd1', 'ftd2'] == args[0]
+        assert (50, True, False) == (kwargs['concurrency'], kwargs['skip_if_no_changes'], kwargs['check_mode'])
+        assert result['changed']
+        assert result['failed']
+        assert 'Deployment failed on 1 of 2 device(s)' == result['msg']
+        assert device_results == result['devices']
+
+    def test_run_should_fail_for_devices_missing_in_inventory(self, action, fleet_deployment_mock):
+        action._task.args = {'devices': ['ftd1', 'unknown']}
+
+        with pytest.raises(AnsibleActionFail) as exc_info:
+            action.run(task_vars={'hostvars': {'ftd1': {}}})
+
+        assert 'Devices not found in the inventory: unknown' == str(exc_info.value)
+        assert not fleet_deployment_mock.called
+
+    def test_connect_should_require_httpapi_connection(self, action, mocker):
+        play_context = PlayContext()
+        play_context.connection = 'ssh'
+        mocker.patch.object(action._play_context, 'set_task_and_variable_override').return_value = play_context
+
+        with pytest.raises(AnsibleActionFail) as exc_info:
+            action._connect('ftd1', {'hostvars': {'ftd1': {'ansible_connection': 'ssh'}}})
+
+        assert 'Device ftd1 must use the httpapi connection, got ssh' == str(exc_info.value)
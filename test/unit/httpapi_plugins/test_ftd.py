@@ -16,23 +16,28 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 import json
+import os
+import shutil
+import tempfile
+import threading
+import time
 
 from ansible.errors import AnsibleConnectionFailure
 from ansible.module_utils.connection import ConnectionError
-from ansible.module_utils.six import BytesIO, PY3, StringIO
+from ansible.module_utils.six import BytesIO, StringIO
+from ansible.module_utils.six.moves import BaseHTTPServer
 from ansible.module_utils.six.moves.urllib.error import HTTPError
 from units.compat import mock
 from units.compat import unittest
-from units.compat.mock import mock_open, patch
+from units.compat.mock import patch
+from urllib3 import encode_multipart_formdata
+from urllib3.fields import RequestField
 
 from httpapi_plugins.ftd import HttpApi, BASE_HEADERS, TOKEN_PATH_TEMPLATE, DEFAULT_API_VERSIONS
-from module_utils.common import HTTPMethod, ResponseParams
+from module_utils.common import HTTPMethod, ResponseParams, ValidatedResponseParams
 from module_utils.fdm_swagger_client import FdmSwaggerParser, SpecProp
-
-if PY3:
-    BUILTINS_NAME = 'builtins'
-else:
-    BUILTINS_NAME = '__builtin__'
+from module_utils.spec_cache import SpecCache
+from module_utils.token_path_cache import TokenPathCache
 
 
 class FakeFtdHttpApiPlugin(HttpApi):
@@ -40,7 +45,23 @@ class FakeFtdHttpApiPlugin(HttpApi):
         super(FakeFtdHttpApiPlugin, self).__init__(conn)
         self.hostvars = {
             'token_path': '/testLoginUrl',
-            'spec_path': '/testSpecUrl'
+            'spec_path': '/testSpecUrl',
+            'spec_cache': False,
+            'spec_cache_dir': '/tmp/testSpecCacheDir',
+            'spec_cache_max_entries': 20,
+            'token_path_cache': False,
+            'token_path_cache_dir': '/tmp/testTokenPathCacheDir',
+            'token_path_cache_ttl': 86400,
+            'object_index': False,
+            'request_concurrency': 4,
+            'connection_pool': False,
+            'connection_pool_max_size': 4,
+            'connection_pool_idle_timeout': 30,
+            'retry_status_codes': [429, 502, 503, 504],
+            'retry_methods': ['get', 'put', 'delete'],
+            'retry_max_attempts': 4,
+            'retry_backoff_base': 1.0,
+            'retry_backoff_max': 30.0
         }
 
     def get_option(self, var):
@@ -54,6 +75,7 @@ class TestFtdHttpApi(unittest.TestCase):
 
     def setUp(self):
         self.connection_mock = mock.Mock()
+        self.connection_mock._url = 'https://testhost.com'
         self.ftd_plugin = FakeFtdHttpApiPlugin(self.connection_mock)
         self.ftd_plugin.access_token = 'ACCESS_TOKEN'
         self.ftd_plugin._load_name = 'httpapi'
@@ -85,6 +107,53 @@ class TestFtdHttpApi(unittest.TestCase):
         expected_body = json.dumps({'grant_type': 'refresh_token', 'refresh_token': 'REFRESH_TOKEN'})
         self.connection_mock.send.assert_called_once_with(mock.ANY, expected_body, headers=mock.ANY, method=mock.ANY)
 
+    @patch('httpapi_plugins.ftd.threading.Timer')
+    def test_login_should_schedule_token_refresh_before_expiration(self, timer_mock):
+        self.connection_mock.send.return_value = self._connection_response(
+            {'access_token': 'ACCESS_TOKEN', 'refresh_token': 'REFRESH_TOKEN', 'expires_in': 1800,
+             'refresh_expires_in': 2400}
+        )
+
+        self.ftd_plugin.login('foo', 'bar')
+
+        timer_mock.assert_called_once_with(1740, self.ftd_plugin._refresh_token_in_background)
+        timer_mock.return_value.start.assert_called_once_with()
+        assert timer_mock.return_value.daemon
+
+        self.ftd_plugin.login('foo', 'bar')
+        timer_mock.return_value.cancel.assert_called_once_with()
+
+    @patch('httpapi_plugins.ftd.threading.Timer', mock.Mock())
+    def test_send_request_should_refresh_expiring_token_before_request(self):
+        self.ftd_plugin.refresh_token = 'REFRESH_TOKEN'
+        self.ftd_plugin._token_refresh_at = time.time() - 1
+        self.connection_mock.send.side_effect = [
+            self._connection_response({'access_token': 'NEW_ACCESS_TOKEN', 'refresh_token': 'NEW_REFRESH_TOKEN',
+                                       'expires_in': 1800}),
+            self._connection_response({})
+        ]
+
+        self.ftd_plugin.send_request('/test', HTTPMethod.GET)
+
+        assert 'NEW_ACCESS_TOKEN' == self.ftd_plugin.access_token
+        assert self.ftd_plugin._token_refresh_at > time.time()
+        login_call, request_call = self.connection_mock.send.call_args_list
+        assert json.dumps({'grant_type': 'refresh_token', 'refresh_token': 'REFRESH_TOKEN'}) == login_call[0][1]
+        assert '/test' == request_call[0][0]
+
+    def test_login_should_request_tokens_when_refresh_token_is_expired(self):
+        self.ftd_plugin.refresh_token = 'REFRESH_TOKEN'
+        self.ftd_plugin._refresh_token_expires_at = time.time() - 1
+        self.connection_mock.send.return_value = self._connection_response(
+            {'access_token': 'ACCESS_TOKEN', 'refresh_token': 'REFRESH_TOKEN'}
+        )
+
+        self.ftd_plugin.login('foo', 'bar')
+
+        expected_body = json.dumps({'grant_type': 'password', 'username': 'foo', 'password': 'bar'})
+        self.connection_mock.send.assert_called_once_with(mock.ANY, expected_body, headers=mock.ANY, method=mock.ANY)
+        assert self.ftd_plugin._refresh_token_expires_at is None
+
     def test_login_should_use_env_variable_when_set(self):
         temp_token_path = self.ftd_plugin.hostvars['token_path']
         self.ftd_plugin.hostvars['token_path'] = '/testFakeLoginUrl'
@@ -167,6 +236,63 @@ class TestFtdHttpApi(unittest.TestCase):
         assert {ResponseParams.SUCCESS: False, ResponseParams.STATUS_CODE: 500,
                 ResponseParams.RESPONSE: {'errorMessage': 'ERROR'}} == resp
 
+    @patch('httpapi_plugins.ftd.time.sleep')
+    def test_send_request_should_retry_throttled_idempotent_request(self, sleep_mock):
+        self.connection_mock.send.side_effect = [
+            HTTPError('http://testhost.com', 503, '', {'Retry-After': '5'}, StringIO('{}')),
+            HTTPError('http://testhost.com', 429, '', {}, StringIO('{}')),
+            self._connection_response({'id': '123'})
+        ]
+
+        resp = self.ftd_plugin.send_request('/test', HTTPMethod.PUT, body_params={'id': '123'})
+
+        assert {ResponseParams.SUCCESS: True, ResponseParams.STATUS_CODE: 200,
+                ResponseParams.RESPONSE: {'id': '123'}} == resp
+        assert 3 == self.connection_mock.send.call_count
+        assert 5.0 == sleep_mock.call_args_list[0][0][0]
+        assert 0 <= sleep_mock.call_args_list[1][0][0] <= 2.0
+        stats = self.ftd_plugin.get_retry_stats()
+        assert (2, 1, 0) == (stats['retries'], stats['retried_requests'], stats['exhausted'])
+
+    @patch('httpapi_plugins.ftd.time.sleep')
+    def test_send_request_should_not_retry_request_that_is_not_idempotent(self, sleep_mock):
+        self.connection_mock.send.side_effect = HTTPError('http://testhost.com', 503, '', {},
+                                                          StringIO('{"errorMessage": "ERROR"}'))
+
+        resp = self.ftd_plugin.send_request('/test', HTTPMethod.POST, body_params={'name': 'obj'})
+
+        assert 503 == resp[ResponseParams.STATUS_CODE]
+        self.connection_mock.send.assert_called_once()
+        sleep_mock.assert_not_called()
+
+    @patch('httpapi_plugins.ftd.time.sleep')
+    def test_send_request_should_not_retry_when_retry_status_codes_are_empty(self, sleep_mock):
+        self.ftd_plugin.hostvars['retry_status_codes'] = []
+        self.connection_mock.send.side_effect = HTTPError('http://testhost.com', 503, '', {},
+                                                          StringIO('{"errorMessage": "BUSY"}'))
+
+        resp = self.ftd_plugin.send_request('/test', HTTPMethod.GET)
+
+        assert 503 == resp[ResponseParams.STATUS_CODE]
+        self.connection_mock.send.assert_called_once()
+        sleep_mock.assert_not_called()
+
+    @patch('httpapi_plugins.ftd.time.sleep')
+    def test_send_request_should_return_error_when_retry_attempts_are_exhausted(self, sleep_mock):
+        self.ftd_plugin.hostvars['retry_max_attempts'] = 2
+        self.connection_mock.send.side_effect = [
+            HTTPError('http://testhost.com', 503, '', {}, StringIO('{}')),
+            HTTPError('http://testhost.com', 503, '', {}, StringIO('{"errorMessage": "BUSY"}'))
+        ]
+
+        resp = self.ftd_plugin.send_request('/test', HTTPMethod.GET)
+
+        assert {ResponseParams.SUCCESS: False, ResponseParams.STATUS_CODE: 503,
+                ResponseParams.RESPONSE: {'errorMessage': 'BUSY'}} == resp
+        assert 1 == sleep_mock.call_count
+        stats = self.ftd_plugin.get_retry_stats()
+        assert (1, 1, 1) == (stats['retries'], stats['retried_requests'], stats['exhausted'])
+
     def test_send_request_raises_exception_when_invalid_response(self):
         self.connection_mock.send.return_value = self._connection_response('nonValidJson')
 
@@ -187,6 +313,193 @@ class TestFtdHttpApi(unittest.TestCase):
         assert 'NEW_ACCESS_TOKEN' == self.ftd_plugin.access_token
         assert 'NEW_REFRESH_TOKEN' == self.ftd_plugin.refresh_token
 
+    def test_handle_httperror_should_not_login_when_token_has_been_refreshed_by_concurrent_request(self):
+        self.connection_mock._auth = {'Authorization': 'Bearer NEW_ACCESS_TOKEN'}
+        self.ftd_plugin._local.request_auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+
+        retry = self.ftd_plugin.handle_httperror(HTTPError('http://testhost.com', 401, '', {}, None))
+
+        assert retry
+        self.connection_mock.send.assert_not_called()
+        assert {'Authorization': 'Bearer NEW_ACCESS_TOKEN'} == self.ftd_plugin._local.request_auth
+
+    def test_send_requests_should_return_responses_in_order_of_requests(self):
+        def send(url, data, **kwargs):
+            # the first request completes last
+            if url == '/test/1':
+                time.sleep(0.05)
+            return self._connection_response({'url': url})
+        self.connection_mock.send.side_effect = send
+
+        responses = self.ftd_plugin.send_requests([
+            {'url_path': '/test/{objId}', 'http_method': HTTPMethod.GET, 'path_params': {'objId': str(i)}}
+            for i in range(1, 4)
+        ])
+
+        assert [{'url': '/test/1'}, {'url': '/test/2'}, {'url': '/test/3'}] == \
+            [resp[ResponseParams.RESPONSE] for resp in responses]
+
+    def test_send_requests_should_send_requests_sequentially_when_concurrency_is_disabled(self):
+        self.ftd_plugin.hostvars['request_concurrency'] = 1
+        self.connection_mock.send.return_value = self._connection_response({})
+
+        with patch('httpapi_plugins.ftd.ThreadPool') as pool_mock:
+            responses = self.ftd_plugin.send_requests([{'url_path': '/test', 'http_method': HTTPMethod.GET}] * 2)
+
+        pool_mock.assert_not_called()
+        assert 2 == len(responses)
+        assert 2 == self.connection_mock.send.call_count
+
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_path_params', mock.Mock(return_value=(True, None)))
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_query_params', mock.Mock(return_value=(True, None)))
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_data')
+    def test_validate_and_send_request_should_send_request_with_valid_params(self, validate_data_mock):
+        validate_data_mock.return_value = True, None
+        self.connection_mock.send.return_value = self._connection_response({'id': '123'})
+
+        result = self.ftd_plugin.validate_and_send_request('editTest', '/test/{objId}', HTTPMethod.PUT,
+                                                           {'name': 'foo'}, {'objId': '123'})
+
+        assert {ValidatedResponseParams.VALIDATION_REPORT: {},
+                ValidatedResponseParams.RESPONSE: {ResponseParams.SUCCESS: True, ResponseParams.STATUS_CODE: 200,
+                                                   ResponseParams.RESPONSE: {'id': '123'}}} == result
+        validate_data_mock.assert_called_once_with('editTest', {'name': 'foo'})
+        self.connection_mock.send.assert_called_once_with('/test/123', '{"name": "foo"}', method=HTTPMethod.PUT,
+                                                          headers=BASE_HEADERS)
+
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_path_params', mock.Mock(return_value=(True, None)))
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_query_params', mock.Mock(return_value=(True, None)))
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_data', mock.Mock(return_value=(False, 'Invalid name')))
+    def test_validate_and_send_request_should_not_send_request_with_invalid_params(self):
+        result = self.ftd_plugin.validate_and_send_request('addTest', '/test', HTTPMethod.POST, {'name': 1})
+
+        assert {ValidatedResponseParams.VALIDATION_REPORT: {'Invalid data provided': 'Invalid name'},
+                ValidatedResponseParams.RESPONSE: None} == result
+        self.connection_mock.send.assert_not_called()
+
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_path_params', mock.Mock(return_value=(True, None)))
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_query_params')
+    def test_validate_and_send_requests_should_send_valid_requests_only(self, validate_query_params_mock):
+        validate_query_params_mock.side_effect = [(True, None), (False, 'Invalid limit'), (True, None)]
+        self.connection_mock.send.return_value = self._connection_response({})
+
+        results = self.ftd_plugin.validate_and_send_requests([
+            {'operation_name': 'getTestList', 'url_path': '/test', 'http_method': HTTPMethod.GET,
+             'query_params': {'limit': limit}} for limit in (1, 'foo', 3)
+        ])
+
+        assert [{}, {'Invalid query_params provided': 'Invalid limit'}, {}] == \
+            [result[ValidatedResponseParams.VALIDATION_REPORT] for result in results]
+        assert [True, False, True] == [result[ValidatedResponseParams.RESPONSE] is not None for result in results]
+        assert 2 == self.connection_mock.send.call_count
+
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_path_params', mock.Mock(return_value=(True, None)))
+    @patch.object(FakeFtdHttpApiPlugin, 'validate_query_params', mock.Mock(return_value=(True, None)))
+    def test_validate_and_send_requests_should_not_send_requests_in_check_mode(self):
+        results = self.ftd_plugin.validate_and_send_requests(
+            [{'operation_name': 'getTestList', 'url_path': '/test', 'http_method': HTTPMethod.GET}], True)
+
+        assert [{ValidatedResponseParams.VALIDATION_REPORT: {}, ValidatedResponseParams.RESPONSE: None}] == results
+        self.connection_mock.send.assert_not_called()
+
+    @patch('httpapi_plugins.ftd.KeepAliveConnectionPool')
+    def test_send_request_should_use_connection_pool_when_enabled(self, pool_class_mock):
+        self.ftd_plugin.hostvars['connection_pool'] = True
+        self.connection_mock._url = 'https://testhost.com'
+        self.connection_mock._auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+        pool_mock = pool_class_mock.return_value
+        pool_mock.request.return_value = (200, 'OK', {}, b'{"id": "123"}')
+
+        resp = self.ftd_plugin.send_request('/test/{objId}', HTTPMethod.GET, path_params={'objId': '123'})
+
+        assert {ResponseParams.SUCCESS: True, ResponseParams.STATUS_CODE: 200,
+                ResponseParams.RESPONSE: {'id': '123'}} == resp
+        expected_headers = dict(BASE_HEADERS, Authorization='Bearer ACCESS_TOKEN')
+        pool_mock.request.assert_called_once_with(HTTPMethod.GET, '/test/123', None, expected_headers)
+        self.connection_mock.send.assert_not_called()
+
+    def test_send_request_should_send_pooled_requests_with_uppercase_methods(self):
+        requests = []
+
+        class RecordingHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                requests.append((self.command, self.path))
+                self.send_response(200)
+                self.send_header('Content-Length', '2')
+                self.end_headers()
+                self.wfile.write(b'{}')
+
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), RecordingHandler)
+        server_thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05})
+        server_thread.daemon = True
+        server_thread.start()
+        self.ftd_plugin.hostvars['connection_pool'] = True
+        self.connection_mock._url = 'http://127.0.0.1:%s' % server.server_address[1]
+        self.connection_mock._auth = None
+        self.connection_mock.get_option.side_effect = {'timeout': 5, 'validate_certs': False}.get
+        try:
+            assert self.ftd_plugin.send_request('/test', HTTPMethod.GET)[ResponseParams.SUCCESS]
+            assert self.ftd_plugin.send_request('/test', HTTPMethod.POST, {'name': 'foo'})[ResponseParams.SUCCESS]
+        finally:
+            self.ftd_plugin._close_connection_pool()
+            server.shutdown()
+            server.server_close()
+
+        assert [('GET', '/test'), ('POST', '/test')] == requests
+
+    @patch('httpapi_plugins.ftd.KeepAliveConnectionPool')
+    def test_send_request_should_login_and_retry_when_pooled_request_is_unauthorized(self, pool_class_mock):
+        self.ftd_plugin.hostvars['connection_pool'] = True
+        self.ftd_plugin.refresh_token = 'REFRESH_TOKEN'
+        self.connection_mock._url = 'https://testhost.com'
+        self.connection_mock._auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+        self.connection_mock.send.return_value = self._connection_response(
+            {'access_token': 'NEW_ACCESS_TOKEN', 'refresh_token': 'NEW_REFRESH_TOKEN'}
+        )
+        pool_mock = pool_class_mock.return_value
+        pool_mock.request.side_effect = [(401, 'Unauthorized', {}, b'{}'), (200, 'OK', {}, b'{}')]
+
+        resp = self.ftd_plugin.send_request('/test', HTTPMethod.GET)
+
+        assert resp[ResponseParams.SUCCESS]
+        assert 2 == pool_mock.request.call_count
+        assert 'Bearer NEW_ACCESS_TOKEN' == pool_mock.request.call_args[0][3]['Authorization']
+
+    @patch('httpapi_plugins.ftd.KeepAliveConnectionPool')
+    def test_send_request_should_return_error_info_when_pooled_request_fails(self, pool_class_mock):
+        self.ftd_plugin.hostvars['connection_pool'] = True
+        self.connection_mock._url = 'https://testhost.com'
+        self.connection_mock._auth = None
+        pool_class_mock.return_value.request.return_value = (500, 'Server Error', {}, b'{"errorMessage": "ERROR"}')
+
+        resp = self.ftd_plugin.send_request('/test', HTTPMethod.GET)
+
+        assert {ResponseParams.SUCCESS: False, ResponseParams.STATUS_CODE: 500,
+                ResponseParams.RESPONSE: {'errorMessage': 'ERROR'}} == resp
+
+    @patch('httpapi_plugins.ftd.KeepAliveConnectionPool')
+    def test_logout_should_close_connection_pool(self, pool_class_mock):
+        self.ftd_plugin.hostvars['connection_pool'] = True
+        self.connection_mock._url = 'https://testhost.com'
+        self.connection_mock._auth = None
+        self.connection_mock.send.return_value = self._connection_response(None)
+        pool_mock = pool_class_mock.return_value
+        pool_mock.request.return_value = (200, 'OK', {}, b'{}')
+        pool_mock.get_stats.return_value = {'requests': 1, 'connections': 1, 'reused': 0, 'expired': 0, 'resumed': 0}
+        self.ftd_plugin.send_request('/test', HTTPMethod.GET)
+
+        self.ftd_plugin.logout()
+
+        pool_mock.close.assert_called_once_with()
+        assert self.ftd_plugin.get_connection_pool_stats() is None
+
     def test_handle_httperror_should_not_retry_on_non_auth_errors(self):
         assert not self.ftd_plugin.handle_httperror(HTTPError('http://testhost.com', 500, '', {}, None))
 
@@ -194,63 +507,145 @@ class TestFtdHttpApi(unittest.TestCase):
         self.ftd_plugin._ignore_http_errors = True
         assert not self.ftd_plugin.handle_httperror(HTTPError('http://testhost.com', 401, '', {}, None))
 
-    @patch('os.path.isdir', mock.Mock(return_value=False))
-    def test_download_file(self):
-        self.connection_mock.send.return_value = self._connection_response('File content')
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_download_file(self, open_url_mock):
+        self.connection_mock._auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+        open_url_mock.return_value = self._stream_response([b'File ', b'content'])
+        to_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, to_dir)
+        to_path = os.path.join(to_dir, 'test.txt')
+
+        with patch('httpapi_plugins.ftd.DOWNLOAD_CHUNK_SIZE', 5):
+            self.ftd_plugin.download_file('/files/1', to_path)
+
+        with open(to_path, 'rb') as downloaded_file:
+            assert b'File content' == downloaded_file.read()
+        assert ['test.txt'] == os.listdir(to_dir)
+        open_url_mock.assert_called_once_with('https://testhost.com/files/1', data=None, method=HTTPMethod.GET,
+                                              headers=dict(BASE_HEADERS, Authorization='Bearer ACCESS_TOKEN'),
+                                              timeout=mock.ANY, validate_certs=mock.ANY)
+        open_url_mock.return_value.close.assert_called_once_with()
+        self.connection_mock.send.assert_not_called()
+
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_download_file_should_extract_filename_from_headers(self, open_url_mock):
+        self.connection_mock._auth = None
+        filename = 'test_file.txt'
+        open_url_mock.return_value = self._stream_response(
+            [b'File content'], {'Content-Disposition': 'attachment; filename="%s"' % filename})
+        to_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, to_dir)
 
-        open_mock = mock_open()
-        with patch('%s.open' % BUILTINS_NAME, open_mock):
-            self.ftd_plugin.download_file('/files/1', '/tmp/test.txt')
+        self.ftd_plugin.download_file('/files/1', to_dir)
 
-        open_mock.assert_called_once_with('/tmp/test.txt', 'wb')
-        open_mock().write.assert_called_once_with(b'File content')
+        with open(os.path.join(to_dir, filename), 'rb') as downloaded_file:
+            assert b'File content' == downloaded_file.read()
 
-    @patch('os.path.isdir', mock.Mock(return_value=True))
-    def test_download_file_should_extract_filename_from_headers(self):
-        filename = 'test_file.txt'
-        response = mock.Mock()
-        response.info.return_value = {'Content-Disposition': 'attachment; filename="%s"' % filename}
-        dummy, response_data = self._connection_response('File content')
-        self.connection_mock.send.return_value = response, response_data
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_download_file_should_not_leave_partial_file_when_download_fails(self, open_url_mock):
+        self.connection_mock._auth = None
+        response = self._stream_response([b'File '])
+        response.read.side_effect = [b'File ', IOError('Connection reset')]
+        open_url_mock.return_value = response
+        to_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, to_dir)
 
-        open_mock = mock_open()
-        with patch('%s.open' % BUILTINS_NAME, open_mock):
-            self.ftd_plugin.download_file('/files/1', '/tmp/')
+        with self.assertRaises(IOError):
+            self.ftd_plugin.download_file('/files/1', os.path.join(to_dir, 'test.txt'))
 
-        open_mock.assert_called_once_with('/tmp/%s' % filename, 'wb')
-        open_mock().write.assert_called_once_with(b'File content')
+        assert [] == os.listdir(to_dir)
+        response.close.assert_called_once_with()
 
-    @patch('os.path.basename', mock.Mock(return_value='test.txt'))
-    @patch('httpapi_plugins.ftd.encode_multipart_formdata',
-           mock.Mock(return_value=('--Encoded data--', 'multipart/form-data')))
-    def test_upload_file(self):
-        self.connection_mock.send.return_value = self._connection_response({'id': '123'})
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_download_file_should_login_and_retry_when_unauthorized(self, open_url_mock):
+        self.connection_mock._auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+        open_url_mock.side_effect = [HTTPError('http://testhost.com', 401, '', {}, None),
+                                     self._stream_response([b'File content'])]
+        to_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, to_dir)
+
+        with patch.object(self.ftd_plugin, 'login') as login_mock:
+            self.ftd_plugin.download_file('/files/1', os.path.join(to_dir, 'test.txt'))
+
+        assert login_mock.called
+        assert 2 == open_url_mock.call_count
+
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_upload_file(self, open_url_mock):
+        self.connection_mock._auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+        sent_bodies = []
 
-        open_mock = mock_open()
-        with patch('%s.open' % BUILTINS_NAME, open_mock):
-            resp = self.ftd_plugin.upload_file('/tmp/test.txt', '/files')
+        def open_url(url, data, headers, **kwargs):
+            sent_bodies.append((data.read(), headers))
+            return self._stream_response([b'{"id": "123"}'])
+
+        open_url_mock.side_effect = open_url
+        from_path = self._create_temp_file(b'File content')
+
+        resp = self.ftd_plugin.upload_file(from_path, '/files')
 
         assert {'id': '123'} == resp
-        exp_headers = dict(BASE_HEADERS)
-        exp_headers['Content-Length'] = len('--Encoded data--')
-        exp_headers['Content-Type'] = 'multipart/form-data'
-        self.connection_mock.send.assert_called_once_with('/files', data='--Encoded data--',
-                                                          headers=exp_headers, method=HTTPMethod.POST)
-        open_mock.assert_called_once_with('/tmp/test.txt', 'rb')
-
-    @patch('os.path.basename', mock.Mock(return_value='test.txt'))
-    @patch('httpapi_plugins.ftd.encode_multipart_formdata',
-           mock.Mock(return_value=('--Encoded data--', 'multipart/form-data')))
-    def test_upload_file_raises_exception_when_invalid_response(self):
-        self.connection_mock.send.return_value = self._connection_response('invalidJsonResponse')
-
-        open_mock = mock_open()
-        with patch('%s.open' % BUILTINS_NAME, open_mock):
-            with self.assertRaises(ConnectionError) as res:
-                self.ftd_plugin.upload_file('/tmp/test.txt', '/files')
+        body, headers = sent_bodies[0]
+        boundary = headers['Content-Type'].split('boundary=')[1]
+        field = RequestField('fileToUpload', b'File content', os.path.basename(from_path))
+        field.make_multipart()
+        assert (body, 'multipart/form-data; boundary=%s' % boundary) == encode_multipart_formdata([field], boundary)
+        assert len(body) == headers['Content-Length']
+        assert 'Bearer ACCESS_TOKEN' == headers['Authorization']
+
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_upload_file_should_send_whole_file_again_after_login(self, open_url_mock):
+        self.connection_mock._auth = {'Authorization': 'Bearer ACCESS_TOKEN'}
+        sent_bodies = []
+
+        def open_url(url, data, headers, **kwargs):
+            sent_bodies.append(data.read())
+            if len(sent_bodies) == 1:
+                raise HTTPError('http://testhost.com', 401, '', {}, None)
+            return self._stream_response([b'{"id": "123"}'])
+
+        open_url_mock.side_effect = open_url
+        from_path = self._create_temp_file(b'File content')
+
+        with patch.object(self.ftd_plugin, 'login'):
+            self.ftd_plugin.upload_file(from_path, '/files')
+
+        assert 2 == len(sent_bodies)
+        assert sent_bodies[0] == sent_bodies[1]
+        assert b'File content' in sent_bodies[1]
+
+    @patch('httpapi_plugins.ftd.open_url')
+    def test_upload_file_raises_exception_when_invalid_response(self, open_url_mock):
+        self.connection_mock._auth = None
+        open_url_mock.return_value = self._stream_response([b'invalidJsonResponse'])
+        from_path = self._create_temp_file(b'File content')
+
+        with self.assertRaises(ConnectionError) as res:
+            self.ftd_plugin.upload_file(from_path, '/files')
 
         assert 'Invalid JSON response' in str(res.exception)
 
+    def _create_temp_file(self, content):
+        fd, file_path = tempfile.mkstemp(suffix='.txt')
+        self.addCleanup(os.remove, file_path)
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(content)
+        return file_path
+
+    def test_object_index_should_be_kept_between_calls(self):
+        obj = {'id': '1', 'name': 'obj1', 'version': 'a'}
+        assert not self.ftd_plugin.is_object_index_enabled()
+        assert (False, None) == self.ftd_plugin.get_indexed_object('NetworkObject', 'obj1')
+
+        self.ftd_plugin.index_objects('NetworkObject', [obj])
+        assert (True, obj) == self.ftd_plugin.get_indexed_object('NetworkObject', 'obj1')
+
+        self.ftd_plugin.remove_indexed_object('NetworkObject', '1')
+        assert (True, None) == self.ftd_plugin.get_indexed_object('NetworkObject', 'obj1')
+
+        self.ftd_plugin.invalidate_object_index()
+        assert (False, None) == self.ftd_plugin.get_indexed_object('NetworkObject', 'obj1')
+
     @patch.object(FdmSwaggerParser, 'parse_spec')
     def test_get_operation_spec(self, parse_spec_mock):
         self.connection_mock.send.return_value = self._connection_response(None)
@@ -309,10 +704,112 @@ class TestFtdHttpApi(unittest.TestCase):
 
         assert self.ftd_plugin.get_operation_specs_by_model_name('nonExistingOperation') is None
 
+    @patch.object(FdmSwaggerParser, 'parse_spec')
+    def test_api_spec_should_be_downloaded_when_cache_is_disabled(self, parse_spec_mock):
+        self.connection_mock.send.return_value = self._connection_response({'basePath': '/api'})
+        parse_spec_mock.return_value = {SpecProp.OPERATIONS: {}}
+
+        assert {SpecProp.OPERATIONS: {}} == self.ftd_plugin.api_spec
+        self.connection_mock.send.assert_called_once_with('/testSpecUrl', None, method=HTTPMethod.GET,
+                                                          headers=BASE_HEADERS)
+
+    @patch.object(FdmSwaggerParser, 'parse_spec')
+    def test_api_spec_should_be_stored_in_cache_and_loaded_by_next_connection(self, parse_spec_mock):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        parsed_spec = {SpecProp.OPERATIONS: {'testOp': {'url': '/test'}}}
+        parse_spec_mock.return_value = parsed_spec
+        system_info = {'databaseInfo': {'buildVersion': '6.4.0-102'}}
+
+        self.ftd_plugin.hostvars.update({'token_path': '/api/fdm/v3/fdm/token', 'spec_cache': True,
+                                         'spec_cache_dir': cache_dir})
+        self.connection_mock.send.side_effect = [self._connection_response(system_info),
+                                                 self._connection_response({'basePath': '/api'})]
+        assert parsed_spec == self.ftd_plugin.api_spec
+
+        next_plugin = FakeFtdHttpApiPlugin(self.connection_mock)
+        next_plugin.hostvars = self.ftd_plugin.hostvars
+        self.connection_mock.send.reset_mock()
+        self.connection_mock.send.side_effect = [self._connection_response(system_info)]
+
+        assert parsed_spec == next_plugin.api_spec
+        self.connection_mock.send.assert_called_once_with('/api/fdm/v3/operational/systeminfo/default', None,
+                                                          method=HTTPMethod.GET, headers=BASE_HEADERS)
+        assert 1 == parse_spec_mock.call_count
+
+    @patch.object(FdmSwaggerParser, 'parse_spec')
+    @patch.object(SpecCache, 'store')
+    def test_api_spec_should_not_be_cached_when_build_version_is_unknown(self, store_mock, parse_spec_mock):
+        self.ftd_plugin.hostvars['spec_cache'] = True
+        self.connection_mock.send.return_value = self._connection_response({'basePath': '/api'})
+        parse_spec_mock.return_value = {SpecProp.OPERATIONS: {}}
+
+        assert {SpecProp.OPERATIONS: {}} == self.ftd_plugin.api_spec
+        self.connection_mock.send.assert_called_once_with('/testSpecUrl', None, method=HTTPMethod.GET,
+                                                          headers=BASE_HEADERS)
+        assert not store_mock.called
+
+    @patch.object(FdmSwaggerParser, 'parse_spec')
+    @patch.object(SpecCache, 'load', mock.Mock(side_effect=OSError('Permission denied')))
+    def test_api_spec_should_be_downloaded_when_cache_fails(self, parse_spec_mock):
+        self.ftd_plugin.hostvars.update({'token_path': '/api/fdm/v3/fdm/token', 'spec_cache': True})
+        self.connection_mock.send.side_effect = [
+            self._connection_response({'databaseInfo': {'buildVersion': '6.4.0-102'}}),
+            self._connection_response({'basePath': '/api'})
+        ]
+        parse_spec_mock.return_value = {SpecProp.OPERATIONS: {}}
+
+        with patch.object(SpecCache, 'store', mock.Mock(side_effect=OSError('Permission denied'))):
+            assert {SpecProp.OPERATIONS: {}} == self.ftd_plugin.api_spec
+
+    @patch.object(FdmSwaggerParser, 'parse_spec')
+    def test_api_spec_should_be_revalidated_with_conditional_request(self, parse_spec_mock):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.connection_mock._url = 'https://ftd.example.com'
+        self.ftd_plugin.hostvars.update({'spec_cache': True, 'spec_cache_dir': cache_dir})
+        parsed_spec = {SpecProp.OPERATIONS: {'testOp': {'url': '/test'}}}
+        parse_spec_mock.return_value = parsed_spec
+        spec_headers = {'ETag': '"spec-etag"', 'Last-Modified': 'Mon, 02 Mar 2020 10:00:00 GMT'}
+        self.connection_mock.send.return_value = self._connection_response({'basePath': '/api'},
+                                                                           headers=spec_headers)
+        assert parsed_spec == self.ftd_plugin.api_spec
+
+        next_plugin = FakeFtdHttpApiPlugin(self.connection_mock)
+        next_plugin.hostvars = self.ftd_plugin.hostvars
+        self.connection_mock.send.reset_mock()
+        self.connection_mock.send.side_effect = HTTPError('https://ftd.example.com', 304, '', {}, None)
+
+        assert parsed_spec == next_plugin.api_spec
+        exp_headers = dict(BASE_HEADERS)
+        exp_headers['If-None-Match'] = '"spec-etag"'
+        exp_headers['If-Modified-Since'] = 'Mon, 02 Mar 2020 10:00:00 GMT'
+        self.connection_mock.send.assert_called_once_with('/testSpecUrl', None, method=HTTPMethod.GET,
+                                                          headers=exp_headers)
+        assert 1 == parse_spec_mock.call_count
+        assert {'hits': 0, 'revalidations': 1, 'misses': 0} == next_plugin._spec_cache_stats
+
+    def test_api_spec_raises_exception_when_download_fails(self):
+        self.connection_mock.send.side_effect = HTTPError('http://testhost.com', 500, '', {},
+                                                          StringIO('{"errorMessage": "ERROR"}'))
+
+        with self.assertRaises(ConnectionError) as res:
+            self.ftd_plugin.get_operation_spec('testOp')
+
+        assert 'Failed to download API specification. Status code: 500' in str(res.exception)
+
+    @staticmethod
+    def _stream_response(chunks, headers=None):
+        response = mock.Mock()
+        response.info.return_value = headers or {}
+        response.read.side_effect = list(chunks) + [b'']
+        return response
+
     @staticmethod
-    def _connection_response(response, status=200):
+    def _connection_response(response, status=200, headers=None):
         response_mock = mock.Mock()
         response_mock.getcode.return_value = status
+        response_mock.info.return_value = headers or {}
         response_text = json.dumps(response) if type(response) is dict else response
         response_data = BytesIO(response_text.encode() if response_text else ''.encode())
         return response_mock, response_data
@@ -392,6 +889,55 @@ class TestFtdHttpApi(unittest.TestCase):
         set_api_token_mock.assert_called_once_with(url)
         assert resp == response_mock
 
+    @patch('httpapi_plugins.ftd.HttpApi._get_supported_api_versions')
+    def test_lookup_login_url_should_store_discovered_token_path_and_reuse_it(self, get_supported_api_versions_mock):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.connection_mock._url = 'https://10.0.0.1'
+        self.ftd_plugin.hostvars.update({'token_path': None, 'token_path_cache': True,
+                                         'token_path_cache_dir': cache_dir})
+        get_supported_api_versions_mock.return_value = ['v3', 'v2']
+        self.connection_mock.send.side_effect = [
+            ConnectionError('Not found', http_code=404),
+            self._connection_response({'access_token': 'ACCESS_TOKEN'})
+        ]
+
+        self.ftd_plugin._lookup_login_url({})
+        assert '/api/fdm/v2/fdm/token' == self.ftd_plugin.hostvars['token_path']
+
+        next_plugin = FakeFtdHttpApiPlugin(self.connection_mock)
+        next_plugin.hostvars.update({'token_path': None, 'token_path_cache': True, 'token_path_cache_dir': cache_dir})
+        self.connection_mock.send.reset_mock()
+        self.connection_mock.send.side_effect = None
+        self.connection_mock.send.return_value = self._connection_response({'access_token': 'ACCESS_TOKEN'})
+
+        next_plugin._lookup_login_url({})
+
+        assert '/api/fdm/v2/fdm/token' == next_plugin.hostvars['token_path']
+        assert 1 == get_supported_api_versions_mock.call_count
+        self.connection_mock.send.assert_called_once_with('/api/fdm/v2/fdm/token', mock.ANY, method=HTTPMethod.POST,
+                                                          headers=BASE_HEADERS)
+
+    @patch('httpapi_plugins.ftd.HttpApi._get_known_token_paths')
+    def test_lookup_login_url_should_discover_token_path_when_cached_one_is_not_found(self,
+                                                                                      get_known_token_paths_mock):
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        self.connection_mock._url = 'https://10.0.0.1'
+        self.ftd_plugin.hostvars.update({'token_path': None, 'token_path_cache': True,
+                                         'token_path_cache_dir': cache_dir})
+        TokenPathCache(cache_dir).store('https://10.0.0.1', '/api/fdm/v2/fdm/token')
+        get_known_token_paths_mock.return_value = ['/api/fdm/v3/fdm/token']
+        self.connection_mock.send.side_effect = [
+            ConnectionError('Not found', http_code=404),
+            self._connection_response({'access_token': 'ACCESS_TOKEN'})
+        ]
+
+        self.ftd_plugin._lookup_login_url({})
+
+        assert '/api/fdm/v3/fdm/token' == self.ftd_plugin.hostvars['token_path']
+        assert '/api/fdm/v3/fdm/token' == TokenPathCache(cache_dir).load('https://10.0.0.1')
+
     @patch('httpapi_plugins.ftd.HttpApi._get_supported_api_versions')
     def test_get_known_token_paths_with_positive_response(self, get_list_of_supported_api_versions_mock):
         test_versions = ['v1', 'v2']
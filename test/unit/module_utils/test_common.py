@@ -16,7 +16,8 @@
 # along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
 #
 
-from module_utils.common import equal_objects, delete_ref_duplicates, construct_ansible_facts
+from module_utils.common import equal_objects, delete_ref_duplicates, construct_ansible_facts, ComparableObject, \
+    get_object_diff
 
 
 # simple objects
@@ -288,6 +289,83 @@ def test_equal_objects_return_true_with_reference_list_containing_duplicates():
     )
 
 
+def test_equal_objects_compare_all_fields_when_objects_have_no_common_fields():
+    assert not equal_objects({'foo': 1}, {'bar': 1})
+    assert equal_objects({'id': '1', 'foo': None}, {'version': '2'})
+
+
+def test_comparable_object_fingerprint_ignores_non_comparable_fields_and_ref_details():
+    obj = ComparableObject({
+        'name': 'foo',
+        'id': '1',
+        'description': None,
+        'ports': [{'id': '123', 'type': 'port', 'name': 'oldPortName'},
+                  {'id': '123', 'type': 'port', 'name': 'oldPortName'}]
+    })
+    same_obj = ComparableObject({
+        'name': u'foo',
+        'version': 'abc',
+        'ports': [{'id': '123', 'type': 'port', 'name': 'newPortName'}]
+    })
+
+    assert obj.fingerprint() == same_obj.fingerprint()
+    assert obj.equals(same_obj, compare_common_fields_only=False)
+
+
+def test_comparable_object_fingerprint_differs_for_values_of_different_types():
+    assert ComparableObject({'foo': 1}).fingerprint() != ComparableObject({'foo': '1'}).fingerprint()
+    assert ComparableObject({'foo': 1}).fingerprint() != ComparableObject({'foo': 1.0}).fingerprint()
+    assert ComparableObject({'foo': 1}).fingerprint() != ComparableObject({'foo': True}).fingerprint()
+    assert ComparableObject({'foo': [1, 2]}).fingerprint() != ComparableObject({'foo': [2, 1]}).fingerprint()
+
+
+def test_comparable_object_should_compare_common_fields_only():
+    desired = ComparableObject({'name': 'foo', 'value': 1})
+    candidates = [{'name': 'foo', 'value': 2}, {'name': 'foo', 'value': 1, 'extra': 'bar'}, {'name': 'foo'}]
+
+    assert [False, True, True] == [desired.equals(ComparableObject(c)) for c in candidates]
+    assert [False, False, False] == [desired.equals(ComparableObject(c), compare_common_fields_only=False)
+                                     for c in candidates]
+
+
+def test_get_object_diff_return_empty_diff_for_equal_objects():
+    assert {} == get_object_diff(
+        {'id': '1', 'name': 'foo', 'ports': [{'id': '1', 'type': 'port', 'name': 'a'}] * 2},
+        {'name': b'foo', 'ports': [{'id': '1', 'type': 'port', 'name': 'b'}], 'extra': 'bar'}
+    )
+
+
+def test_get_object_diff_return_paths_of_changed_nested_values():
+    existing_obj = {
+        'name': 'policy',
+        'config': {'mode': 'a', 'timeout': 10},
+        'rules': [{'name': 'rule1', 'action': 'PERMIT'}, {'name': 'rule2', 'action': 'DENY'}],
+        'zone': {'id': '1', 'type': 'securityzone', 'name': 'inside'}
+    }
+    desired_obj = {
+        'name': 'policy',
+        'config': {'mode': 'a', 'timeout': 20},
+        'rules': [{'name': 'rule1', 'action': 'PERMIT'}, {'name': 'rule2', 'action': 'PERMIT'}],
+        'zone': {'id': '2', 'type': 'securityzone', 'name': 'outside'}
+    }
+
+    assert {
+        'config.timeout': {'before': 10, 'after': 20},
+        'rules[1].action': {'before': 'DENY', 'after': 'PERMIT'},
+        'zone': {'before': existing_obj['zone'], 'after': desired_obj['zone']}
+    } == get_object_diff(existing_obj, desired_obj)
+
+
+def test_get_object_diff_report_lists_of_different_length_and_missing_fields_as_whole():
+    assert {
+        'ports': {'before': [1], 'after': [1, 2]},
+        'description': {'before': None, 'after': 'desc'}
+    } == get_object_diff({'name': 'foo', 'ports': [1]}, {'name': 'foo', 'ports': [1, 2], 'description': 'desc'},
+                         compare_common_fields_only=False)
+    assert {'config.extra': {'before': None, 'after': 'bar'}} == get_object_diff(
+        {'config': {'mode': 'a'}}, {'config': {'mode': 'a', 'extra': 'bar'}})
+
+
 def test_delete_ref_duplicates_with_none():
     assert delete_ref_duplicates(None) is None
 
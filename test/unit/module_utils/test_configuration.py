@@ -17,21 +17,39 @@
 #
 
 import json
+import os
 import unittest
+from functools import partial
 
 import pytest
 from units.compat import mock
 from units.compat.mock import call, patch
 
 from module_utils.configuration import iterate_over_pageable_resource, BaseConfigurationResource, \
-    OperationChecker, OperationNamePrefix, ParamName, QueryParams
+    OperationChecker, OperationNamePrefix, ParamName, QueryParams, PageSize, DEFAULT_PAGE_SIZE, MIN_PAGE_SIZE, \
+    MULTIPLE_DUPLICATES_FOUND_ERROR, DUPLICATE_ERROR, BulkItemResult, CheckModeException, PlannedChange, PlanAction, \
+    DeploymentResult
+from ansible.module_utils.connection import ConnectionError
+from ansible.module_utils.six import get_unbound_function
+from httpapi_plugins.ftd import HttpApi
 
 try:
-    from ansible.module_utils.common import HTTPMethod, FtdUnexpectedResponse
-    from ansible.module_utils.fdm_swagger_client import ValidationError, OperationField
+    from ansible.module_utils.common import HTTPMethod, FtdUnexpectedResponse, FtdServerError, FtdConfigurationError, \
+        ResponseParams
+    from ansible.module_utils.fdm_swagger_client import ValidationError, OperationField, FdmSwaggerParser
 except ImportError:
-    from module_utils.common import HTTPMethod, FtdUnexpectedResponse
-    from module_utils.fdm_swagger_client import ValidationError, OperationField
+    from module_utils.common import HTTPMethod, FtdUnexpectedResponse, FtdServerError, FtdConfigurationError, \
+        ResponseParams
+    from module_utils.fdm_swagger_client import ValidationError, OperationField, FdmSwaggerParser
+
+TEST_DATA_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_data')
+
+
+def delegate_to_plugin(connection_mock, *method_names):
+    # composite methods of the plugin are executed on top of the mocked validation and request methods
+    for method_name in method_names:
+        plugin_method = partial(get_unbound_function(getattr(HttpApi, method_name)), connection_mock)
+        getattr(connection_mock, method_name).side_effect = plugin_method
 
 
 class TestBaseConfigurationResource(object):
@@ -42,6 +60,8 @@ class TestBaseConfigurationResource(object):
         connection_instance.validate_data.return_value = True, None
         connection_instance.validate_query_params.return_value = True, None
         connection_instance.validate_path_params.return_value = True, None
+        connection_instance.is_object_index_enabled.return_value = False
+        delegate_to_plugin(connection_instance, 'validate_and_send_request')
 
         return connection_instance
 
@@ -73,7 +93,7 @@ class TestBaseConfigurationResource(object):
         assert objects == list(resource.get_objects_by_filter('test', {}))
         send_request_mock.assert_has_calls(
             [
-                mock.call('/object/', 'get', {}, {}, {'limit': 10, 'offset': 0})
+                mock.call('/object/', 'get', {}, {}, {'limit': DEFAULT_PAGE_SIZE, 'offset': 0}, operation_name='test')
             ]
         )
 
@@ -84,7 +104,9 @@ class TestBaseConfigurationResource(object):
         assert [objects[0]] == list(resource.get_objects_by_filter('test', {ParamName.FILTERS: {'name': 'obj1'}}))
         send_request_mock.assert_has_calls(
             [
-                mock.call('/object/', 'get', {}, {}, {QueryParams.FILTER: 'name:obj1', 'limit': 10, 'offset': 0})
+                mock.call('/object/', 'get', {}, {},
+                          {QueryParams.FILTER: 'name:obj1', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0},
+                          operation_name='test')
             ]
         )
 
@@ -98,7 +120,9 @@ class TestBaseConfigurationResource(object):
 
         send_request_mock.assert_has_calls(
             [
-                mock.call('/object/', 'get', {}, {}, {QueryParams.FILTER: 'name:obj2', 'limit': 10, 'offset': 0})
+                mock.call('/object/', 'get', {}, {},
+                          {QueryParams.FILTER: 'name:obj2', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0},
+                          operation_name='test')
             ]
         )
 
@@ -131,7 +155,7 @@ class TestBaseConfigurationResource(object):
             {ParamName.FILTERS: {'type': 'foo'}}))
         send_request_mock.assert_has_calls(
             [
-                mock.call('/object/', 'get', {}, {}, {'limit': 10, 'offset': 0})
+                mock.call('/object/', 'get', {}, {}, {'limit': DEFAULT_PAGE_SIZE, 'offset': 0}, operation_name='test')
             ]
         )
 
@@ -155,11 +179,319 @@ class TestBaseConfigurationResource(object):
         assert [{'name': 'obj1', 'type': 'foo'}, {'name': 'obj3', 'type': 'foo'}] == resp
         send_request_mock.assert_has_calls(
             [
-                mock.call('/object/', 'get', {}, {}, {'limit': 2, 'offset': 0}),
-                mock.call('/object/', 'get', {}, {}, {'limit': 2, 'offset': 2})
+                mock.call('/object/', 'get', {}, {}, {'limit': 2, 'offset': 0}, operation_name='test'),
+                mock.call('/object/', 'get', {}, {}, {'limit': 2, 'offset': 2}, operation_name='test')
             ]
         )
 
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_get_objects_by_filter_should_send_supported_filters_to_server(self, send_request_mock,
+                                                                           fetch_system_info_mock, connection_mock):
+        objects = [
+            {'name': 'obj1', 'subType': 'HOST', 'value': '1.1.1.1', 'isSystemDefined': False},
+            {'name': 'obj2', 'subType': 'HOST', 'value': '1.1.1.1', 'isSystemDefined': True}
+        ]
+        send_request_mock.side_effect = [{'items': objects}]
+        connection_mock.get_operation_spec.return_value = {
+            'method': HTTPMethod.GET,
+            'url': '/object/',
+            'filterKeys': ['name', 'subType', 'isSystemDefined', 'fts']
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        assert [objects[0]] == list(resource.get_objects_by_filter('test', {
+            ParamName.FILTERS: {'subType': 'HOST', 'value': '1.1.1.1', 'isSystemDefined': False}
+        }))
+        send_request_mock.assert_called_once_with('/object/', 'get', {}, {}, {
+            QueryParams.FILTER: 'subType:HOST', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0
+        }, operation_name='test')
+        fetch_system_info_mock.assert_not_called()
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_get_objects_by_filter_should_not_combine_name_with_other_filters(self, send_request_mock,
+                                                                              fetch_system_info_mock,
+                                                                              connection_mock):
+        send_request_mock.side_effect = [{'items': []}]
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        connection_mock.get_operation_spec.return_value = {
+            'method': HTTPMethod.GET,
+            'url': '/object/',
+            'filterKeys': ['name', 'subType']
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        assert [] == list(resource.get_objects_by_filter('test', {
+            ParamName.FILTERS: {'name': 'obj1', 'subType': 'HOST', 'value': '1.1.1.1'}
+        }))
+        send_request_mock.assert_called_once_with('/object/', 'get', {}, {}, {
+            QueryParams.FILTER: 'fts~obj1', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0
+        }, operation_name='test')
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_get_objects_by_filter_should_match_values_with_filter_operators_on_returned_objects(
+            self, send_request_mock, fetch_system_info_mock, connection_mock):
+        objects = [
+            {'name': 'obj:1', 'subType': 'HOST', 'value': 'fe80::1'},
+            {'name': 'obj~2', 'subType': 'HOST', 'value': 'fe80::2'}
+        ]
+        send_request_mock.side_effect = [{'items': objects}, {'items': objects}]
+        connection_mock.get_operation_spec.return_value = {
+            'method': HTTPMethod.GET,
+            'url': '/object/',
+            'filterKeys': ['name', 'subType', 'value']
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        assert [objects[0]] == list(resource.get_objects_by_filter('test', {
+            ParamName.FILTERS: {'name': 'obj:1'}
+        }))
+        assert [objects[1]] == list(resource.get_objects_by_filter('test', {
+            ParamName.FILTERS: {'subType': 'HOST', 'value': 'fe80::2'}
+        }))
+        assert [
+            call('/object/', 'get', {}, {}, {'limit': DEFAULT_PAGE_SIZE, 'offset': 0}, operation_name='test'),
+            call('/object/', 'get', {}, {}, {QueryParams.FILTER: 'subType:HOST', 'limit': DEFAULT_PAGE_SIZE,
+                                             'offset': 0}, operation_name='test')
+        ] == send_request_mock.call_args_list
+        fetch_system_info_mock.assert_not_called()
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_get_objects_by_filter_should_send_filters_listed_in_api_spec(self, send_request_mock,
+                                                                          fetch_system_info_mock, connection_mock):
+        with open(os.path.join(TEST_DATA_FOLDER, 'ngfw_with_ex.json'), 'rb') as f:
+            api_spec = json.loads(f.read().decode('utf-8'))
+        filter_param = next(p for p in api_spec['paths']['/object/networks']['get']['parameters']
+                            if p['name'] == QueryParams.FILTER)
+        # the filter description in the format of the FDM API documentation
+        filter_param['description'] = 'The criteria used to filter the models you are requesting. It should have ' \
+                                      'the following format: {key}{operator}{value}[;{key}{operator}{value}]. ' \
+                                      'Supported operators are: "!"(not equals), ":"(equals), "~"(similar). ' \
+                                      'Supported keys are: "name", "value", "type", "fts". ' \
+                                      'The "fts" filter cannot be used with other filters.'
+        operations = FdmSwaggerParser().parse_spec(api_spec)['operations']
+        connection_mock.get_operation_spec.side_effect = lambda name: operations[name]
+        send_request_mock.return_value = {'items': []}
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        list(resource.get_objects_by_filter('getNetworkObjectList', {
+            ParamName.FILTERS: {'type': 'networkobject', 'value': '1.1.1.1', 'subType': 'HOST'}
+        }))
+        list(resource.get_objects_by_filter('getNetworkObjectList', {
+            ParamName.FILTERS: {'name': 'obj1', 'value': '1.1.1.1'}
+        }))
+
+        assert ['type:networkobject;value:1.1.1.1', 'fts~obj1'] == [
+            c[0][4][QueryParams.FILTER] for c in send_request_mock.call_args_list]
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_get_objects_by_filter_should_send_name_filter_when_name_key_is_not_supported(self, send_request_mock,
+                                                                                          fetch_system_info_mock,
+                                                                                          connection_mock):
+        send_request_mock.side_effect = [{'items': []}]
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        connection_mock.get_operation_spec.return_value = {
+            'method': HTTPMethod.GET,
+            'url': '/object/',
+            'filterKeys': ['fts', 'subType']
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        assert [] == list(resource.get_objects_by_filter('test', {
+            ParamName.FILTERS: {'name': 'obj1', 'subType': 'HOST'}
+        }))
+        send_request_mock.assert_called_once_with('/object/', 'get', {}, {}, {
+            QueryParams.FILTER: 'fts~obj1', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0
+        }, operation_name='test')
+
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_changes_should_update_object_index(self, send_request_mock, connection_mock):
+        operations = {
+            'deleteAccessRule': {'method': HTTPMethod.DELETE, 'modelName': 'AccessRule', 'url': '/rules/{objId}'},
+            'editAccessRule': {'method': HTTPMethod.PUT, 'modelName': 'AccessRule', 'url': '/rules/{objId}'}
+        }
+        connection_mock.get_operation_spec.side_effect = lambda name: operations[name]
+        connection_mock.get_operation_specs_by_model_name.return_value = operations
+        resource = BaseConfigurationResource(connection_mock, False, use_object_index=True)
+        path_params = {'parentId': 'policy', 'objId': 'rule'}
+        index_key = 'AccessRule{"parentId": "policy"}'
+
+        send_request_mock.return_value = {}
+        resource.delete_object('deleteAccessRule', {ParamName.PATH_PARAMS: path_params})
+        connection_mock.remove_indexed_object.assert_called_once_with(index_key, 'rule')
+
+        send_request_mock.side_effect = FtdServerError({'error': 'Version mismatch'}, 422)
+        with pytest.raises(FtdServerError):
+            resource.edit_object('editAccessRule', {ParamName.PATH_PARAMS: path_params, ParamName.DATA: {}})
+        connection_mock.invalidate_object_index.assert_called_once_with(index_key)
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_object_index_setting_should_be_asked_once_a_name_lookup_needs_it(self, send_request_mock,
+                                                                              fetch_system_info_mock,
+                                                                              connection_mock):
+        operations = {
+            'getObject': {'method': HTTPMethod.GET, 'modelName': 'Object', 'url': '/object/{objId}',
+                          'returnMultipleItems': False},
+            'getObjectList': {'method': HTTPMethod.GET, 'modelName': 'Object', 'url': '/object/',
+                              'returnMultipleItems': True}
+        }
+        connection_mock.get_operation_spec.side_effect = lambda name: operations[name]
+        connection_mock.get_operation_specs_by_model_name.return_value = operations
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        send_request_mock.return_value = {'items': []}
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        resource.execute_operation('getObject', {ParamName.PATH_PARAMS: {'objId': '1'}})
+        connection_mock.is_object_index_enabled.assert_not_called()
+
+        assert resource._find_object_matching_params('Object', {ParamName.DATA: {'name': 'obj1'}}) is None
+        assert resource._find_object_matching_params('Object', {ParamName.DATA: {'name': 'obj2'}}) is None
+        connection_mock.is_object_index_enabled.assert_called_once_with()
+
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_edit_object_should_record_changed_properties(self, send_request_mock, connection_mock):
+        operations = {
+            'getNetworkObject': {'method': HTTPMethod.GET, 'modelName': 'NetworkObject', 'url': '/objects/{objId}',
+                                 'returnMultipleItems': False},
+            'editNetworkObject': {'method': HTTPMethod.PUT, 'modelName': 'NetworkObject', 'url': '/objects/{objId}'}
+        }
+        connection_mock.get_operation_spec.side_effect = lambda name: operations[name]
+        connection_mock.get_operation_specs_by_model_name.return_value = operations
+        existing_obj = {'id': '1', 'version': 'a', 'name': 'obj', 'value': '1.1.1.1', 'type': 'networkobject'}
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        send_request_mock.return_value = existing_obj
+        params = {ParamName.PATH_PARAMS: {'objId': '1'}, ParamName.DATA: {'name': 'obj', 'value': '1.1.1.1'}}
+        assert existing_obj == resource.edit_object('editNetworkObject', params)
+        assert 1 == send_request_mock.call_count
+        assert resource.config_diff is None
+
+        send_request_mock.side_effect = [existing_obj, dict(existing_obj, value='2.2.2.2')]
+        params = {ParamName.PATH_PARAMS: {'objId': '1'}, ParamName.DATA: {'name': 'obj', 'value': '2.2.2.2'}}
+        resource.edit_object('editNetworkObject', params)
+        assert {'value': {'before': '1.1.1.1', 'after': '2.2.2.2'}} == resource.config_diff
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_find_object_matching_params_should_stop_after_page_with_name_match(self, send_request_mock,
+                                                                                fetch_system_info_mock,
+                                                                                connection_mock):
+        obj = {'name': 'obj1', 'type': 'foo'}
+        send_request_mock.side_effect = [
+            {'items': [{'name': 'obj10', 'type': 'foo'}, obj]},
+            {'items': [{'name': 'obj11', 'type': 'foo'}, {'name': 'obj12', 'type': 'foo'}]},
+            {'items': []}
+        ]
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        connection_mock.get_operation_specs_by_model_name.return_value = {
+            'getObjectList': {'method': HTTPMethod.GET, 'url': '/object/', 'returnMultipleItems': True}
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        found_obj = resource._find_object_matching_params('Object', {
+            ParamName.DATA: {'name': 'obj1'},
+            ParamName.QUERY_PARAMS: {'limit': 2}
+        })
+
+        assert obj == found_obj
+        send_request_mock.assert_called_once_with('/object/', 'get', {}, {},
+                                                  {QueryParams.FILTER: 'fts~obj1', 'limit': 2, 'offset': 0},
+                                                  operation_name='getObjectList')
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_find_object_matching_params_should_not_request_pages_past_matching_page(self, send_request_mock,
+                                                                                     fetch_system_info_mock,
+                                                                                     connection_mock):
+        obj = {'name': 'obj1', 'type': 'foo'}
+        paging = {'limit': 2, 'count': 8}
+        send_request_mock.side_effect = [
+            {'items': [{'name': 'obj10', 'type': 'foo'}, {'name': 'obj11', 'type': 'foo'}], 'paging': paging},
+            {'items': [{'name': 'obj12', 'type': 'foo'}, obj], 'paging': paging},
+            {'items': [{'name': 'obj13', 'type': 'foo'}, {'name': 'obj14', 'type': 'foo'}], 'paging': paging},
+            {'items': [{'name': 'obj15', 'type': 'foo'}, {'name': 'obj16', 'type': 'foo'}], 'paging': paging}
+        ]
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        connection_mock.get_operation_specs_by_model_name.return_value = {
+            'getObjectList': {'method': HTTPMethod.GET, 'url': '/object/', 'returnMultipleItems': True}
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        found_obj = resource._find_object_matching_params('Object', {
+            ParamName.DATA: {'name': 'obj1'},
+            ParamName.QUERY_PARAMS: {'limit': 2}
+        })
+
+        assert obj == found_obj
+        assert [0, 2] == [c[0][4]['offset'] for c in send_request_mock.call_args_list]
+        connection_mock.send_requests.assert_not_called()
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_find_object_matching_params_should_check_duplicate_names_on_matching_page_only(self, send_request_mock,
+                                                                                            fetch_system_info_mock,
+                                                                                            connection_mock):
+        # FDM rejects objects with duplicate names, so a duplicate on a later page is never looked for
+        obj = {'name': 'obj1', 'type': 'foo'}
+        send_request_mock.side_effect = [
+            {'items': [{'name': 'obj10', 'type': 'foo'}, obj]},
+            {'items': [{'name': 'obj1', 'type': 'bar'}]},
+            {'items': []}
+        ]
+        fetch_system_info_mock.return_value = {'databaseInfo': {'buildVersion': '6.4.0'}}
+        connection_mock.get_operation_specs_by_model_name.return_value = {
+            'getObjectList': {'method': HTTPMethod.GET, 'url': '/object/', 'returnMultipleItems': True}
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        assert obj == resource._find_object_matching_params('Object', {
+            ParamName.DATA: {'name': 'obj1'},
+            ParamName.QUERY_PARAMS: {'limit': 2}
+        })
+        assert 1 == send_request_mock.call_count
+
+        send_request_mock.reset_mock()
+        send_request_mock.side_effect = [{'items': [obj, {'name': 'obj1', 'type': 'bar'}]}]
+
+        with pytest.raises(FtdConfigurationError) as exc_info:
+            resource._find_object_matching_params('Object', {
+                ParamName.DATA: {'name': 'obj1'},
+                ParamName.QUERY_PARAMS: {'limit': 2}
+            })
+        assert MULTIPLE_DUPLICATES_FOUND_ERROR == str(exc_info.value)
+        assert 1 == send_request_mock.call_count
+
+    @patch.object(BaseConfigurationResource, '_fetch_system_info')
+    @patch.object(BaseConfigurationResource, '_send_request')
+    def test_find_object_matching_params_should_stop_after_second_match(self, send_request_mock,
+                                                                        fetch_system_info_mock, connection_mock):
+        send_request_mock.side_effect = [
+            {'items': [{'name': 'obj1', 'type': 'foo'}, {'name': 'obj2', 'type': 'bar'}]},
+            {'items': [{'name': 'obj3', 'type': 'foo'}, {'name': 'obj4', 'type': 'foo'}]},
+            {'items': [{'name': 'obj5', 'type': 'foo'}]}
+        ]
+        connection_mock.get_operation_specs_by_model_name.return_value = {
+            'getObjectList': {'method': HTTPMethod.GET, 'url': '/object/', 'returnMultipleItems': True}
+        }
+        resource = BaseConfigurationResource(connection_mock, False)
+
+        with pytest.raises(FtdConfigurationError) as exc_info:
+            resource._find_object_matching_params('Object', {
+                ParamName.DATA: {'name': 'obj1'},
+                ParamName.QUERY_PARAMS: {'limit': 2},
+                ParamName.FILTERS: {'type': 'foo'}
+            })
+
+        assert MULTIPLE_DUPLICATES_FOUND_ERROR == str(exc_info.value)
+        assert 2 == send_request_mock.call_count
+        fetch_system_info_mock.assert_not_called()
+
     def test_module_should_fail_if_validation_error_in_data(self, connection_mock):
         connection_mock.get_operation_spec.return_value = {'method': HTTPMethod.POST, 'url': '/test'}
         report = {
@@ -338,6 +670,359 @@ class TestBaseConfigurationResource(object):
                 test_api_version)
 
 
+class TestBulkOperation(object):
+    BULK_ADD_SPEC = {
+        OperationField.METHOD: HTTPMethod.POST,
+        OperationField.URL: '/object/networks',
+        OperationField.PARAMETERS: {'query': {'bulk': {'type': 'boolean'}}, 'path': {}}
+    }
+    BULK_EDIT_SPEC = {
+        OperationField.METHOD: HTTPMethod.PUT,
+        OperationField.URL: '/object/networks',
+        OperationField.PARAMETERS: {'query': {'bulk': {'type': 'boolean'}}, 'path': {}}
+    }
+    EDIT_SPEC = {
+        OperationField.METHOD: HTTPMethod.PUT,
+        OperationField.URL: '/object/networks/{objId}',
+        OperationField.MODEL_NAME: 'NetworkObject',
+        OperationField.PARAMETERS: {'query': {}, 'path': {'objId': {'type': 'string'}}}
+    }
+    GET_SPEC = {
+        OperationField.METHOD: HTTPMethod.GET,
+        OperationField.URL: '/object/networks/{objId}',
+        OperationField.RETURN_MULTIPLE_ITEMS: False
+    }
+    GET_LIST_SPEC = {
+        OperationField.METHOD: HTTPMethod.GET,
+        OperationField.URL: '/object/networks',
+        OperationField.RETURN_MULTIPLE_ITEMS: True
+    }
+
+    @pytest.fixture
+    def resource(self, mocker):
+        mocker.patch.object(BaseConfigurationResource, '_fetch_system_info').return_value = {
+            'databaseInfo': {'buildVersion': '6.5.0'}
+        }
+        conn = mock.MagicMock()
+        conn.validate_data.return_value = True, None
+        conn.validate_query_params.return_value = True, None
+        conn.validate_path_params.return_value = True, None
+        conn.is_object_index_enabled.return_value = False
+        conn.get_operation_specs_by_model_name.return_value = {
+            'editMultipleNetworkObject': self.BULK_EDIT_SPEC,
+            'editNetworkObject': self.EDIT_SPEC,
+            'addNetworkObject': self.BULK_ADD_SPEC,
+            'getNetworkObjectList': self.GET_LIST_SPEC,
+            'getNetworkObject': self.GET_SPEC
+        }
+        conn.get_operation_spec.side_effect = lambda op_name: \
+            conn.get_operation_specs_by_model_name.return_value.get(op_name)
+        delegate_to_plugin(conn, 'validate_and_send_request', 'validate_and_send_requests')
+        return BaseConfigurationResource(conn)
+
+    @pytest.fixture
+    def send_request_mock(self, mocker):
+        return mocker.patch.object(BaseConfigurationResource, '_send_request')
+
+    def test_execute_bulk_operation_should_send_added_objects_in_single_request(self, resource, send_request_mock):
+        send_request_mock.return_value = {'items': [{'id': '1', 'name': 'foo'}, {'id': '2', 'name': 'bar'}]}
+
+        results = resource.execute_bulk_operation('addNetworkObject', [
+            {ParamName.DATA: {'name': 'foo'}},
+            {ParamName.DATA: {'name': 'bar'}}
+        ])
+
+        send_request_mock.assert_called_once_with('/object/networks', HTTPMethod.POST,
+                                                  [{'name': 'foo'}, {'name': 'bar'}], {}, {'bulk': 'true'})
+        assert [
+            {BulkItemResult.CHANGED: True, BulkItemResult.RESPONSE: {'id': '1', 'name': 'foo'}},
+            {BulkItemResult.CHANGED: True, BulkItemResult.RESPONSE: {'id': '2', 'name': 'bar'}}
+        ] == results
+
+    def test_execute_bulk_operation_should_send_items_one_by_one_when_batch_fails(self, resource,
+                                                                                  send_request_mock):
+        server_error = FtdServerError({'error': 'Invalid value'}, 500)
+        send_request_mock.side_effect = [FtdServerError({'error': 'Batch failed'}, 500), {'id': '1'}, server_error]
+
+        results = resource.execute_bulk_operation('addNetworkObject', [
+            {ParamName.DATA: {'name': 'foo'}},
+            {ParamName.DATA: {'name': 'bar'}}
+        ])
+
+        assert 3 == send_request_mock.call_count
+        assert send_request_mock.call_args_list[1] == call('/object/networks', HTTPMethod.POST, {'name': 'foo'},
+                                                           {}, {}, operation_name='addNetworkObject')
+        assert {BulkItemResult.CHANGED: False, BulkItemResult.RESPONSE: {'id': '1'}} == results[0]
+        assert {BulkItemResult.CHANGED: False, BulkItemResult.ERROR: server_error} == results[1]
+
+    def test_execute_bulk_operation_should_batch_upserted_objects(self, resource, send_request_mock, mocker):
+        existing_obj = {'id': '1', 'version': 'a', 'name': 'foo', 'value': 'old'}
+        unchanged_obj = {'id': '3', 'version': 'c', 'name': 'baz', 'value': 'same'}
+        mocker.patch.object(BaseConfigurationResource, '_find_object_matching_params').side_effect = [
+            existing_obj, None, unchanged_obj
+        ]
+        send_request_mock.side_effect = [
+            [{'id': '2', 'name': 'bar'}],
+            [{'id': '1', 'name': 'foo', 'value': 'new'}]
+        ]
+
+        results = resource.execute_bulk_operation('upsertNetworkObject', [
+            {ParamName.DATA: {'name': 'foo', 'value': 'new'}},
+            {ParamName.DATA: {'name': 'bar'}},
+            {ParamName.DATA: {'name': 'baz', 'value': 'same'}}
+        ])
+
+        assert send_request_mock.call_args_list == [
+            call('/object/networks', HTTPMethod.POST, [{'name': 'bar'}], {}, {'bulk': 'true'}),
+            call('/object/networks', HTTPMethod.PUT, [{'id': '1', 'version': 'a', 'name': 'foo', 'value': 'new'}],
+                 {}, {'bulk': 'true'})
+        ]
+        assert [True, True, False] == [result[BulkItemResult.CHANGED] for result in results]
+        assert unchanged_obj == results[2][BulkItemResult.RESPONSE]
+
+    def test_execute_bulk_operation_should_fetch_and_edit_objects_concurrently(self, resource):
+        def response(body, status=200):
+            return {ResponseParams.SUCCESS: status < 400, ResponseParams.STATUS_CODE: status,
+                    ResponseParams.RESPONSE: body}
+
+        resource._conn.send_requests.side_effect = [
+            [response({'id': '1', 'name': 'foo', 'value': 'old'}), response({'id': '2', 'name': 'bar'}),
+             response({'error': 'Not found'}, 404)],
+            [response({'id': '1', 'name': 'foo', 'value': 'new'})]
+        ]
+
+        results = resource.execute_bulk_operation('editNetworkObject', [
+            {ParamName.PATH_PARAMS: {'objId': '1'}, ParamName.DATA: {'name': 'foo', 'value': 'new'}},
+            {ParamName.PATH_PARAMS: {'objId': '2'}, ParamName.DATA: {'name': 'bar'}},
+            {ParamName.PATH_PARAMS: {'objId': '3'}, ParamName.DATA: {'name': 'baz'}}
+        ])
+
+        assert resource._conn.send_requests.call_args_list == [
+            call([{'url_path': '/object/networks/{objId}', 'http_method': HTTPMethod.GET, 'body_params': {},
+                   'path_params': {'objId': obj_id}, 'query_params': {}} for obj_id in ('1', '2', '3')]),
+            call([{'url_path': '/object/networks/{objId}', 'http_method': HTTPMethod.PUT,
+                   'body_params': {'name': 'foo', 'value': 'new'}, 'path_params': {'objId': '1'},
+                   'query_params': {}}])
+        ]
+        assert {BulkItemResult.CHANGED: True,
+                BulkItemResult.RESPONSE: {'id': '1', 'name': 'foo', 'value': 'new'},
+                BulkItemResult.DIFF: {'value': {'before': 'old', 'after': 'new'}}} == results[0]
+        assert {BulkItemResult.CHANGED: False, BulkItemResult.RESPONSE: {'id': '2', 'name': 'bar'}} == results[1]
+        assert isinstance(results[2][BulkItemResult.ERROR], FtdServerError)
+        assert resource.config_changed
+
+    def test_send_general_requests_should_report_result_of_every_request(self, resource):
+        resource._conn.send_requests.return_value = [
+            {ResponseParams.SUCCESS: True, ResponseParams.STATUS_CODE: 200, ResponseParams.RESPONSE: {'items': []}},
+            {ResponseParams.SUCCESS: False, ResponseParams.STATUS_CODE: 500, ResponseParams.RESPONSE: 'Error'}
+        ]
+
+        results = resource.send_general_requests([('getNetworkObjectList', {}), ('getNetworkObjectList', {})])
+
+        assert {BulkItemResult.CHANGED: False, BulkItemResult.RESPONSE: {'items': []}} == results[0]
+        assert 500 == results[1][BulkItemResult.ERROR].code
+        assert 1 == resource._conn.send_requests.call_count
+
+    def test_execute_bulk_operation_should_execute_other_operations_one_by_one(self, resource,
+                                                                               send_request_mock):
+        send_request_mock.return_value = {'items': []}
+
+        results = resource.execute_bulk_operation('getNetworkObjectList', [{}, {}])
+
+        assert 2 == send_request_mock.call_count
+        assert [{BulkItemResult.CHANGED: False, BulkItemResult.RESPONSE: {'items': []}}] * 2 == results
+
+
+class TestCheckModePlan(object):
+    MODEL_OPERATIONS = {
+        'addNetworkObject': {
+            OperationField.METHOD: HTTPMethod.POST, OperationField.URL: '/object/networks',
+            OperationField.MODEL_NAME: 'NetworkObject',
+            OperationField.PARAMETERS: {'query': {'bulk': {'type': 'boolean'}}, 'path': {}}
+        },
+        'editNetworkObject': {
+            OperationField.METHOD: HTTPMethod.PUT, OperationField.URL: '/object/networks/{objId}',
+            OperationField.MODEL_NAME: 'NetworkObject'
+        },
+        'deleteNetworkObject': {
+            OperationField.METHOD: HTTPMethod.DELETE, OperationField.URL: '/object/networks/{objId}',
+            OperationField.MODEL_NAME: 'NetworkObject'
+        },
+        'getNetworkObject': {
+            OperationField.METHOD: HTTPMethod.GET, OperationField.URL: '/object/networks/{objId}',
+            OperationField.MODEL_NAME: 'NetworkObject', OperationField.RETURN_MULTIPLE_ITEMS: False
+        },
+        'getNetworkObjectList': {
+            OperationField.METHOD: HTTPMethod.GET, OperationField.URL: '/object/networks',
+            OperationField.MODEL_NAME: 'NetworkObject', OperationField.RETURN_MULTIPLE_ITEMS: True
+        },
+        'deployConfiguration': {
+            OperationField.METHOD: HTTPMethod.POST, OperationField.URL: '/operational/deploy',
+            OperationField.MODEL_NAME: None
+        }
+    }
+    EXISTING_OBJECTS = [
+        {'id': '1', 'version': 'a', 'name': 'foo', 'value': 'old'},
+        {'id': '3', 'version': 'c', 'name': 'baz', 'value': 'same'}
+    ]
+
+    @pytest.fixture
+    def resource(self, mocker):
+        mocker.patch.object(BaseConfigurationResource, '_fetch_system_info').return_value = {
+            'databaseInfo': {'buildVersion': '6.5.0'}
+        }
+        conn = mock.MagicMock()
+        conn.validate_data.return_value = True, None
+        conn.validate_query_params.return_value = True, None
+        conn.validate_path_params.return_value = True, None
+        conn.is_object_index_enabled.return_value = False
+        conn.get_model_spec.return_value = {'type': 'object'}
+        conn.get_operation_specs_by_model_name.return_value = self.MODEL_OPERATIONS
+        conn.get_operation_spec.side_effect = lambda op_name: self.MODEL_OPERATIONS.get(op_name)
+        conn.send_request.side_effect = self._send_request
+        delegate_to_plugin(conn, 'validate_and_send_request', 'validate_and_send_requests')
+        return BaseConfigurationResource(conn, True)
+
+    def _send_request(self, url_path, http_method, body_params=None, path_params=None, query_params=None):
+        assert HTTPMethod.GET == http_method
+        if url_path == '/object/networks':
+            return {ResponseParams.SUCCESS: True, ResponseParams.STATUS_CODE: 200,
+                    ResponseParams.RESPONSE: {'items': self.EXISTING_OBJECTS}}
+        return {ResponseParams.SUCCESS: False, ResponseParams.STATUS_CODE: 404,
+                ResponseParams.RESPONSE: {'error': 'Not found'}}
+
+    def test_plan_should_evaluate_upserts_against_snapshot_of_model(self, resource):
+        results = resource.execute_bulk_operation('upsertNetworkObject', [
+            {ParamName.DATA: {'name': 'foo', 'value': 'new'}},
+            {ParamName.DATA: {'name': 'bar', 'value': 'added'}},
+            {ParamName.DATA: {'name': 'baz', 'value': 'same'}}
+        ])
+
+        assert 1 == resource._conn.send_request.call_count
+        assert [True, True, False] == [result[BulkItemResult.CHANGED] for result in results]
+        assert {'id': '1', 'version': 'a', 'name': 'foo', 'value': 'new'} == results[0][BulkItemResult.RESPONSE]
+        assert [
+            {PlannedChange.ACTION: PlanAction.EDIT, PlannedChange.OPERATION: 'editNetworkObject',
+             PlannedChange.MODEL: 'NetworkObject', PlannedChange.NAME: 'foo', PlannedChange.ID: '1',
+             PlannedChange.CHANGES: {'value': {'before': 'old', 'after': 'new'}}},
+            {PlannedChange.ACTION: PlanAction.ADD, PlannedChange.OPERATION: 'addNetworkObject',
+             PlannedChange.MODEL: 'NetworkObject', PlannedChange.NAME: 'bar', PlannedChange.ID: None}
+        ] == resource.planned_changes
+        assert resource.config_changed
+
+    def test_plan_should_look_up_edited_and_deleted_objects_in_snapshot(self, resource):
+        unchanged = resource.edit_object('editNetworkObject', {ParamName.PATH_PARAMS: {'objId': '3'},
+                                                               ParamName.DATA: {'name': 'baz', 'value': 'same'}})
+        deleted = resource.delete_object('deleteNetworkObject', {ParamName.PATH_PARAMS: {'objId': '1'}})
+
+        assert self.EXISTING_OBJECTS[1] == unchanged
+        assert {} == deleted
+        assert 1 == resource._conn.send_request.call_count
+        assert [(PlanAction.DELETE, 'foo', '1')] == [
+            (c[PlannedChange.ACTION], c[PlannedChange.NAME], c[PlannedChange.ID]) for c in resource.planned_changes
+        ]
+
+    def test_plan_should_not_delete_object_that_does_not_exist(self, resource):
+        resp = resource.delete_object('deleteNetworkObject', {ParamName.PATH_PARAMS: {'objId': 'unknown'}})
+
+        assert {'status': 'Referenced object does not exist'} == resp
+        assert [] == resource.planned_changes
+        assert not resource.config_changed
+
+    def test_plan_should_fail_to_add_object_with_duplicate_name(self, resource):
+        with pytest.raises(FtdConfigurationError) as exc_info:
+            resource.add_object('addNetworkObject', {ParamName.DATA: {'name': 'foo', 'value': 'other'}})
+
+        assert DUPLICATE_ERROR == exc_info.value.msg
+        assert [] == resource.planned_changes
+
+    def test_plan_should_not_execute_other_unsafe_operations(self, resource):
+        with pytest.raises(CheckModeException):
+            resource.crud_operation('deployConfiguration', {})
+
+        assert not resource._conn.send_request.called
+
+    def test_plan_should_send_batches_of_read_requests_only(self, resource):
+        delegate_to_plugin(resource._conn, 'send_requests')
+        resource._conn.get_option.return_value = 1
+
+        results = resource.send_general_requests([('getNetworkObjectList', {}), ('getNetworkObject', {
+            ParamName.PATH_PARAMS: {'objId': '2'}})])
+
+        assert {'items': self.EXISTING_OBJECTS} == results[0][BulkItemResult.RESPONSE]
+        assert 404 == results[1][BulkItemResult.ERROR].code
+        with pytest.raises(CheckModeException):
+            resource.send_general_requests([('getNetworkObjectList', {}), ('deployConfiguration', {})])
+        assert 2 == resource._conn.send_request.call_count
+
+
+class TestDeployment(object):
+
+    @pytest.fixture
+    def time_mock(self, mocker):
+        time_mock = mocker.patch('module_utils.configuration.time')
+        clock = [100.0]
+        time_mock.time.side_effect = lambda: clock[0]
+        time_mock.sleep.side_effect = lambda delay: clock.__setitem__(0, clock[0] + delay)
+        return time_mock
+
+    @pytest.fixture
+    def resource(self, mocker):
+        conn = mock.MagicMock()
+        conn.get_operation_spec.return_value = {OperationField.METHOD: HTTPMethod.GET}
+        resource = BaseConfigurationResource(conn)
+        mocker.patch.object(resource, 'crud_operation').return_value = {
+            'id': 'job', 'state': 'QUEUED', 'endTime': -1
+        }
+        mocker.patch.object(resource, 'send_general_request')
+        return resource
+
+    def test_deploy_should_poll_job_with_growing_delays(self, resource, time_mock):
+        resource.send_general_request.side_effect = [
+            {'id': 'job', 'state': 'DEPLOYING', 'endTime': -1},
+            {'id': 'job', 'state': 'DEPLOYING', 'endTime': -1},
+            {'id': 'job', 'state': 'DEPLOYED', 'endTime': 1}
+        ]
+
+        deployment, result = resource.deploy({})
+
+        assert {'id': 'job', 'state': 'DEPLOYED', 'endTime': 1} == deployment
+        assert [call(1.0), call(1.5), call(2.25)] == time_mock.sleep.call_args_list
+        resource.send_general_request.assert_called_with('getDeployment', {ParamName.PATH_PARAMS: {'objId': 'job'}})
+        assert {DeploymentResult.SKIPPED: False, DeploymentResult.STATE: 'DEPLOYED',
+                DeploymentResult.DURATION: 4.8, DeploymentResult.POLLS: 3} == result
+
+    def test_deploy_should_fail_when_deployment_fails_or_times_out(self, resource, time_mock):
+        resource.send_general_request.return_value = {'id': 'job', 'state': 'DEPLOY_FAILED', 'endTime': 1,
+                                                      'statusMessages': ['Error']}
+        with pytest.raises(FtdConfigurationError) as exc_info:
+            resource.deploy({})
+        assert "Deployment job finished in the DEPLOY_FAILED state in 1.0 seconds: ['Error']" == exc_info.value.msg
+
+        resource.send_general_request.return_value = {'id': 'job', 'state': 'DEPLOYING', 'endTime': -1}
+        with pytest.raises(FtdConfigurationError) as exc_info:
+            resource.deploy({}, timeout=30)
+        assert 'Deployment job has not finished in 30 seconds. Last known state: DEPLOYING' == exc_info.value.msg
+
+    def test_deploy_should_skip_deployment_without_pending_changes(self, resource, time_mock):
+        resource.send_general_request.return_value = {'items': []}
+
+        deployment, result = resource.deploy({}, skip_if_no_changes=True)
+
+        assert deployment is None
+        assert result[DeploymentResult.SKIPPED]
+        resource.send_general_request.assert_called_once_with('getBaseEntityDiffList',
+                                                              {ParamName.QUERY_PARAMS: {'limit': 1}})
+        assert not resource.crud_operation.called
+
+    def test_deploy_should_not_poll_job_when_not_waiting(self, resource, time_mock):
+        deployment, result = resource.deploy({}, wait=False)
+
+        assert 'QUEUED' == result[DeploymentResult.STATE]
+        assert not resource.send_general_request.called
+        assert not time_mock.sleep.called
+
+
 class TestIterateOverPageableResource(object):
 
     def test_iterate_over_pageable_resource_with_no_items(self):
@@ -357,7 +1042,7 @@ class TestIterateOverPageableResource(object):
 
         assert ['foo', 'bar'] == list(items)
         resource_func.assert_has_calls([
-            call(params={'query_params': {'offset': 0, 'limit': 10}})
+            call(params={'query_params': {'offset': 0, 'limit': DEFAULT_PAGE_SIZE}})
         ])
 
     def test_iterate_over_pageable_resource_with_multiple_pages(self):
@@ -383,7 +1068,8 @@ class TestIterateOverPageableResource(object):
         items = iterate_over_pageable_resource(resource_func, {'query_params': {'filter': 'name:123'}})
 
         assert [] == list(items)
-        resource_func.assert_called_once_with(params={'query_params': {'filter': 'name:123', 'offset': 0, 'limit': 10}})
+        resource_func.assert_called_once_with(
+            params={'query_params': {'filter': 'name:123', 'offset': 0, 'limit': DEFAULT_PAGE_SIZE}})
 
     def test_iterate_over_pageable_resource_should_preserve_limit(self):
         resource_func = mock.Mock(side_effect=[
@@ -408,7 +1094,7 @@ class TestIterateOverPageableResource(object):
 
         assert ['foo'] == list(items)
         resource_func.assert_has_calls([
-            call(params={'query_params': {'offset': 3, 'limit': 10}}),
+            call(params={'query_params': {'offset': 3, 'limit': DEFAULT_PAGE_SIZE}}),
         ])
 
     def test_iterate_over_pageable_resource_should_pass_with_string_offset_and_limit(self):
@@ -438,6 +1124,191 @@ class TestIterateOverPageableResource(object):
             call(params={'query_params': {'offset': '1', 'limit': '1'}})
         ])
 
+    def test_iterate_over_pageable_resource_should_use_page_size_advertised_by_device(self):
+        resource_func = mock.Mock(side_effect=[
+            {'items': ['foo', 'bar'], 'paging': {'limit': 2}},
+            {'items': ['buzz'], 'paging': {'limit': 2}},
+        ])
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {}})
+
+        assert ['foo', 'bar', 'buzz'] == list(items)
+        resource_func.assert_has_calls([
+            call(params={'query_params': {'offset': 0, 'limit': DEFAULT_PAGE_SIZE}}),
+            call(params={'query_params': {'offset': 2, 'limit': 2}})
+        ])
+
+    def test_iterate_over_pageable_resource_should_use_total_count_when_device_returns_short_pages(self):
+        resource_func = mock.Mock(side_effect=[
+            {'items': ['foo', 'bar'], 'paging': {'count': 3}},
+            {'items': ['buzz'], 'paging': {'count': 3}},
+        ])
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 10}})
+
+        assert ['foo', 'bar', 'buzz'] == list(items)
+        resource_func.assert_has_calls([
+            call(params={'query_params': {'offset': 0, 'limit': 10}}),
+            call(params={'query_params': {'offset': 2, 'limit': 10}})
+        ])
+        assert 2 == resource_func.call_count
+
+    def test_iterate_over_pageable_resource_should_shrink_page_size_on_client_error(self):
+        resource_func = mock.Mock(side_effect=[
+            FtdServerError({'error': 'Invalid limit'}, 400),
+            {'items': ['foo']},
+        ])
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {}})
+
+        assert ['foo'] == list(items)
+        resource_func.assert_has_calls([
+            call(params={'query_params': {'offset': 0, 'limit': DEFAULT_PAGE_SIZE}}),
+            call(params={'query_params': {'offset': 0, 'limit': DEFAULT_PAGE_SIZE // 2}})
+        ])
+
+    def test_iterate_over_pageable_resource_should_shrink_page_size_on_timeout(self):
+        resource_func = mock.Mock(side_effect=[
+            {'items': ['foo'] * 40},
+            ConnectionError('The read operation timed out'),
+            {'items': ['bar']},
+        ])
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 40}})
+
+        assert ['foo'] * 40 + ['bar'] == list(items)
+        resource_func.assert_has_calls([
+            call(params={'query_params': {'offset': 0, 'limit': 40}}),
+            call(params={'query_params': {'offset': 40, 'limit': 40}}),
+            call(params={'query_params': {'offset': 40, 'limit': 20}})
+        ])
+
+    def test_iterate_over_pageable_resource_should_raise_errors_not_related_to_page_size(self):
+        resource_func = mock.Mock(side_effect=FtdServerError({'error': 'Not found'}, 404))
+
+        with pytest.raises(FtdServerError):
+            list(iterate_over_pageable_resource(resource_func, {'query_params': {}}))
+
+        resource_func.assert_called_once_with(params={'query_params': {'offset': 0, 'limit': DEFAULT_PAGE_SIZE}})
+
+    def test_iterate_over_pageable_resource_should_raise_error_when_page_size_is_minimal(self):
+        resource_func = mock.Mock(side_effect=FtdServerError({'error': 'Bad request'}, 400))
+
+        with pytest.raises(FtdServerError):
+            list(iterate_over_pageable_resource(resource_func, {'query_params': {}}, PageSize(MIN_PAGE_SIZE)))
+
+        resource_func.assert_called_once_with(params={'query_params': {'offset': 0, 'limit': MIN_PAGE_SIZE}})
+
+    def test_iterate_over_pageable_resource_should_update_shared_page_size(self):
+        page_size = PageSize()
+        resource_func = mock.Mock(side_effect=[
+            FtdServerError({'error': 'Invalid limit'}, 400),
+            {'items': []},
+            {'items': []},
+        ])
+
+        list(iterate_over_pageable_resource(resource_func, {'query_params': {}}, page_size))
+        list(iterate_over_pageable_resource(resource_func, {'query_params': {}}, page_size))
+
+        assert DEFAULT_PAGE_SIZE // 2 == page_size.limit
+        resource_func.assert_called_with(params={'query_params': {'offset': 0, 'limit': DEFAULT_PAGE_SIZE // 2}})
+
+    @staticmethod
+    def _paged_resource(items, limit):
+        def get_page(params):
+            offset = params['query_params']['offset']
+            return {'items': items[offset:offset + limit], 'paging': {'limit': limit, 'count': len(items)}}
+
+        return mock.Mock(side_effect=get_page)
+
+    @staticmethod
+    def _pages_func(resource_func):
+        def get_pages(params_list):
+            pages = []
+            for params in params_list:
+                try:
+                    pages.append(resource_func(params=params))
+                except Exception as e:
+                    pages.append(e)
+            return pages
+
+        return mock.Mock(side_effect=get_pages)
+
+    @staticmethod
+    def _requested_offsets(calls):
+        return [c[1]['params']['query_params']['offset'] for c in calls]
+
+    def test_iterate_over_pageable_resource_should_prefetch_pages_in_batches(self):
+        all_items = list(range(25))
+        resource_func = self._paged_resource(all_items, 5)
+        pages_func = self._pages_func(resource_func)
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 5}},
+                                               pages_func=pages_func, prefetch_count=3)
+
+        assert all_items == list(items)
+        # the total count tells that the last page is full, so no empty page is requested after it
+        assert [0, 5, 10, 15, 20] == self._requested_offsets(resource_func.call_args_list)
+        assert [[5, 10, 15], [20]] == [[p['query_params']['offset'] for p in c[0][0]]
+                                       for c in pages_func.call_args_list]
+
+    def test_iterate_over_pageable_resource_should_request_pages_one_by_one_by_default(self):
+        resource_func = self._paged_resource(list(range(100)), 5)
+        pages_func = self._pages_func(resource_func)
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 5}}, pages_func=pages_func)
+
+        assert [0, 1, 2, 3, 4, 5] == [next(items) for _ in range(6)]
+        items.close()
+        assert [0, 5] == self._requested_offsets(resource_func.call_args_list)
+        pages_func.assert_not_called()
+
+    def test_iterate_over_pageable_resource_should_not_prefetch_without_total_count(self):
+        resource_func = mock.Mock(side_effect=[
+            {'items': ['foo']},
+            {'items': []},
+        ])
+        pages_func = self._pages_func(resource_func)
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 1}},
+                                               pages_func=pages_func, prefetch_count=3)
+
+        assert ['foo'] == list(items)
+        resource_func.assert_has_calls([
+            call(params={'query_params': {'offset': 0, 'limit': 1}}),
+            call(params={'query_params': {'offset': 1, 'limit': 1}})
+        ])
+        assert 2 == resource_func.call_count
+        pages_func.assert_not_called()
+
+    def test_iterate_over_pageable_resource_should_drop_prefetched_pages_when_page_size_shrinks(self):
+        all_items = list(range(60))
+
+        def get_page(params):
+            offset, limit = params['query_params']['offset'], params['query_params']['limit']
+            if offset == 20 and limit == 20:
+                raise FtdServerError({'error': 'Bad request'}, 400)
+            return {'items': all_items[offset:offset + limit], 'paging': {'limit': 20, 'count': len(all_items)}}
+
+        resource_func = mock.Mock(side_effect=get_page)
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 20}},
+                                               pages_func=self._pages_func(resource_func), prefetch_count=2)
+
+        assert all_items == list(items)
+        resource_func.assert_any_call(params={'query_params': {'offset': 20, 'limit': 10}})
+
+    def test_iterate_over_pageable_resource_should_request_pages_one_by_one_when_batch_fails(self):
+        all_items = list(range(15))
+        resource_func = self._paged_resource(all_items, 5)
+        pages_func = mock.Mock(side_effect=ConnectionError('timed out'))
+
+        items = iterate_over_pageable_resource(resource_func, {'query_params': {'limit': 5}},
+                                               pages_func=pages_func, prefetch_count=2)
+
+        assert all_items == list(items)
+        assert [0, 5, 10] == self._requested_offsets(resource_func.call_args_list)
+
 
 class TestOperationCheckerClass(unittest.TestCase):
     def setUp(self):
@@ -590,3 +1461,13 @@ class TestOperationCheckerClass(unittest.TestCase):
         assert not self._checker.is_upsert_operation_supported({'getList': get_list_op_spec})
         assert not self._checker.is_upsert_operation_supported({'edit': edit_op_spec})
         assert not self._checker.is_upsert_operation_supported({'getList': get_list_op_spec, 'add': add_op_spec})
+
+    def test_is_bulk_operation(self):
+        bulk_query_params = {'query': {'bulk': {'type': 'boolean'}}}
+
+        assert self._checker.is_bulk_operation('addObject', {
+            OperationField.URL: '/object/networks', OperationField.PARAMETERS: bulk_query_params})
+        assert not self._checker.is_bulk_operation('editObject', {
+            OperationField.URL: '/object/networks/{objId}', OperationField.PARAMETERS: bulk_query_params})
+        assert not self._checker.is_bulk_operation('addObject', {
+            OperationField.URL: '/object/networks', OperationField.PARAMETERS: {'query': {}}})
@@ -0,0 +1,142 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import os
+import ssl
+import threading
+import time
+import unittest
+
+from ansible.module_utils.six.moves import BaseHTTPServer, socketserver
+
+from module_utils.connection_pool import KeepAliveConnectionPool, PoolStats, TLS_SESSION_RESUMPTION_SUPPORTED
+
+TEST_DATA_FOLDER = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'test_data')
+
+
+class KeepAliveHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    slow_request_started = threading.Event()
+    slow_request_released = threading.Event()
+
+    def do_GET(self):
+        if self.path == '/slow':
+            KeepAliveHandler.slow_request_started.set()
+            KeepAliveHandler.slow_request_released.wait(5)
+        body = b'{"path": "%s"}' % self.path.encode() if self.path != '/missing' else b'{}'
+        self.send_response(200 if self.path != '/missing' else 404)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+class KeepAliveServerTestCase(unittest.TestCase):
+    SCHEME = 'http'
+
+    def setUp(self):
+        KeepAliveHandler.slow_request_started.clear()
+        KeepAliveHandler.slow_request_released.clear()
+        self.server = self._create_server()
+        self.server_thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05})
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.base_url = '%s://localhost:%s' % (self.SCHEME, self.server.server_address[1])
+
+    def tearDown(self):
+        KeepAliveHandler.slow_request_released.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _create_server(self):
+        return ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+
+    @staticmethod
+    def _request(pool, path):
+        status, _, _, body = pool.request('GET', path)
+        return status, body
+
+
+class TestKeepAliveConnectionPool(KeepAliveServerTestCase):
+
+    def test_request_should_reuse_open_connection(self):
+        pool = KeepAliveConnectionPool(self.base_url, max_size=1)
+
+        assert (200, b'{"path": "/test?a=1"}') == self._request(pool, '/test?a=1')
+        assert (404, b'{}') == self._request(pool, '/missing')
+        assert (200, b'{"path": "/test"}') == self._request(pool, '/test')
+        pool.close()
+
+        assert {PoolStats.REQUESTS: 3, PoolStats.CONNECTIONS: 1, PoolStats.REUSED: 2,
+                PoolStats.EXPIRED: 0, PoolStats.RESUMED: 0} == pool.get_stats()
+
+    def test_request_should_drop_idle_connections(self):
+        pool = KeepAliveConnectionPool(self.base_url, max_size=1, idle_timeout=-1)
+
+        self._request(pool, '/test')
+        self._request(pool, '/test')
+
+        assert {PoolStats.REQUESTS: 2, PoolStats.CONNECTIONS: 2, PoolStats.REUSED: 0,
+                PoolStats.EXPIRED: 1, PoolStats.RESUMED: 0} == pool.get_stats()
+        pool.close()
+
+    def test_request_should_not_drop_connections_while_requests_are_in_progress(self):
+        pool = KeepAliveConnectionPool(self.base_url, max_size=2, idle_timeout=0)
+        slow_request = threading.Thread(target=self._request, args=(pool, '/slow'))
+        slow_request.start()
+        KeepAliveHandler.slow_request_started.wait(5)
+        # the slow request has been in progress for longer than the idle timeout
+        time.sleep(0.01)
+
+        assert (200, b'{"path": "/test"}') == self._request(pool, '/test')
+        KeepAliveHandler.slow_request_released.set()
+        slow_request.join()
+
+        assert {PoolStats.REQUESTS: 2, PoolStats.CONNECTIONS: 2, PoolStats.REUSED: 0,
+                PoolStats.EXPIRED: 0, PoolStats.RESUMED: 0} == pool.get_stats()
+        pool.close()
+
+
+@unittest.skipUnless(TLS_SESSION_RESUMPTION_SUPPORTED, 'TLS sessions cannot be passed to new connections')
+class TestKeepAliveConnectionPoolWithTls(KeepAliveServerTestCase):
+    SCHEME = 'https'
+
+    def _create_server(self):
+        server = super(TestKeepAliveConnectionPoolWithTls, self)._create_server()
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(os.path.join(TEST_DATA_FOLDER, 'localhost.crt'),
+                                os.path.join(TEST_DATA_FOLDER, 'localhost.key'))
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        return server
+
+    def test_request_should_resume_tls_session_in_new_connections(self):
+        pool = KeepAliveConnectionPool(self.base_url, max_size=1, idle_timeout=-1, validate_certs=False)
+
+        for _ in range(3):
+            assert (200, b'{"path": "/test"}') == self._request(pool, '/test')
+
+        assert {PoolStats.REQUESTS: 3, PoolStats.CONNECTIONS: 3, PoolStats.REUSED: 0,
+                PoolStats.EXPIRED: 2, PoolStats.RESUMED: 2} == pool.get_stats()
+        pool.close()
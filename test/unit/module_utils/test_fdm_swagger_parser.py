@@ -213,6 +213,50 @@ class TestFdmSwaggerParser(unittest.TestCase):
         assert expected_operations == self.fdm_data['operations']
         assert {'NetworkObject': expected_operations} == self.fdm_data['model_operations']
 
+    def test_lazy_mode_returns_same_operations_as_eager_mode(self):
+        eager_data = FdmSwaggerParser().parse_spec(copy.deepcopy(base))
+        lazy_data = FdmSwaggerParser().parse_spec(copy.deepcopy(base), lazy=True)
+
+        assert eager_data['models'] == lazy_data['models']
+        assert eager_data['operations'] == lazy_data['operations']
+        assert eager_data['model_operations'] == lazy_data['model_operations']
+
+    def test_lazy_mode_builds_operations_on_first_access(self):
+        lazy_data = FdmSwaggerParser().parse_spec(copy.deepcopy(base), lazy=True)
+        operations = lazy_data['operations']
+
+        assert 5 == len(operations)
+        assert 'getNetworkObject' in operations
+        assert 'nonExistingOperation' not in operations
+        assert operations.get('nonExistingOperation') is None
+        assert {} == operations._operations
+
+        operation = operations['getNetworkObject']
+        assert '/api/fdm/v2/object/networks/{objId}' == operation['url']
+        assert operation is operations['getNetworkObject']
+        assert ['getNetworkObject'] == list(operations._operations.keys())
+
+    def test_filter_keys_are_taken_from_filter_param_description(self):
+        api_spec = copy.deepcopy(base)
+        filter_param = api_spec['paths']['/object/networks']['get']['parameters'][3]
+        filter_param['description'] = 'The criteria used to filter the models you are requesting. ' \
+                                      'Supported operators are: ":"(equals). ' \
+                                      'Supported keys are: "name", "value", "fts".'
+
+        operations = FdmSwaggerParser().parse_spec(api_spec)['operations']
+
+        assert ['name', 'value', 'fts'] == operations['getNetworkObjectList']['filterKeys']
+        assert 'filterKeys' not in operations['getNetworkObject']
+
+    def test_unquoted_filter_keys_are_taken_from_filter_param_description(self):
+        api_spec = copy.deepcopy(base)
+        filter_param = api_spec['paths']['/object/networks']['get']['parameters'][3]
+        filter_param['description'] = 'Supported keys are: name, subType and value'
+
+        operations = FdmSwaggerParser().parse_spec(api_spec, lazy=True)['operations']
+
+        assert ['name', 'subType', 'value'] == operations['getNetworkObjectList']['filterKeys']
+
     def test_simple_object_with_documentation(self):
         api_spec = copy.deepcopy(base)
         docs = {
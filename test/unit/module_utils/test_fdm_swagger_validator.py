@@ -1137,3 +1137,42 @@ class TestFdmSwaggerValidator(unittest.TestCase):
                     'expected_type': 'object',
                     'actually_value': []}
             ]}) == sort_validator_rez(rez)
+
+    def test_validate_data_should_reuse_compiled_model_plans(self):
+        local_mock_data = {
+            'models': {
+                'TreeNode': {
+                    'type': 'object',
+                    'required': ['name'],
+                    'properties': {
+                        'name': {'type': 'string'},
+                        'children': {'type': 'array',
+                                     'items': {'type': 'object', '$ref': '#/definitions/TreeNode'}}
+                    }
+                }
+            },
+            'operations': {
+                'addTreeNode': {
+                    'modelName': 'TreeNode'
+                }
+            }
+        }
+        data = {'name': 'root', 'children': [{'name': 'child', 'children': [{'children': []}, {'name': 1}]}]}
+        validator = FdmSwaggerValidator(local_mock_data)
+
+        expected_report = {
+            'required': ['children[0].children[0].name'],
+            'invalid_type': [
+                {
+                    'path': 'children[0].children[1].name',
+                    'expected_type': 'string',
+                    'actually_value': 1
+                }
+            ]
+        }
+        assert (False, expected_report) == validator.validate_data('addTreeNode', data)
+        assert ['TreeNode'] == list(validator._model_plans.keys())
+
+        compiled_plan = validator._model_plans['TreeNode']
+        assert (False, expected_report) == validator.validate_data('addTreeNode', data)
+        assert compiled_plan is validator._model_plans['TreeNode']
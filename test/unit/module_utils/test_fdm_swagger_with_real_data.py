@@ -76,3 +76,12 @@ class TestFdmSwagger(unittest.TestCase):
             without_model_name)
         assert sorted(self.fdm_data['model_operations'][None].keys()) == sorted(['deleteDeployment', 'startUpgrade'])
         assert expected_operations_counter == len(operations)
+
+    def test_parse_all_data_in_lazy_mode(self):
+        eager_data = FdmSwaggerParser().parse_spec(self.base_data)
+        lazy_data = FdmSwaggerParser().parse_spec(self.base_data, lazy=True)
+
+        assert sorted(eager_data['operations'].keys()) == sorted(lazy_data['operations'].keys())
+        for operation_name, operation in eager_data['operations'].items():
+            assert operation == lazy_data['operations'][operation_name]
+        assert eager_data['model_operations'] == lazy_data['model_operations']
@@ -0,0 +1,74 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+from units.compat.mock import patch
+
+from module_utils.file_utils import ensure_dir, remove_file, write_file_atomically
+
+
+class TestFileUtils(unittest.TestCase):
+
+    def setUp(self):
+        self.base_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.base_dir)
+
+    def test_ensure_dir_creates_missing_parents_and_accepts_existing_dir(self):
+        dir_path = os.path.join(self.base_dir, 'foo', 'bar')
+
+        ensure_dir(dir_path)
+        ensure_dir(dir_path)
+
+        assert os.path.isdir(dir_path)
+
+    def test_remove_file_ignores_missing_file(self):
+        file_path = os.path.join(self.base_dir, 'foo')
+        open(file_path, 'w').close()
+
+        remove_file(file_path)
+        remove_file(file_path)
+
+        assert not os.path.exists(file_path)
+
+    def test_write_file_atomically_replaces_file_content(self):
+        file_path = os.path.join(self.base_dir, 'foo')
+
+        write_file_atomically(file_path, b'old')
+        write_file_atomically(file_path, b'new')
+
+        with open(file_path, 'rb') as f:
+            assert b'new' == f.read()
+        assert ['foo'] == os.listdir(self.base_dir)
+
+    def test_write_file_atomically_keeps_old_content_and_removes_temp_file_on_failure(self):
+        file_path = os.path.join(self.base_dir, 'foo')
+        write_file_atomically(file_path, b'old')
+
+        with patch('module_utils.file_utils.os.rename', side_effect=OSError('No space left on device')):
+            with pytest.raises(OSError):
+                write_file_atomically(file_path, b'new')
+
+        with open(file_path, 'rb') as f:
+            assert b'old' == f.read()
+        assert ['foo'] == os.listdir(self.base_dir)
@@ -0,0 +1,160 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import threading
+
+import pytest
+from units.compat import mock
+
+from module_utils.fleet_deployment import FleetDeployment, DeviceResult, FleetSummary
+
+try:
+    from ansible.module_utils.common import FtdServerError
+except ImportError:
+    from module_utils.common import FtdServerError
+
+
+def job(state, finished=True):
+    return {'id': 'job', 'state': state, 'endTime': 1 if finished else -1}
+
+
+class FakeResource(object):
+    """Returns the given deployment jobs one by one: the first one is started, and the rest are polled."""
+
+    def __init__(self, jobs):
+        self.config_changed = False
+        self._jobs = list(jobs)
+
+    def start_deployment(self, params, skip_if_no_changes=False):
+        deployment = self._jobs.pop(0)
+        self.config_changed = deployment is not None
+        return deployment
+
+    def get_deployment(self, deployment):
+        result = self._jobs.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+class FakeDevices(dict):
+    """Maps device names to their deployment jobs, or to the error raised when connecting to the device."""
+
+    def __init__(self):
+        super(FakeDevices, self).__init__()
+        self.open_connections = []
+        self.max_open_connections = 0
+
+    def connect(self, device_name):
+        jobs = self[device_name]
+        if isinstance(jobs, Exception):
+            raise jobs
+        connection = mock.MagicMock(resource=FakeResource(jobs))
+        connection.close.side_effect = lambda: self.open_connections.remove(device_name)
+        self.open_connections.append(device_name)
+        self.max_open_connections = max(self.max_open_connections, len(self.open_connections))
+        return connection
+
+
+class TestFleetDeployment(object):
+
+    @pytest.fixture(autouse=True)
+    def clock(self, mocker):
+        time_mock = mocker.patch('module_utils.fleet_deployment.time')
+        clock = [0.0]
+        time_mock.time.side_effect = lambda: clock[0]
+        time_mock.sleep.side_effect = lambda delay: clock.__setitem__(0, clock[0] + delay)
+        return time_mock
+
+    @pytest.fixture
+    def devices(self, mocker):
+        mocker.patch('module_utils.fleet_deployment.BaseConfigurationResource').side_effect = \
+            lambda conn, check_mode: conn.resource
+        return FakeDevices()
+
+    def test_run_should_deploy_to_bounded_number_of_devices_at_a_time(self, devices, clock):
+        devices.update({
+            'ftd1': [job('QUEUED', False), job('DEPLOYING', False), job('DEPLOYED')],
+            'ftd2': [job('QUEUED', False), job('DEPLOYED')],
+            'ftd3': [job('QUEUED', False), job('DEPLOYED')]
+        })
+
+        results, summary = FleetDeployment(['ftd1', 'ftd2', 'ftd3'], devices.connect, concurrency=2).run()
+
+        assert 2 == devices.max_open_connections
+        assert [] == devices.open_connections
+        assert {DeviceResult.CHANGED: True, DeviceResult.FAILED: False, DeviceResult.SKIPPED: False,
+                DeviceResult.STATE: 'DEPLOYED', DeviceResult.DURATION: 2.5, DeviceResult.POLLS: 2} == results['ftd1']
+        # the third device starts once the second one is finished after the first poll
+        assert 1.0 == results['ftd2'][DeviceResult.DURATION]
+        assert 1.0 == results['ftd3'][DeviceResult.DURATION]
+        assert {FleetSummary.TOTAL: 3, FleetSummary.DEPLOYED: 3, FleetSummary.PLANNED: 0, FleetSummary.SKIPPED: 0,
+                FleetSummary.FAILED: 0, FleetSummary.DURATION: 2.5} == summary
+
+    def test_run_should_report_failures_per_device(self, devices, clock):
+        devices.update({
+            'unreachable': Exception('Could not connect'),
+            'failed': [job('QUEUED', False), job('DEPLOY_FAILED')],
+            'server_error': [job('QUEUED', False), FtdServerError({'error': 'Internal'}, 500)],
+            'slow': [job('QUEUED', False)] + [job('DEPLOYING', False)] * 10,
+            'skipped': [None]
+        })
+
+        results, summary = FleetDeployment(sorted(devices), devices.connect, timeout=5,
+                                           skip_if_no_changes=True).run()
+
+        assert 'Could not connect' == results['unreachable'][DeviceResult.MSG]
+        assert "Deployment job finished in the DEPLOY_FAILED state: None" == results['failed'][DeviceResult.MSG]
+        assert "Server returned an error. Status code: 500. Server response: {'error': 'Internal'}" == \
+            results['server_error'][DeviceResult.MSG]
+        assert 'Deployment job has not finished in 5 seconds. Last known state: DEPLOYING' == \
+            results['slow'][DeviceResult.MSG]
+        assert 5.0 == results['slow'][DeviceResult.DURATION]
+        assert results['skipped'][DeviceResult.SKIPPED]
+        assert not results['skipped'][DeviceResult.FAILED]
+        assert {FleetSummary.TOTAL: 5, FleetSummary.DEPLOYED: 0, FleetSummary.PLANNED: 0, FleetSummary.SKIPPED: 1,
+                FleetSummary.FAILED: 4, FleetSummary.DURATION: 5.0} == summary
+        assert [] == devices.open_connections
+
+    def test_run_should_not_poll_deployments_in_check_mode(self, devices, clock):
+        devices['ftd1'] = [{}]
+
+        results, summary = FleetDeployment(['ftd1'], devices.connect, check_mode=True).run()
+
+        assert results['ftd1'][DeviceResult.CHANGED]
+        assert not results['ftd1'][DeviceResult.FAILED]
+        assert not clock.sleep.called
+        assert {FleetSummary.TOTAL: 1, FleetSummary.DEPLOYED: 0, FleetSummary.PLANNED: 1, FleetSummary.SKIPPED: 0,
+                FleetSummary.FAILED: 0, FleetSummary.DURATION: 0.0} == summary
+
+    def test_run_should_connect_to_devices_concurrently(self, devices, clock):
+        devices.update({'ftd1': [job('DEPLOYED')], 'ftd2': [job('DEPLOYED')]})
+        both_connecting = threading.Event()
+        connecting = []
+
+        def connect(device_name):
+            connecting.append(device_name)
+            if len(connecting) == 2:
+                both_connecting.set()
+            # the wait times out when devices are connected to one at a time
+            both_connecting.wait(5)
+            return devices.connect(device_name)
+
+        results, summary = FleetDeployment(['ftd1', 'ftd2'], connect, concurrency=2).run()
+
+        assert both_connecting.is_set()
+        assert 2 == summary[FleetSummary.DEPLOYED]
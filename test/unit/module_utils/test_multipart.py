@@ -0,0 +1,70 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import os
+import tempfile
+import unittest
+
+from urllib3 import encode_multipart_formdata
+from urllib3.fields import RequestField
+
+from module_utils.multipart import MultipartFileStream
+
+FILE_CONTENT = b'0123456789' * 1000
+
+
+class TestMultipartFileStream(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.file_path = tempfile.mkstemp(suffix='.sf')
+        with os.fdopen(fd, 'wb') as test_file:
+            test_file.write(FILE_CONTENT)
+        field = RequestField('fileToUpload', FILE_CONTENT, os.path.basename(self.file_path))
+        field.make_multipart()
+        self.expected_body, self.expected_content_type = encode_multipart_formdata([field], 'test-boundary')
+
+    def tearDown(self):
+        os.remove(self.file_path)
+
+    def test_read_should_return_body_encoded_as_by_urllib3(self):
+        with MultipartFileStream('fileToUpload', self.file_path, boundary='test-boundary') as stream:
+            assert self.expected_content_type == stream.content_type
+            assert len(self.expected_body) == len(stream)
+            assert self.expected_body == stream.read()
+            assert b'' == stream.read()
+
+    def test_read_should_return_body_in_chunks_of_given_size(self):
+        with MultipartFileStream('fileToUpload', self.file_path, boundary='test-boundary') as stream:
+            chunks = iter(lambda: stream.read(333), b'')
+            body = list(chunks)
+
+        assert all(len(chunk) == 333 for chunk in body[:-1])
+        assert self.expected_body == b''.join(body)
+
+    def test_seek_should_rewind_body(self):
+        with MultipartFileStream('fileToUpload', self.file_path, boundary='test-boundary') as stream:
+            stream.read(5000)
+            assert 0 == stream.seek(0)
+            assert 0 == stream.tell()
+            assert self.expected_body == stream.read()
+
+    def test_read_raises_exception_when_file_is_truncated(self):
+        with MultipartFileStream('fileToUpload', self.file_path) as stream:
+            with open(self.file_path, 'wb') as test_file:
+                test_file.write(b'short')
+
+            self.assertRaises(IOError, stream.read)
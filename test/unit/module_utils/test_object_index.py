@@ -0,0 +1,85 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import unittest
+
+from module_utils.object_index import ObjectIndex, get_index_key
+
+OBJ1 = {'id': '1', 'name': 'obj1', 'version': 'a'}
+OBJ2 = {'id': '2', 'name': 'obj2', 'version': 'b'}
+
+
+class TestObjectIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.index = ObjectIndex()
+        self.index.populate('NetworkObject', [OBJ1, OBJ2])
+
+    def test_get_should_return_indexed_object(self):
+        assert (True, OBJ1) == self.index.get('NetworkObject', 'obj1')
+        assert (True, None) == self.index.get('NetworkObject', 'obj3')
+
+    def test_get_by_id_should_return_indexed_object(self):
+        assert (True, OBJ2) == self.index.get_by_id('NetworkObject', '2')
+        assert (True, None) == self.index.get_by_id('NetworkObject', '3')
+        assert (False, None) == self.index.get_by_id('PortObject', '1')
+
+    def test_get_should_report_model_that_is_not_indexed(self):
+        assert (False, None) == self.index.get('PortObject', 'obj1')
+
+    def test_update_should_replace_object_and_handle_renaming(self):
+        renamed_obj = {'id': '1', 'name': 'obj1-renamed', 'version': 'c'}
+
+        self.index.update('NetworkObject', renamed_obj)
+
+        assert (True, None) == self.index.get('NetworkObject', 'obj1')
+        assert (True, renamed_obj) == self.index.get('NetworkObject', 'obj1-renamed')
+
+    def test_update_should_ignore_model_that_is_not_indexed(self):
+        self.index.update('PortObject', OBJ1)
+
+        assert not self.index.is_indexed('PortObject')
+
+    def test_verify_should_invalidate_index_when_version_differs(self):
+        assert self.index.verify('NetworkObject', OBJ1)
+        assert self.index.is_indexed('NetworkObject')
+
+        assert not self.index.verify('NetworkObject', dict(OBJ1, version='changed'))
+        assert not self.index.is_indexed('NetworkObject')
+
+    def test_remove_should_delete_object_by_id(self):
+        self.index.remove('NetworkObject', '2')
+        self.index.remove('NetworkObject', 'unknown')
+
+        assert (True, None) == self.index.get('NetworkObject', 'obj2')
+        assert (True, OBJ1) == self.index.get('NetworkObject', 'obj1')
+
+    def test_invalidate_should_drop_indexes(self):
+        self.index.populate('PortObject', [])
+
+        self.index.invalidate('NetworkObject')
+        assert not self.index.is_indexed('NetworkObject')
+        assert self.index.is_indexed('PortObject')
+
+        self.index.invalidate()
+        assert not self.index.is_indexed('PortObject')
+
+    def test_get_index_key_should_include_parent_path_params(self):
+        assert 'NetworkObject' == get_index_key('NetworkObject', {'objId': '1'})
+        rule_key = get_index_key('AccessRule', {'parentId': 'a', 'objId': '1'})
+        assert get_index_key('AccessRule', {'parentId': 'a'}) == rule_key
+        assert get_index_key('AccessRule', {'parentId': 'a'}) != get_index_key('AccessRule', {'parentId': 'b'})
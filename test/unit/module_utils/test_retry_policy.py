@@ -0,0 +1,62 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import time
+import unittest
+from email.utils import formatdate
+
+from module_utils.common import HTTPMethod
+from module_utils.retry_policy import RetryPolicy, parse_retry_after
+
+
+class TestRetryPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.policy = RetryPolicy(status_codes=['503'], methods=['GET', 'PUT'], max_attempts=3, backoff_base=1.0,
+                                  backoff_max=10.0)
+
+    def test_should_retry_only_idempotent_methods_and_given_status_codes(self):
+        assert self.policy.should_retry(HTTPMethod.GET, 503, 1)
+        assert self.policy.should_retry(HTTPMethod.PUT, 503, 2)
+        assert not self.policy.should_retry(HTTPMethod.POST, 503, 1)
+        assert not self.policy.should_retry(HTTPMethod.GET, 500, 1)
+
+    def test_should_retry_stops_after_max_attempts(self):
+        assert not self.policy.should_retry(HTTPMethod.GET, 503, 3)
+        assert not RetryPolicy(max_attempts=1).should_retry(HTTPMethod.GET, 503, 1)
+
+    def test_should_not_retry_when_status_codes_or_methods_are_empty(self):
+        assert RetryPolicy().should_retry(HTTPMethod.GET, 503, 1)
+        assert not RetryPolicy(status_codes=[]).should_retry(HTTPMethod.GET, 503, 1)
+        assert not RetryPolicy(methods=[]).should_retry(HTTPMethod.GET, 503, 1)
+
+    def test_get_delay_grows_exponentially_up_to_max(self):
+        for dummy in range(20):
+            assert 0 <= self.policy.get_delay(1) <= 1.0
+            assert 0 <= self.policy.get_delay(3) <= 4.0
+            assert 0 <= self.policy.get_delay(10) <= 10.0
+
+    def test_get_delay_honors_retry_after_up_to_max(self):
+        assert 7.0 == self.policy.get_delay(1, '7')
+        assert 10.0 == self.policy.get_delay(1, '120')
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after(None) is None
+        assert parse_retry_after('soon') is None
+        assert 3.0 == parse_retry_after(' 3 ')
+        assert 0.0 == parse_retry_after(formatdate(time.time() - 60, usegmt=True))
+        assert 50 < parse_retry_after(formatdate(time.time() + 60, usegmt=True)) <= 60
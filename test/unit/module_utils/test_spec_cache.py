@@ -0,0 +1,142 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from module_utils.spec_cache import SpecCache, PackedSection, pack_spec, load_packed_spec
+
+SPEC_PATH = '/apispec/ngfw.json'
+SPEC = {
+    'models': {'NetworkObject': {'type': 'object'}},
+    'operations': {'getNetworkObject': {'method': 'get', 'url': '/api/fdm/v2/object/networks/{objId}'}}
+}
+
+
+class TestSpecCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = SpecCache(self.cache_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_load_returns_none_when_cache_is_empty(self):
+        assert self.cache.load('6.4.0-102', SPEC_PATH) is None
+
+    def test_load_returns_stored_spec(self):
+        self.cache.store('6.4.0-102', SPEC_PATH, SPEC)
+
+        assert SPEC == SpecCache(self.cache_dir).load('6.4.0-102', SPEC_PATH)
+
+    def test_load_returns_none_for_different_build_version_or_spec_path(self):
+        self.cache.store('6.4.0-102', SPEC_PATH, SPEC)
+
+        assert self.cache.load('6.5.0-115', SPEC_PATH) is None
+        assert self.cache.load('6.4.0-102', '/apispec/custom.json') is None
+
+    def test_store_replaces_existing_entry(self):
+        new_spec = dict(SPEC, models={})
+        self.cache.store('6.4.0-102', SPEC_PATH, SPEC)
+        self.cache.store('6.4.0-102', SPEC_PATH, new_spec)
+
+        assert new_spec == self.cache.load('6.4.0-102', SPEC_PATH)
+        assert 1 == len(os.listdir(os.path.join(self.cache.cache_dir, 'refs')))
+
+    def test_store_keeps_single_copy_of_identical_specs(self):
+        digest = self.cache.store('6.4.0-102', SPEC_PATH, SPEC)
+        assert digest == self.cache.store('6.4.0-110', SPEC_PATH, SPEC)
+        assert digest == self.cache.store_revision('https://ftd.example.com/apispec/ngfw.json', SPEC, {})
+
+        assert ['%s.spec' % digest] == os.listdir(os.path.join(self.cache.cache_dir, 'objects'))
+        assert SPEC == self.cache.load('6.4.0-110', SPEC_PATH)
+
+    def test_store_keeps_digest_of_loaded_spec(self):
+        digest = self.cache.store('6.4.0-102', SPEC_PATH, SPEC)
+        loaded_spec = self.cache.load('6.4.0-102', SPEC_PATH)
+
+        assert digest == self.cache.store('6.4.0-110', SPEC_PATH, loaded_spec)
+
+    def test_store_evicts_least_recently_used_entries(self):
+        cache = SpecCache(self.cache_dir, max_entries=2)
+        for i, build_version in enumerate(['6.3.0-83', '6.4.0-102', '6.5.0-115']):
+            digest = cache.store(build_version, SPEC_PATH, dict(SPEC, version=build_version))
+            object_path = os.path.join(cache.cache_dir, 'objects', '%s.spec' % digest)
+            os.utime(object_path, (time.time() - 100 + i, time.time() - 100 + i))
+
+        assert cache.load('6.3.0-83', SPEC_PATH) is None
+        assert dict(SPEC, version='6.4.0-102') == cache.load('6.4.0-102', SPEC_PATH)
+        assert dict(SPEC, version='6.5.0-115') == cache.load('6.5.0-115', SPEC_PATH)
+        assert 2 == len(os.listdir(os.path.join(cache.cache_dir, 'refs')))
+
+    def test_load_drops_corrupted_entry(self):
+        digest = self.cache.store('6.4.0-102', SPEC_PATH, SPEC)
+        object_path = os.path.join(self.cache.cache_dir, 'objects', '%s.spec' % digest)
+        with open(object_path, 'wb') as f:
+            f.write(b'not a packed spec')
+
+        assert self.cache.load('6.4.0-102', SPEC_PATH) is None
+        assert not os.path.exists(object_path)
+
+    def test_load_revision_returns_stored_spec_and_revision(self):
+        spec_url = 'https://ftd.example.com/apispec/ngfw.json'
+        revision = {'etag': '"spec-etag"', 'last_modified': 'Mon, 02 Mar 2020 10:00:00 GMT'}
+        self.cache.store_revision(spec_url, SPEC, revision)
+
+        assert (SPEC, revision) == self.cache.load_revision(spec_url)
+        assert (None, {}) == self.cache.load_revision('https://other-ftd.example.com/apispec/ngfw.json')
+
+
+class TestPackedSpec(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.spec_path = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pack_spec(dict(SPEC, version='6.4.0')))
+
+    def tearDown(self):
+        os.remove(self.spec_path)
+
+    def test_load_packed_spec_returns_lazy_sections(self):
+        spec = load_packed_spec(self.spec_path)
+
+        assert '6.4.0' == spec['version']
+        assert isinstance(spec['operations'], PackedSection)
+        assert ['getNetworkObject'] == list(spec['operations'])
+        assert 'getNetworkObject' in spec['operations']
+        assert 'addNetworkObject' not in spec['operations']
+        assert SPEC['operations']['getNetworkObject'] == spec['operations'].get('getNetworkObject')
+        assert spec['operations']['getNetworkObject'] is spec['operations']['getNetworkObject']
+
+    def test_pack_spec_stores_operations_without_model_under_null_key(self):
+        with open(self.spec_path, 'wb') as f:
+            f.write(pack_spec({'model_operations': {None: {'getStatus': {}}, 'NetworkObject': {}}}))
+
+        spec = load_packed_spec(self.spec_path)
+
+        assert {'getStatus': {}} == spec['model_operations']['null']
+        assert {} == spec['model_operations']['NetworkObject']
+
+    def test_load_packed_spec_raises_error_for_invalid_file(self):
+        with open(self.spec_path, 'wb') as f:
+            f.write(b'{"models": {}}')
+
+        self.assertRaises(ValueError, load_packed_spec, self.spec_path)
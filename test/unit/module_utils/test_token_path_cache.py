@@ -0,0 +1,72 @@
+# Copyright (c) 2018 Cisco and/or its affiliates.
+#
+# This file is part of Ansible
+#
+# Ansible is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# Ansible is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Ansible.  If not, see <http://www.gnu.org/licenses/>.
+#
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from units.compat.mock import patch
+
+from module_utils.token_path_cache import TokenPathCache
+
+DEVICE_URL = 'https://10.0.0.1'
+TOKEN_PATH = '/api/fdm/v3/fdm/token'
+
+
+class TestTokenPathCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.cache = TokenPathCache(os.path.join(self.cache_dir, 'token_paths'))
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def test_load_returns_none_when_cache_is_empty(self):
+        assert self.cache.load(DEVICE_URL) is None
+
+    def test_load_returns_token_path_stored_for_device(self):
+        self.cache.store(DEVICE_URL, TOKEN_PATH)
+
+        assert TOKEN_PATH == TokenPathCache(os.path.join(self.cache_dir, 'token_paths')).load(DEVICE_URL)
+        assert self.cache.load('https://10.0.0.2') is None
+
+    def test_load_returns_none_when_entry_is_expired(self):
+        self.cache.store(DEVICE_URL, TOKEN_PATH)
+        cache = TokenPathCache(os.path.join(self.cache_dir, 'token_paths'), ttl=60)
+
+        with patch('module_utils.token_path_cache.time.time', return_value=time.time() + 61):
+            assert cache.load(DEVICE_URL) is None
+
+    def test_load_returns_none_when_entry_is_corrupted(self):
+        self.cache.store(DEVICE_URL, TOKEN_PATH)
+        entries_dir = os.path.join(self.cache_dir, 'token_paths')
+        entry_path = os.path.join(entries_dir, os.listdir(entries_dir)[0])
+        with open(entry_path, 'w') as entry_file:
+            entry_file.write('{broken')
+
+        assert self.cache.load(DEVICE_URL) is None
+
+    def test_invalidate_removes_entry(self):
+        self.cache.store(DEVICE_URL, TOKEN_PATH)
+
+        self.cache.invalidate(DEVICE_URL)
+        self.cache.invalidate(DEVICE_URL)
+
+        assert self.cache.load(DEVICE_URL) is None
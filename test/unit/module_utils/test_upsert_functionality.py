@@ -7,18 +7,22 @@ import unittest
 import pytest
 from units.compat import mock
 
+from .test_configuration import delegate_to_plugin
+
 try:
     from ansible.module_utils.common import FtdServerError, HTTPMethod, ResponseParams, FtdConfigurationError
     from ansible.module_utils.configuration import DUPLICATE_NAME_ERROR_MESSAGE, UNPROCESSABLE_ENTITY_STATUS, \
         MULTIPLE_DUPLICATES_FOUND_ERROR, BaseConfigurationResource, FtdInvalidOperationNameError, QueryParams, \
-        ADD_OPERATION_NOT_SUPPORTED_ERROR, ParamName
+        ADD_OPERATION_NOT_SUPPORTED_ERROR, ParamName, DEFAULT_PAGE_SIZE
     from ansible.module_utils.fdm_swagger_client import ValidationError
+    from ansible.module_utils.object_index import ObjectIndex
 except ImportError:
     from module_utils.common import FtdServerError, HTTPMethod, ResponseParams, FtdConfigurationError
     from module_utils.configuration import DUPLICATE_NAME_ERROR_MESSAGE, UNPROCESSABLE_ENTITY_STATUS, \
         MULTIPLE_DUPLICATES_FOUND_ERROR, BaseConfigurationResource, FtdInvalidOperationNameError, QueryParams, \
-        ADD_OPERATION_NOT_SUPPORTED_ERROR, ParamName
+        ADD_OPERATION_NOT_SUPPORTED_ERROR, ParamName, DEFAULT_PAGE_SIZE
     from module_utils.fdm_swagger_client import ValidationError
+    from module_utils.object_index import ObjectIndex
 
 ADD_RESPONSE = {'status': 'Object added'}
 EDIT_RESPONSE = {'status': 'Object edited'}
@@ -139,20 +143,20 @@ class TestUpsertOperationUnitTests(unittest.TestCase):
         add_mock.assert_called_once_with(get_operation_mock.return_value, params)
         edit_mock.assert_not_called()
 
-    @mock.patch("module_utils.configuration.equal_objects")
+    @mock.patch("module_utils.configuration.get_object_diff")
     @mock.patch("module_utils.configuration.OperationChecker.is_upsert_operation_supported")
     @mock.patch.object(BaseConfigurationResource, "get_operation_specs_by_model_name")
     @mock.patch.object(BaseConfigurationResource, "_find_object_matching_params")
     @mock.patch.object(BaseConfigurationResource, "_add_upserted_object")
     @mock.patch.object(BaseConfigurationResource, "_edit_upserted_object")
     def test_upsert_object_successfully_edited(self, edit_mock, add_mock, find_object, get_operation_mock,
-                                               is_upsert_supported_mock, equal_objects_mock):
+                                               is_upsert_supported_mock, get_object_diff_mock):
         params = mock.MagicMock()
         existing_obj = mock.MagicMock()
 
         is_upsert_supported_mock.return_value = True
         find_object.return_value = existing_obj
-        equal_objects_mock.return_value = False
+        get_object_diff_mock.return_value = {'value': {'before': 'old', 'after': 'new'}}
 
         result = self._resource.upsert_object('upsertFoo', params)
 
@@ -161,23 +165,24 @@ class TestUpsertOperationUnitTests(unittest.TestCase):
         get_operation_mock.assert_called_once_with('Foo')
         is_upsert_supported_mock.assert_called_once_with(get_operation_mock.return_value)
         add_mock.assert_not_called()
-        equal_objects_mock.assert_called_once_with(existing_obj, params[ParamName.DATA])
+        get_object_diff_mock.assert_called_once_with(existing_obj, params[ParamName.DATA])
         edit_mock.assert_called_once_with(get_operation_mock.return_value, existing_obj, params)
+        assert {'value': {'before': 'old', 'after': 'new'}} == self._resource.config_diff
 
-    @mock.patch("module_utils.configuration.equal_objects")
+    @mock.patch("module_utils.configuration.get_object_diff")
     @mock.patch("module_utils.configuration.OperationChecker.is_upsert_operation_supported")
     @mock.patch.object(BaseConfigurationResource, "get_operation_specs_by_model_name")
     @mock.patch.object(BaseConfigurationResource, "_find_object_matching_params")
     @mock.patch.object(BaseConfigurationResource, "_add_upserted_object")
     @mock.patch.object(BaseConfigurationResource, "_edit_upserted_object")
     def test_upsert_object_returned_without_modifications(self, edit_mock, add_mock, find_object, get_operation_mock,
-                                                          is_upsert_supported_mock, equal_objects_mock):
+                                                          is_upsert_supported_mock, get_object_diff_mock):
         params = mock.MagicMock()
         existing_obj = mock.MagicMock()
 
         is_upsert_supported_mock.return_value = True
         find_object.return_value = existing_obj
-        equal_objects_mock.return_value = True
+        get_object_diff_mock.return_value = {}
 
         result = self._resource.upsert_object('upsertFoo', params)
 
@@ -186,7 +191,7 @@ class TestUpsertOperationUnitTests(unittest.TestCase):
         get_operation_mock.assert_called_once_with('Foo')
         is_upsert_supported_mock.assert_called_once_with(get_operation_mock.return_value)
         add_mock.assert_not_called()
-        equal_objects_mock.assert_called_once_with(existing_obj, params[ParamName.DATA])
+        get_object_diff_mock.assert_called_once_with(existing_obj, params[ParamName.DATA])
         edit_mock.assert_not_called()
 
     @mock.patch("module_utils.configuration.OperationChecker.is_upsert_operation_supported")
@@ -234,20 +239,20 @@ class TestUpsertOperationUnitTests(unittest.TestCase):
         add_mock.assert_not_called()
         edit_mock.assert_not_called()
 
-    @mock.patch("module_utils.configuration.equal_objects")
+    @mock.patch("module_utils.configuration.get_object_diff")
     @mock.patch("module_utils.configuration.OperationChecker.is_upsert_operation_supported")
     @mock.patch.object(BaseConfigurationResource, "get_operation_specs_by_model_name")
     @mock.patch.object(BaseConfigurationResource, "_find_object_matching_params")
     @mock.patch.object(BaseConfigurationResource, "_add_upserted_object")
     @mock.patch.object(BaseConfigurationResource, "_edit_upserted_object")
     def test_upsert_object_with_fatal_error_during_edit(self, edit_mock, add_mock, find_object, get_operation_mock,
-                                                        is_upsert_supported_mock, equal_objects_mock):
+                                                        is_upsert_supported_mock, get_object_diff_mock):
         params = mock.MagicMock()
         existing_obj = mock.MagicMock()
 
         is_upsert_supported_mock.return_value = True
         find_object.return_value = existing_obj
-        equal_objects_mock.return_value = False
+        get_object_diff_mock.return_value = {'value': {'before': 'old', 'after': 'new'}}
         edit_mock.side_effect = FtdConfigurationError("Some object edit error")
 
         self.assertRaises(
@@ -300,6 +305,8 @@ class TestUpsertOperationFunctionalTests(object):
         connection_instance.validate_data.return_value = True, None
         connection_instance.validate_query_params.return_value = True, None
         connection_instance.validate_path_params.return_value = True, None
+        connection_instance.is_object_index_enabled.return_value = False
+        delegate_to_plugin(connection_instance, 'validate_and_send_request')
         return connection_instance
 
     def test_module_should_create_object_when_upsert_operation_and_object_does_not_exist(self, connection_mock):
@@ -452,7 +459,8 @@ class TestUpsertOperationFunctionalTests(object):
 
                 if is_get_list_req:
                     assert body_params == {}
-                    assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': 10, 'offset': 0}
+                    assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': DEFAULT_PAGE_SIZE,
+                                            'offset': 0}
                     assert path_params == {}
                 elif is_get_req:
                     assert body_params == {}
@@ -533,7 +541,7 @@ class TestUpsertOperationFunctionalTests(object):
             elif http_method == HTTPMethod.GET:
                 assert url_path == url
                 assert body_params == {}
-                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': 10, 'offset': 0}
+                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0}
                 assert path_params == {}
 
                 return {
@@ -611,7 +619,7 @@ class TestUpsertOperationFunctionalTests(object):
             elif http_method == HTTPMethod.GET:
                 assert url_path == url
                 assert body_params == {}
-                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': 10, 'offset': 0}
+                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0}
                 assert path_params == {}
 
                 expected_val['value'] = '4444'
@@ -697,7 +705,7 @@ class TestUpsertOperationFunctionalTests(object):
             elif http_method == HTTPMethod.GET:
                 assert url_path == url
                 assert body_params == {}
-                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': 10, 'offset': 0}
+                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0}
                 assert path_params == {}
 
                 return {
@@ -771,7 +779,8 @@ class TestUpsertOperationFunctionalTests(object):
 
                 if is_get_list_req:
                     assert body_params == {}
-                    assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': 10, 'offset': 0}
+                    assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': DEFAULT_PAGE_SIZE,
+                                            'offset': 0}
                 elif is_get_req:
                     assert body_params == {}
                     assert query_params == {}
@@ -898,7 +907,7 @@ class TestUpsertOperationFunctionalTests(object):
             elif http_method == HTTPMethod.GET:
                 assert url_path == url
                 assert body_params == {}
-                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': 10, 'offset': 0}
+                assert query_params == {QueryParams.FILTER: 'name:testObject', 'limit': DEFAULT_PAGE_SIZE, 'offset': 0}
                 assert path_params == {}
 
                 return {
@@ -936,6 +945,52 @@ class TestUpsertOperationFunctionalTests(object):
         assert result.msg is MULTIPLE_DUPLICATES_FOUND_ERROR
         assert result.obj is None
 
+    def test_upsert_should_use_object_index_kept_by_connection(self, connection_mock):
+        url = '/test'
+        operations = {
+            'getObjectList': {'method': HTTPMethod.GET, 'modelName': 'Object', 'url': url, 'returnMultipleItems': True},
+            'addObject': {'method': HTTPMethod.POST, 'modelName': 'Object', 'url': url},
+            'editObject': {'method': HTTPMethod.PUT, 'modelName': 'Object', 'url': '/test/{objId}'},
+            'getObject': {'method': HTTPMethod.GET, 'modelName': 'Object', 'url': '/test/{objId}',
+                          'returnMultipleItems': False}
+        }
+        existing_obj = {'id': '1', 'version': 'a', 'name': 'otherObject', 'type': 'object'}
+        added_obj = {'id': '2', 'version': 'b', 'name': 'testObject', 'type': 'object'}
+        requests = []
+
+        def request_handler(url_path=None, http_method=None, body_params=None, path_params=None, query_params=None):
+            requests.append((http_method, url_path, query_params))
+            if http_method == HTTPMethod.POST:
+                response = added_obj
+            elif http_method == HTTPMethod.GET and url_path == url:
+                assert QueryParams.FILTER not in query_params
+                response = {'items': [existing_obj]}
+            else:
+                assert False
+            return {ResponseParams.SUCCESS: True, ResponseParams.RESPONSE: response, ResponseParams.STATUS_CODE: 200}
+
+        index = ObjectIndex()
+        connection_mock.get_operation_spec = lambda name: operations[name]
+        connection_mock.get_operation_specs_by_model_name.return_value = operations
+        connection_mock.send_request = request_handler
+        connection_mock.get_indexed_object = index.get
+        connection_mock.index_objects = index.populate
+        connection_mock.update_indexed_object = index.update
+        params = {
+            'operation': 'upsertObject',
+            'data': {'name': 'testObject', 'type': 'object'}
+        }
+
+        first_result = BaseConfigurationResource(connection_mock, use_object_index=True).execute_operation(
+            params['operation'], copy.deepcopy(params))
+        second_result = BaseConfigurationResource(connection_mock, use_object_index=True).execute_operation(
+            params['operation'], copy.deepcopy(params))
+
+        assert added_obj == first_result
+        assert added_obj == second_result
+        assert [HTTPMethod.GET, HTTPMethod.POST] == [method for method, _, _ in requests]
+        assert (True, existing_obj) == index.get('Object', 'otherObject')
+
     @staticmethod
     def _resource_execute_operation(params, connection):
 
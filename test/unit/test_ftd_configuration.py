@@ -29,10 +29,17 @@ class TestFtdConfiguration(object):
         return connection_class_mock.return_value
 
     @pytest.fixture
-    def resource_mock(self, mocker):
+    def resource_instance_mock(self, mocker):
         resource_class_mock = mocker.patch('library.ftd_configuration.BaseConfigurationResource')
         resource_instance = resource_class_mock.return_value
-        return resource_instance.execute_operation
+        resource_instance.config_changed = False
+        resource_instance.config_diff = None
+        resource_instance.planned_changes = []
+        return resource_instance
+
+    @pytest.fixture
+    def resource_mock(self, resource_instance_mock):
+        return resource_instance_mock.execute_operation
 
     def test_module_should_fail_when_ftd_invalid_operation_name_error(self, resource_mock):
         operation_name = 'test name'
@@ -98,6 +105,157 @@ class TestFtdConfiguration(object):
         result = self._run_module({'operation': operation_name})
         assert result['response'] == {'result': 'ok'}
 
+    def test_module_should_return_changed_properties_and_compact_diff(self, resource_instance_mock):
+        resource_instance_mock.execute_operation.return_value = {'id': '1', 'rules': [{'name': 'new'}]}
+        resource_instance_mock.config_diff = {'rules[0].name': {'before': 'old', 'after': 'new'}}
+
+        result = self._run_module({'operation': 'upsertAccessPolicy', '_ansible_diff': True})
+
+        assert {'rules[0].name': {'before': 'old', 'after': 'new'}} == result['changes']
+        assert {'before': {'rules[0].name': 'old'}, 'after': {'rules[0].name': 'new'}} == result['diff']
+
+    def test_module_should_return_changed_properties_in_check_mode(self, resource_instance_mock):
+        resource_instance_mock.execute_operation.side_effect = CheckModeException()
+        resource_instance_mock.config_diff = {'value': {'before': '1.1.1.1', 'after': '2.2.2.2'}}
+
+        result = self._run_module({'operation': 'editNetworkObject'})
+
+        assert not result['changed']
+        assert {'value': {'before': '1.1.1.1', 'after': '2.2.2.2'}} == result['changes']
+        assert 'diff' not in result
+
+    def test_module_should_return_planned_changes_in_check_mode(self, resource_instance_mock):
+        planned_change = {'action': 'add', 'operation': 'addNetworkObject', 'model': 'NetworkObject',
+                          'name': 'obj1', 'id': None}
+        resource_instance_mock.execute_operation.return_value = {'name': 'obj1'}
+        resource_instance_mock.config_changed = True
+        resource_instance_mock.planned_changes = [planned_change]
+
+        result = self._run_module({'operation': 'addNetworkObject', 'data': {'name': 'obj1'},
+                                   '_ansible_check_mode': True})
+
+        assert result['changed']
+        assert [planned_change] == result['plan']
+
+    def test_module_should_deploy_and_return_deployment_result(self, resource_instance_mock):
+        deployment = {'skipped': False, 'state': 'DEPLOYED', 'duration': 12.5, 'polls': 4}
+        resource_instance_mock.deploy.return_value = {'id': 'job', 'state': 'DEPLOYED'}, deployment
+        resource_instance_mock.config_changed = True
+
+        result = self._run_module({'operation': 'addDeployment', 'wait_for_deployment': True,
+                                   'deployment_timeout': 60})
+
+        assert result['changed']
+        assert deployment == result['deployment']
+        assert {'id': 'job', 'state': 'DEPLOYED'} == result['response']
+        params, wait, timeout, skip_if_no_changes = resource_instance_mock.deploy.call_args[0]
+        assert ('addDeployment', True, 60, False) == (params['operation'], wait, timeout, skip_if_no_changes)
+
+    def test_module_should_fail_when_waiting_for_other_operation(self, resource_instance_mock):
+        result = self._run_module_with_fail_json({'operation': 'addNetworkObject', 'wait_for_deployment': True})
+
+        assert result['failed']
+        assert not resource_instance_mock.deploy.called
+
+    @pytest.fixture
+    def bulk_resource_mock(self, mocker):
+        resource_class_mock = mocker.patch('library.ftd_configuration.BaseConfigurationResource')
+        resource_instance = resource_class_mock.return_value
+        resource_instance.planned_changes = []
+        return resource_instance.execute_bulk_operation
+
+    def test_module_should_execute_operation_for_every_bulk_item(self, bulk_resource_mock):
+        operation_name = 'upsertNetworkObject'
+        items = [{'name': 'obj1'}, {'name': 'obj2'}]
+        responses = [{'name': 'obj1', 'id': '1'}, {'name': 'obj2', 'id': '2'}]
+        bulk_resource_mock.return_value = [
+            {'changed': True, 'response': responses[0]},
+            {'changed': False, 'response': responses[1]}
+        ]
+
+        result = self._run_module({
+            'operation': operation_name,
+            'bulk_data': items,
+            'path_params': {'parentId': 'foo'},
+            'register_as': 'objects'
+        })
+
+        assert responses == result['response']
+        assert [{'changed': True, 'response': responses[0]},
+                {'changed': False, 'response': responses[1]}] == result['results']
+        assert {'total': 2, 'changed': 1, 'unchanged': 1, 'failed': 0} == result['summary']
+        assert {'objects': responses} == result['ansible_facts']
+        op_name, params_list = bulk_resource_mock.call_args[0]
+        assert operation_name == op_name
+        assert items == [params['data'] for params in params_list]
+        assert [{'parentId': 'foo'}] * 2 == [params['path_params'] for params in params_list]
+        assert not any('bulk_data' in params for params in params_list)
+
+    def test_module_should_register_facts_for_every_bulk_item_without_register_as(self, bulk_resource_mock):
+        bulk_resource_mock.return_value = [
+            {'changed': True, 'response': {'name': 'Obj 1', 'type': 'networkobject', 'id': '1'}},
+            {'changed': False, 'error': FtdServerError({'error': 'foo'}, 422)},
+            {'changed': False, 'response': {'name': 'obj2', 'type': 'networkobject', 'id': '2'}}
+        ]
+
+        result = self._run_module_with_fail_json({
+            'operation': 'upsertNetworkObject',
+            'bulk_data': [{'name': 'Obj 1'}, {'name': 'obj3'}, {'name': 'obj2'}]
+        })
+
+        assert {
+            'networkobject_obj_1': {'name': 'Obj 1', 'type': 'networkobject', 'id': '1'},
+            'networkobject_obj2': {'name': 'obj2', 'type': 'networkobject', 'id': '2'}
+        } == result['ansible_facts']
+
+    def test_module_should_return_changed_properties_of_bulk_items(self, bulk_resource_mock):
+        bulk_resource_mock.return_value = [
+            {'changed': False, 'response': {'name': 'obj1'}},
+            {'changed': True, 'response': {'name': 'obj2', 'value': '2'},
+             'diff': {'value': {'before': '1', 'after': '2'}}}
+        ]
+
+        result = self._run_module({
+            'operation': 'upsertNetworkObject',
+            'bulk_data': [{'name': 'obj1'}, {'name': 'obj2', 'value': '2'}],
+            '_ansible_diff': True
+        })
+
+        assert 'changes' not in result['results'][0]
+        assert {'value': {'before': '1', 'after': '2'}} == result['results'][1]['changes']
+        assert {'before': {'[1].value': '1'}, 'after': {'[1].value': '2'}} == result['diff']
+
+    def test_module_should_fail_after_processing_all_bulk_items_when_some_of_them_fail(self, bulk_resource_mock):
+        operation_name = 'addNetworkObject'
+        bulk_resource_mock.return_value = [
+            {'changed': False, 'error': FtdServerError({'error': 'foo'}, 422)},
+            {'changed': True, 'response': {'name': 'obj2'}}
+        ]
+
+        result = self._run_module_with_fail_json({
+            'operation': operation_name,
+            'bulk_data': [{'name': 'obj1'}, {'name': 'obj2'}]
+        })
+
+        assert result['failed']
+        assert 'Failed to execute addNetworkObject operation for 1 of 2 item(s)' == result['msg']
+        assert [None, {'name': 'obj2'}] == result['response']
+        assert result['results'][0]['failed']
+        assert 'Status code: 422' in result['results'][0]['msg']
+        assert {'name': 'obj2'} == result['results'][1]['response']
+        assert 1 == result['summary']['failed']
+
+    def test_module_should_fail_when_data_and_bulk_data_are_given(self, resource_mock):
+        result = self._run_module_with_fail_json({
+            'operation': 'addNetworkObject',
+            'data': {'name': 'obj1'},
+            'bulk_data': [{'name': 'obj2'}]
+        })
+
+        assert result['failed']
+        assert 'mutually exclusive' in result['msg']
+        resource_mock.assert_not_called()
+
     def _run_module(self, module_args):
         set_module_args(module_args)
         with pytest.raises(AnsibleExitJson) as ex:
@@ -30,6 +30,21 @@ DEFAULT_MODULE_PARAMS = dict(
     force_reinstall=False
 )
 
+MANAGEMENT_IP_LIST = {
+    'items': [{
+        'ipv4Address': '192.168.1.1',
+        'ipv4NetMask': '255.255.255.0',
+        'ipv4Gateway': '192.168.0.1'
+    }]
+}
+DNS_SETTING_LIST = {
+    'items': [{
+        'dnsServerGroup': {
+            'id': '123'
+        }
+    }]
+}
+
 
 class TestFtdInstall(object):
     module = ftd_install
@@ -171,15 +186,11 @@ class TestFtdInstall(object):
             {
                 'softwareVersion': '6.3.0-11',
                 'platformModel': 'Cisco ASA5516-X Threat Defense'
-            },
-            {
-                'items': [{
-                    'ipv4Address': '192.168.1.1',
-                    'ipv4NetMask': '255.255.255.0',
-                    'ipv4Gateway': '192.168.0.1'
-                }]
             }
         ]
+        config_resource_mock.send_general_requests.return_value = [
+            {'changed': False, 'response': MANAGEMENT_IP_LIST}
+        ]
         module_params = dict(DEFAULT_MODULE_PARAMS)
         expected_module_params = dict(module_params)
         del module_params['device_ip']
@@ -199,18 +210,14 @@ class TestFtdInstall(object):
         ftd_factory_mock.create.return_value.install_ftd_image.assert_called_once_with(expected_module_params)
 
     def test_module_should_fill_dns_server_when_missing(self, config_resource_mock, ftd_factory_mock):
+        config_resource_mock.send_general_requests.return_value = [
+            {'changed': False, 'response': DNS_SETTING_LIST}
+        ]
         config_resource_mock.execute_operation.side_effect = [
             {
                 'softwareVersion': '6.3.0-11',
                 'platformModel': 'Cisco ASA5516-X Threat Defense'
             },
-            {
-                'items': [{
-                    'dnsServerGroup': {
-                        'id': '123'
-                    }
-                }]
-            },
             {
                 'dnsServers': [{
                     'ipAddress': '8.8.9.9'
@@ -228,3 +235,35 @@ class TestFtdInstall(object):
 
         ftd_factory_mock.create.assert_called_once_with('Cisco ASA5516-X Threat Defense', expected_module_params)
         ftd_factory_mock.create.return_value.install_ftd_image.assert_called_once_with(expected_module_params)
+
+    def test_module_should_fetch_management_ip_and_dns_settings_concurrently(self, config_resource_mock,
+                                                                             ftd_factory_mock):
+        config_resource_mock.send_general_requests.return_value = [
+            {'changed': False, 'response': MANAGEMENT_IP_LIST},
+            {'changed': False, 'response': DNS_SETTING_LIST}
+        ]
+        config_resource_mock.execute_operation.side_effect = [
+            {
+                'softwareVersion': '6.3.0-11',
+                'platformModel': 'Cisco ASA5516-X Threat Defense'
+            },
+            {
+                'dnsServers': [{
+                    'ipAddress': '8.8.9.9'
+                }]
+            }
+        ]
+        module_params = dict(DEFAULT_MODULE_PARAMS)
+        expected_module_params = dict(module_params, device_ip='192.168.1.1', dns_server='8.8.9.9')
+        del module_params['device_ip']
+        del module_params['dns_server']
+
+        set_module_args(module_params)
+        with pytest.raises(AnsibleExitJson):
+            self.module.main()
+
+        config_resource_mock.send_general_requests.assert_called_once_with([
+            (ftd_install.FtdOperations.GET_MANAGEMENT_IP_LIST.value, {}),
+            (ftd_install.FtdOperations.GET_DNS_SETTING_LIST.value, {})
+        ])
+        ftd_factory_mock.create.return_value.install_ftd_image.assert_called_once_with(expected_module_params)